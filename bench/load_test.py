@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Load test for the extraction service (engine.service).
+
+Sends documents concurrently and reports latency percentiles and
+throughput. Runs in dry-run mode by default so no evidence is archived.
+
+Usage:
+    python -m engine serve --port 8765 &
+    python bench/load_test.py --requests 2000 --concurrency 16
+    python bench/load_test.py --socket /tmp/ajt-extract.sock
+"""
+import argparse
+import http.client
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str):
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1,
+                      int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Unix socket path (instead of TCP)")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--archive", action="store_true",
+                        help="Archive evidence (default: dry run)")
+    parser.add_argument("documents", nargs="*",
+                        default=["examples/accept_example.txt",
+                                 "examples/stop_example.txt"])
+    args = parser.parse_args()
+
+    # Send content inline so the test measures the service, not disk reads
+    bodies = []
+    for path in args.documents:
+        bodies.append(json.dumps({
+            "content": Path(path).read_text(encoding="utf-8"),
+            "source_id": path,
+            "dry_run": not args.archive
+        }).encode("utf-8"))
+
+    def connect():
+        if args.socket:
+            return UnixHTTPConnection(args.socket)
+        return http.client.HTTPConnection(args.host, args.port)
+
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(args.requests))
+
+    def worker():
+        conn = connect()
+        local: List[float] = []
+        local_errors = 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            body = bodies[i % len(bodies)]
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/extract", body,
+                             {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = connect()
+                continue
+            if resp.status != 200:
+                local_errors += 1
+                continue
+            # Only successful requests count toward latency and throughput
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    ok = len(latencies)
+    print("=" * 70)
+    print("EXTRACTION SERVICE LOAD TEST")
+    print("=" * 70)
+    print(f"  Requests:    {args.requests} ({args.concurrency} concurrent)")
+    print(f"  Succeeded:   {ok}")
+    print(f"  Errors:      {errors[0]}")
+    print(f"  Wall time:   {wall:.2f} s")
+    print(f"  Throughput:  {ok / wall if wall else 0:.1f} req/s")
+    print(f"  p50 latency: {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"  p99 latency: {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"  max latency: {(latencies[-1] if latencies else 0) * 1000:.2f} ms")
+
+    sys.exit(1 if errors[0] else 0)
+
+
+if __name__ == "__main__":
+    main()
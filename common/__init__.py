@@ -0,0 +1,14 @@
+"""
+Dependency-free helpers shared by the admission, execution and engine layers.
+
+Standard library only: nothing here imports another package of this
+repository, so any layer can use it without loading engine/__init__.
+"""
+
+from .hashing import text_hash
+from .locking import FileLock
+
+__all__ = [
+    "text_hash",
+    "FileLock",
+]
@@ -0,0 +1,15 @@
+"""
+Query context hash shared by the token validator and the engine.
+
+admission/ is frozen (CONTRIBUTING.md) and keeps its inline
+sha256(query); text_hash() is the same digest, and
+test_canonical_hashing.py pins the two together.
+"""
+import hashlib
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def text_hash(text: str) -> str:
+    """SHA-256 of UTF-8 text (query context hash; memoized)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
@@ -0,0 +1,50 @@
+"""
+Advisory exclusive lock (fcntl.flock) for shared append-only files.
+
+Advisory locks only coordinate writers that take them; readers never lock.
+On platforms without fcntl the lock is a no-op (single writer only).
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+class FileLock:
+    """Re-entrant (per instance) advisory exclusive lock on a lock file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._owner = None
+        self._fd = None
+
+    def held(self) -> bool:
+        """True if the calling thread holds the lock."""
+        return self._owner == threading.get_ident()
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        self._depth += 1
+        self._owner = threading.get_ident()
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+        return False
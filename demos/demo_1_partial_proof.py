@@ -111,9 +111,7 @@ def run_demo():
     print("KEY EVIDENCE (from audit log):")
     print("-" * 70)
 
-    audit_path = Path("demos/output") / f"{audit_id}.json"
-    with open(audit_path, 'r') as f:
-        audit = json.load(f)
+    audit = logger.read(audit_id)
 
     print(f"  Scope validity: {audit['scope']['validity']}")
     print(f"  Reuse policy: {audit['scope']['reuse']}")
@@ -129,7 +127,7 @@ def run_demo():
     print(' It guarantees stoppability and traceability."')
     print()
     print(f"Review generated files in: demos/output/")
-    print(f"  - {audit_id}.json (audit log)")
+    print(f"  - audit_log_*.seg (audit log record {audit_id})")
     print(f"  - defense_brief_{audit_id}.md (legal defense)")
     print()
 
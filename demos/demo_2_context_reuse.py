@@ -7,8 +7,6 @@ Expected: BLOCKED at Token validation (context_hash mismatch)
 Result: STOP with negative proof of reuse attempt
 """
 import sys
-import json
-import hashlib
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -16,12 +14,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from engine.judge import Decision
 from engine.audit import AuditLogger
+from engine.hashing import context_hash
 
 
 def compute_context_hash(action, context, decision_maker):
     """Compute context hash as defined in constitution."""
-    data = f"{action}:{json.dumps(context, sort_keys=True)}:{decision_maker}"
-    return hashlib.sha256(data.encode()).hexdigest()
+    return context_hash(action, context, decision_maker)
 
 
 def run_demo():
@@ -140,7 +138,7 @@ def run_demo():
     print(' Manually supplied or reused context_hash values invalidate the token."')
     print()
     print(f"Review generated files in: demos/output/")
-    print(f"  - {audit_id}.json (audit log with reuse evidence)")
+    print(f"  - audit_log_*.seg (audit log record {audit_id}, reuse evidence)")
     print()
 
 
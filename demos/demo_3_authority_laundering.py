@@ -138,7 +138,7 @@ def run_demo():
     print(' Responsibility cannot be aggregated into wrapper systems."')
     print()
     print(f"Review generated files in: demos/output/")
-    print(f"  - {audit_id}.json (audit log with laundering evidence)")
+    print(f"  - audit_log_*.seg (audit log record {audit_id}, laundering evidence)")
     print()
 
 
@@ -11,8 +11,16 @@ from .extract import RuleBasedExtractor
 from .ground import EvidenceGrounder
 from .judge import ExtractionJudge, Decision, StopReason
 from .archive import EvidenceArchive
+from .index import ArchiveIndex
+from .merkle import MerkleLog
 from .pipeline import ExtractionPipeline
-from .audit import AuditLogger, DefenseBriefGenerator, RegulatoryReportGenerator
+from .audit import (
+    AuditLogger, AuditVerifier, DefenseBriefGenerator, RegulatoryReportGenerator
+)
+from .service import ExtractionService
+from .batch import BatchRunner
+from .journal import ProgressJournal
+from .verify import ArchiveVerifier
 
 __all__ = [
     "DocumentIngestor",
@@ -22,8 +30,15 @@ __all__ = [
     "Decision",
     "StopReason",
     "EvidenceArchive",
+    "ArchiveIndex",
+    "MerkleLog",
     "ExtractionPipeline",
     "AuditLogger",
+    "AuditVerifier",
     "DefenseBriefGenerator",
     "RegulatoryReportGenerator",
+    "ExtractionService",
+    "BatchRunner",
+    "ProgressJournal",
+    "ArchiveVerifier",
 ]
@@ -0,0 +1,42 @@
+"""
+Command-line entry point: python -m engine <command> [args...]
+
+Commands:
+  serve    long-lived extraction service (engine.service)
+  batch    streaming JSONL batch runner (engine.batch)
+  merkle   Merkle inclusion proofs over the archive (engine.merkle)
+  verify   parallel integrity sweep over the archive (engine.verify)
+  index    query / rebuild the SQLite decision index (engine.index)
+  blobs    blob store garbage collection (engine.blobs)
+  audit    audit log hash-chain verification (engine.audit)
+  corpus   build / update the rag_read n-gram index (execution.corpus_index)
+"""
+import importlib
+import sys
+
+
+COMMANDS = {
+    "serve": "engine.service",
+    "batch": "engine.batch",
+    "merkle": "engine.merkle",
+    "verify": "engine.verify",
+    "index": "engine.index",
+    "blobs": "engine.blobs",
+    "audit": "engine.audit",
+    "corpus": "execution.corpus_index",
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    command = sys.argv[1]
+    module = importlib.import_module(COMMANDS[command])
+    sys.argv = [f"python -m engine {command}"] + sys.argv[2:]
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
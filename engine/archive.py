@@ -1,19 +1,109 @@
 """
 Archive module: write-once evidence artifacts with timestamps and hashes.
+
+Layouts:
+- "files" (default): extraction_{stem}.jsonl + manifest_{stem}.json per
+  extraction, stem = "{timestamp}_{random}" (time-sortable, unique across
+  writer processes; files appear atomically)
+- "segments": extraction JSONL appended to large segment files with a
+  sidecar offset index (engine.segments); the index entry is the manifest.
+  With compression="zlib"/"lzma", segments are sealed into independently
+  compressed frames when they roll over
+
+"files" manifests are version 2 by default: STOP/ACCEPT events are
+referenced by JSONL line number and line hash instead of being copied into
+the manifest; events() resolves them lazily. Version 1 manifests (full
+copies in stop_events/accept_events) remain readable.
+
+With dedup=True, values of at least dedup_min_bytes inside each result
+(evidence, stop proofs, context strings, ...) are stored once in a
+content-addressed blob store (engine.blobs) and replaced in the stored
+JSONL by {"$blob": "<sha256>"}. Hashes are still computed over the
+expanded canonical JSONL, so manifests are identical with or without dedup
+and verification expands and checks every blob.
+
+Both layouts produce the same extraction_hash and trace_signature for the
+same results. With merkle=True every extraction is also appended as a leaf
+to an incremental Merkle tree (engine.merkle) whose roots are published
+periodically, so one record can be proven against a published root. A
+leaf is kept only if its record was written: the write happens under the
+Merkle lock, and a failed write truncates its leaf again.
+
+Each extraction is addressed by an archive_ref: the manifest path
+("files") or the extraction id "ext_{segment}_{record}" ("segments").
 """
 import json
-import hashlib
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from engine.blobs import BlobStore
+from engine import hashing
+from engine.hashing import canonical_bytes, canonical_json, sha256_hex
+from engine.index import ArchiveIndex
+from engine.merkle import MerkleLog, leaf_hash
+from engine.segments import SegmentLog
+from engine.storage import unique_stem, write_atomic
+
+
+LAYOUTS = ("files", "segments")
+MANIFEST_VERSIONS = (1, 2)
 
 
 class EvidenceArchive:
     """Write-once artifact storage with integrity guarantees."""
 
-    def __init__(self, archive_dir: str = "evidence"):
+    def __init__(
+        self,
+        archive_dir: str = "evidence",
+        layout: str = "files",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age: Optional[float] = 24 * 3600,
+        merkle: bool = False,
+        merkle_publish_every: int = 1000,
+        compression: Optional[str] = None,
+        frame_bytes: int = 256 * 1024,
+        manifest_version: int = 2,
+        index: bool = False,
+        dedup: bool = False,
+        dedup_min_bytes: int = 128
+    ):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown archive layout: {layout}")
+        if manifest_version not in MANIFEST_VERSIONS:
+            raise ValueError(f"Unknown manifest version: {manifest_version}")
+
         self.archive_dir = Path(archive_dir)
         self.archive_dir.mkdir(exist_ok=True)
+        self.layout = layout
+        self.manifest_version = manifest_version
+        # Always available for reads; only written in "segments" layout
+        self.segments = SegmentLog(
+            str(self.archive_dir),
+            prefix="segment",
+            id_prefix="ext",
+            max_segment_bytes=max_segment_bytes,
+            max_segment_age=max_segment_age,
+            compression=compression,
+            frame_bytes=frame_bytes
+        )
+        self.merkle = MerkleLog(
+            str(self.archive_dir / "merkle"),
+            publish_every=merkle_publish_every
+        ) if merkle else None
+        self.index = ArchiveIndex(
+            str(self.archive_dir / "index.sqlite")
+        ) if index else None
+        self.dedup = dedup
+        self.dedup_min_bytes = dedup_min_bytes
+        self._blobs: Optional[BlobStore] = None
+
+    @property
+    def blobs(self) -> BlobStore:
+        """Blob store (created on first use; read by any archive)."""
+        if self._blobs is None:
+            self._blobs = BlobStore(str(self.archive_dir / "blobs"))
+        return self._blobs
 
     def archive_extraction(
         self,
@@ -23,35 +113,108 @@ class EvidenceArchive:
         """
         Archive extraction results as write-once artifacts.
 
-        Creates:
-        - extraction_{timestamp}.jsonl: line-delimited extraction results
-        - manifest_{timestamp}.json: metadata and integrity hashes
+        Creates ("files" layout):
+        - extraction_{stem}.jsonl: line-delimited extraction results
+        - manifest_{stem}.json: metadata and integrity hashes
+
+        Appends ("segments" layout):
+        - the same JSONL bytes to the active segment
+        - a manifest entry to the segment's offset index
         """
         timestamp = datetime.now(timezone.utc).isoformat()
-        safe_timestamp = timestamp.replace(":", "-").replace(".", "-")
 
-        # Prepare extraction record
-        extraction_record = {
-            "timestamp": timestamp,
-            "document": {
-                "path": document_data["path"],
-                "content_hash": document_data["content_hash"],
-                "size_bytes": document_data["size_bytes"]
-            },
-            "results": results,
-            "trace_signature": self._compute_trace_signature(
-                document_data, results
+        # Canonicalize each result once; the same bytes feed the JSONL
+        # file, its hash and the trace signature
+        lines = self._canonical_lines(results)
+        payload = b''.join(line + b'\n' for line in lines)
+        jsonl_hash = sha256_hex(payload)
+        trace_signature = self._trace_signature(
+            document_data["content_hash"], lines
+        )
+
+        # Stored bytes: large values replaced by blob references
+        if self.dedup:
+            self.blobs.written = []
+            payload = b''.join(
+                line + b'\n' for line in self._canonical_lines(
+                    [self._store_blobs(r, top=True) for r in results]
+                )
             )
-        }
 
-        # Write JSONL (one result per line)
-        jsonl_path = self.archive_dir / f"extraction_{safe_timestamp}.jsonl"
-        with open(jsonl_path, 'w') as f:
-            for result in results:
-                f.write(json.dumps(result) + '\n')
+        record = (document_data, results, timestamp, lines,
+                  payload, jsonl_hash, trace_signature)
+        if self.merkle is None:
+            info = self._write_record(*record, None)
+        else:
+            # The Merkle lock is held until the record is written, so a
+            # failed write takes its leaf back out before any other leaf
+            # or a published root can cover it
+            leaf = self._merkle_leaf(
+                timestamp, document_data["content_hash"],
+                jsonl_hash, trace_signature
+            )
+            with self.merkle.lock:
+                leaf_index = self.merkle.append(
+                    leaf.encode('utf-8'), publish=False
+                )
+                try:
+                    info = self._write_record(*record, leaf_index)
+                except BaseException:
+                    self.merkle.truncate(leaf_index)
+                    raise
+                self.merkle.publish_due()
 
-        # Compute JSONL hash
-        jsonl_hash = self._hash_file(jsonl_path)
+        if self.index is not None:
+            self.index.add(
+                info["archive_ref"], document_data["content_hash"],
+                timestamp, results, document_data["path"]
+            )
+        return info
+
+    def _write_record(
+        self,
+        document_data: Dict,
+        results: List[Dict],
+        timestamp: str,
+        lines: List[bytes],
+        payload: bytes,
+        jsonl_hash: str,
+        trace_signature: str,
+        leaf_index: Optional[int]
+    ) -> Dict:
+        """Store one record in the configured layout."""
+        if self.layout == "segments":
+            return self._archive_segment(
+                document_data, results, timestamp,
+                payload, jsonl_hash, trace_signature, leaf_index
+            )
+        return self._archive_files(
+            document_data, results, timestamp, lines,
+            payload, jsonl_hash, trace_signature, leaf_index
+        )
+
+    def _archive_files(
+        self,
+        document_data: Dict,
+        results: List[Dict],
+        timestamp: str,
+        lines: List[bytes],
+        payload: bytes,
+        jsonl_hash: str,
+        trace_signature: str,
+        leaf_index: Optional[int]
+    ) -> Dict:
+        """Write extraction JSONL and its manifest as separate files."""
+        # Write JSONL (one result per line) under a name no other writer
+        # holds; the manifest reuses the stem
+        while True:
+            stem = unique_stem(timestamp)
+            jsonl_path = self.archive_dir / f"extraction_{stem}.jsonl"
+            try:
+                write_atomic(jsonl_path, payload, exclusive=True)
+                break
+            except FileExistsError:
+                continue
 
         # Create manifest
         manifest = {
@@ -59,28 +222,391 @@ class EvidenceArchive:
             "document_hash": document_data["content_hash"],
             "extraction_file": str(jsonl_path),
             "extraction_hash": jsonl_hash,
-            "result_count": len(results),
-            "stop_events": [
+            "result_count": len(results)
+        }
+        if self.manifest_version == 1:
+            manifest["stop_events"] = [
                 r for r in results if r["decision"] == "STOP"
-            ],
-            "accept_events": [
+            ]
+            manifest["accept_events"] = [
                 r for r in results if r["decision"] == "ACCEPT"
-            ],
-            "trace_signature": extraction_record["trace_signature"]
-        }
+            ]
+        else:
+            manifest = dict({"manifest_version": 2}, **manifest)
+            manifest["document_path"] = document_data["path"]
+            manifest.update(self._event_refs(results, lines))
+        manifest["trace_signature"] = trace_signature
+        if leaf_index is not None:
+            manifest["merkle_leaf_index"] = leaf_index
+        if self.dedup:
+            manifest["dedup"] = True
 
-        # Write manifest
-        manifest_path = self.archive_dir / f"manifest_{safe_timestamp}.json"
-        with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        # Write manifest (complete or absent, never partial)
+        manifest_path = self.archive_dir / f"manifest_{stem}.json"
+        write_atomic(
+            manifest_path, json.dumps(manifest, indent=2), exclusive=True
+        )
 
         return {
+            "archive_ref": str(manifest_path),
             "jsonl_path": str(jsonl_path),
             "manifest_path": str(manifest_path),
             "timestamp": timestamp,
-            "trace_signature": extraction_record["trace_signature"]
+            "trace_signature": trace_signature,
+            "merkle_leaf_index": leaf_index
+        }
+
+    def _event_refs(self, results: List[Dict], lines: List[bytes]) -> Dict:
+        """Version 2 event references: 1-based JSONL line + line hash."""
+        refs = {"stop_count": 0, "accept_count": 0,
+                "stop_refs": [], "accept_refs": []}
+        for line_no, (result, line) in enumerate(zip(results, lines), 1):
+            kind = {"STOP": "stop", "ACCEPT": "accept"}.get(result["decision"])
+            if kind:
+                refs[f"{kind}_count"] += 1
+                refs[f"{kind}_refs"].append({
+                    "line": line_no,
+                    "hash": sha256_hex(line)
+                })
+        return refs
+
+    def _archive_segment(
+        self,
+        document_data: Dict,
+        results: List[Dict],
+        timestamp: str,
+        payload: bytes,
+        jsonl_hash: str,
+        trace_signature: str,
+        leaf_index: Optional[int]
+    ) -> Dict:
+        """Append extraction to the active segment; index entry = manifest."""
+        meta = {
+            "timestamp": timestamp,
+            "document_path": document_data["path"],
+            "document_hash": document_data["content_hash"],
+            "size_bytes": document_data["size_bytes"],
+            "extraction_hash": jsonl_hash,
+            "result_count": len(results),
+            "stop_count": sum(1 for r in results if r["decision"] == "STOP"),
+            "accept_count": sum(
+                1 for r in results if r["decision"] == "ACCEPT"
+            ),
+            "trace_signature": trace_signature
+        }
+        if leaf_index is not None:
+            meta["merkle_leaf_index"] = leaf_index
+        if self.dedup:
+            meta["dedup"] = True
+        entry = self.segments.append(payload, meta)
+
+        return {
+            "archive_ref": entry["id"],
+            "extraction_id": entry["id"],
+            "segment": entry["segment"],
+            "offset": entry["offset"],
+            "length": entry["length"],
+            "timestamp": timestamp,
+            "trace_signature": trace_signature,
+            "merkle_leaf_index": leaf_index
         }
 
+    def _store_blobs(self, value, top: bool = False):
+        """Replace large values (bottom-up) by {"$blob": sha256} stubs."""
+        if isinstance(value, dict):
+            value = {k: self._store_blobs(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            value = [self._store_blobs(v) for v in value]
+        elif not isinstance(value, str):
+            return value
+
+        if top:
+            return value  # keep field_name / decision readable
+        data = canonical_bytes(value)
+        if len(data) < self.dedup_min_bytes:
+            return value
+        return {"$blob": self.blobs.put(data)}
+
+    def _expand_blobs(self, value):
+        """Inverse of _store_blobs; blob reads are hash-checked."""
+        if isinstance(value, dict):
+            if len(value) == 1 and "$blob" in value:
+                return self._expand_blobs(
+                    json.loads(self.blobs.get(value["$blob"]))
+                )
+            return {k: self._expand_blobs(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._expand_blobs(v) for v in value]
+        return value
+
+    def _blob_refs(self, value) -> Iterator[str]:
+        """Blob digests referenced directly by value (not inside blobs)."""
+        if isinstance(value, dict):
+            if len(value) == 1 and "$blob" in value:
+                yield value["$blob"]
+                return
+            for v in value.values():
+                yield from self._blob_refs(v)
+        elif isinstance(value, list):
+            for v in value:
+                yield from self._blob_refs(v)
+
+    def collect_garbage(self, grace_seconds: float = 3600) -> Dict:
+        """
+        Reference-counting GC pass over the blob store.
+
+        Counts references from every archived record (and from blobs to
+        nested blobs), then deletes unreferenced blobs older than
+        grace_seconds. Returns counts of blobs, references and deletions.
+        """
+        refcounts: Dict[str, int] = {}
+        pending: List[str] = []
+        for archive_ref in self.iter_refs():
+            manifest, stored = self._load(archive_ref)
+            if not manifest.get("dedup"):
+                continue
+            for result in self._parse_results(stored):
+                pending.extend(self._blob_refs(result))
+
+        while pending:
+            digest = pending.pop()
+            refcounts[digest] = refcounts.get(digest, 0) + 1
+            if refcounts[digest] == 1 and digest in self.blobs:
+                pending.extend(self._blob_refs(
+                    json.loads(self.blobs.path(digest).read_bytes())
+                ))
+
+        stats = self.blobs.sweep(refcounts, grace_seconds)
+        stats["references"] = sum(refcounts.values())
+        stats["missing"] = sum(1 for d in refcounts if d not in self.blobs)
+        return stats
+
+    def written_paths(self, archive_info: Dict) -> List[Path]:
+        """
+        Files and directories touched by one archive_extraction call.
+
+        Call right after archive_extraction (GroupCommitWriter does so
+        under its lock): new blob files are those of the latest call.
+        """
+        if "extraction_id" in archive_info:
+            seq, _ = self.segments.parse_id(archive_info["extraction_id"])
+            paths = [
+                self.segments.data_path(seq),
+                self.segments.index_path(seq),
+                self.archive_dir
+            ]
+        else:
+            paths = [
+                Path(archive_info["jsonl_path"]),
+                Path(archive_info["manifest_path"]),
+                self.archive_dir
+            ]
+        if self.dedup:
+            # Blobs created by the latest archive_extraction call
+            for blob_path in self.blobs.written:
+                paths.extend([blob_path, blob_path.parent])
+            paths.append(self.blobs.directory)
+        if archive_info.get("merkle_leaf_index") is not None:
+            paths.extend(self.merkle.directory.glob("*"))
+            paths.append(self.merkle.directory)
+        return paths
+
+    def _merkle_leaf(
+        self,
+        timestamp: str,
+        document_hash: str,
+        extraction_hash: str,
+        trace_signature: str
+    ) -> str:
+        """Canonical leaf content; recomputable from any manifest."""
+        return canonical_json({
+            "document_hash": document_hash,
+            "extraction_hash": extraction_hash,
+            "timestamp": timestamp,
+            "trace_signature": trace_signature
+        }, compact=True)
+
+    def inclusion_proof(
+        self,
+        archive_ref: str,
+        tree_size: Optional[int] = None
+    ) -> Dict:
+        """
+        O(log n) Merkle inclusion proof for an archived extraction.
+
+        Proves against tree_size, or by default the latest published root
+        that covers the record (falling back to the current tree).
+        Verify with engine.merkle.verify_proof_document against the
+        published roots; a proof against an unpublished tree size only
+        verifies once that root is published (or trusted otherwise).
+        """
+        if self.merkle is None:
+            raise ValueError("Archive opened without merkle=True")
+
+        manifest, _ = self._load(archive_ref)
+        if "merkle_leaf_index" not in manifest:
+            raise ValueError(f"Record not in Merkle log: {archive_ref}")
+
+        leaf_index = manifest["merkle_leaf_index"]
+        if tree_size is None:
+            published = self.merkle.latest_published()
+            if published and published["tree_size"] > leaf_index:
+                tree_size = published["tree_size"]
+            else:
+                tree_size = self.merkle.size
+
+        leaf = self._merkle_leaf(
+            manifest["timestamp"], manifest["document_hash"],
+            manifest["extraction_hash"], manifest["trace_signature"]
+        )
+        return {
+            "archive_ref": archive_ref,
+            "leaf": leaf,
+            "leaf_hash": leaf_hash(leaf.encode('utf-8')).hex(),
+            "leaf_index": leaf_index,
+            "tree_size": tree_size,
+            "root": self.merkle.root(tree_size).hex(),
+            "proof": [
+                p.hex() for p in self.merkle.inclusion_proof(
+                    leaf_index, tree_size
+                )
+            ]
+        }
+
+    def iter_refs(self) -> Iterator[str]:
+        """archive_ref of every archived extraction (files, then segments)."""
+        for path in sorted(self.archive_dir.glob("manifest_*.json")):
+            yield str(path)
+        for entry in self.segments.iter_entries():
+            yield entry["id"]
+
+    def read_extraction(self, archive_ref: str) -> Dict:
+        """
+        Load archived extraction by archive_ref (either layout).
+
+        Returns:
+        - manifest: manifest (or segment index entry)
+        - results: list of field decisions
+        """
+        manifest, stored = self._load(archive_ref)
+        return {
+            "manifest": manifest,
+            "results": self._resolve(manifest, stored)[0]
+        }
+
+    def events(self, archive_ref: str, decision: str) -> Iterator[Dict]:
+        """
+        STOP or ACCEPT results of an archived extraction (either layout).
+
+        Version 2 manifests are resolved lazily: the JSONL is streamed and
+        only referenced lines are parsed, each checked against its line
+        hash (ValueError on mismatch). Version 1 manifests return their
+        embedded copies.
+        """
+        kind = {"STOP": "stop", "ACCEPT": "accept"}.get(decision)
+        if kind is None:
+            raise ValueError(f"Unknown decision: {decision}")
+
+        if self._is_segment_ref(archive_ref):
+            for result in self.read_extraction(archive_ref)["results"]:
+                if result["decision"] == decision:
+                    yield result
+            return
+
+        with open(archive_ref, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get("manifest_version", 1) == 1:
+            yield from manifest[f"{kind}_events"]
+            return
+
+        wanted = {ref["line"]: ref["hash"] for ref in manifest[f"{kind}_refs"]}
+        if not wanted:
+            return
+        last = max(wanted)
+        with open(manifest["extraction_file"], 'rb') as f:
+            for line_no, line in enumerate(f, start=1):
+                if line_no in wanted:
+                    result = json.loads(line)
+                    line = line.rstrip(b'\n')
+                    if manifest.get("dedup"):
+                        result = self._expand_blobs(result)
+                        line = self._canonical_lines([result])[0]
+                    if sha256_hex(line) != wanted[line_no]:
+                        raise ValueError(
+                            f"Line {line_no} hash mismatch: {archive_ref}"
+                        )
+                    yield result
+                if line_no >= last:
+                    return
+        raise ValueError(f"Referenced line {last} missing: {archive_ref}")
+
+    def verify(
+        self,
+        archive_ref: str,
+        document_hash: Optional[str] = None
+    ) -> bool:
+        """
+        Check archived evidence against its manifest.
+
+        Verifies the extraction JSONL hash, the trace signature and
+        (if given) the document hash. The source document is not read.
+        Deduplicated records are verified after expanding their blobs.
+        """
+        try:
+            manifest, stored = self._load(archive_ref)
+
+            if document_hash and manifest["document_hash"] != document_hash:
+                return False
+
+            results, payload = self._resolve(manifest, stored)
+
+            if sha256_hex(payload) != manifest["extraction_hash"]:
+                return False
+
+            if manifest.get("manifest_version", 1) >= 2:
+                lines = payload.splitlines()
+                for ref in manifest["stop_refs"] + manifest["accept_refs"]:
+                    if not 0 < ref["line"] <= len(lines):
+                        return False
+                    if sha256_hex(lines[ref["line"] - 1]) != ref["hash"]:
+                        return False
+        except (OSError, ValueError, KeyError, IndexError):
+            return False
+
+        signature = self._compute_trace_signature(
+            {"content_hash": manifest["document_hash"]}, results
+        )
+        return signature == manifest["trace_signature"]
+
+    def _load(self, archive_ref: str) -> Tuple[Dict, bytes]:
+        """(manifest, raw JSONL bytes) for archive_ref."""
+        if self._is_segment_ref(archive_ref):
+            return self.segments.read(archive_ref)
+
+        with open(archive_ref, 'r') as f:
+            manifest = json.load(f)
+        with open(manifest["extraction_file"], 'rb') as f:
+            return manifest, f.read()
+
+    def _resolve(self, manifest: Dict, stored: bytes) -> Tuple[List[Dict], bytes]:
+        """(results, canonical JSONL bytes) from stored bytes."""
+        results = self._parse_results(stored)
+        if not manifest.get("dedup"):
+            return results, stored
+        results = [self._expand_blobs(r) for r in results]
+        payload = b''.join(
+            line + b'\n' for line in self._canonical_lines(results)
+        )
+        return results, payload
+
+    def _is_segment_ref(self, archive_ref: str) -> bool:
+        return archive_ref.startswith("ext_") and not archive_ref.endswith(".json")
+
+    def _parse_results(self, payload: bytes) -> List[Dict]:
+        return [
+            json.loads(line) for line in payload.splitlines() if line.strip()
+        ]
+
     def _compute_trace_signature(
         self,
         document_data: Dict,
@@ -91,19 +617,14 @@ class EvidenceArchive:
 
         Combines document hash + results hash for tamper detection.
         """
-        doc_hash = document_data["content_hash"]
-        results_json = json.dumps(results, sort_keys=True)
-        results_hash = hashlib.sha256(
-            results_json.encode('utf-8')
-        ).hexdigest()
-
-        combined = f"{doc_hash}:{results_hash}"
-        return hashlib.sha256(combined.encode('utf-8')).hexdigest()
-
-    def _hash_file(self, path: Path) -> str:
-        """Compute SHA-256 hash of file."""
-        sha256 = hashlib.sha256()
-        with open(path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+        return self._trace_signature(
+            document_data["content_hash"], self._canonical_lines(results)
+        )
+
+    def _canonical_lines(self, results: List[Dict]) -> List[bytes]:
+        """Serialize each result once (sorted keys) as UTF-8 bytes."""
+        return [canonical_bytes(result) for result in results]
+
+    def _trace_signature(self, doc_hash: str, lines: List[bytes]) -> str:
+        """Trace signature from canonical result lines (engine.hashing)."""
+        return hashing.trace_signature(doc_hash, lines)
@@ -5,20 +5,89 @@ Generates:
 - Audit logs (execution-time)
 - Defense briefs (incident-time)
 - Regulatory reports (on-demand)
+
+Audit records form a hash chain: each record carries the SHA-256 of its
+predecessor's stored line (prev_hash). With a checkpoint key, every
+checkpoint_every records an HMAC-signed checkpoint of the chain head is
+appended to {audit_dir}/audit_checkpoints.jsonl, and AuditVerifier checks
+the chain from the newest valid checkpoint forward.
+
+Usage:
+    AUDIT_CHECKPOINT_KEY=... python -m engine audit verify --audit-dir audit
 """
-import json
+import argparse
 import hashlib
+import hmac
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+from engine.hashing import (
+    HashMemo, canonical_bytes, context_hash, json_hash, proof_bundle_hash
+)
+from engine.rollups import AuditRollups, hour_key, legacy_records
+from engine.segments import SegmentLog
+from engine.storage import unique_stem, write_atomic
 
-class AuditLogger:
-    """Generate audit-grade logs for admission decisions."""
 
-    def __init__(self, audit_dir: str = "audit"):
+GENESIS_HASH = "0" * 64
+CHECKPOINTS_FILE = "audit_checkpoints.jsonl"
+ROLLUPS_FILE = "rollups.sqlite"
+# Records per bulk defense-brief task
+BRIEF_CHUNK = 2000
+# Checkpoint signing key (used when none is passed explicitly)
+KEY_ENV = "AUDIT_CHECKPOINT_KEY"
+
+
+class AuditLogger:
+    """
+    Generate audit-grade logs for admission decisions.
+
+    Records are compact JSON lines in an append-only segment log
+    ({audit_dir}/audit_log_{seq:06d}.seg, rotated by size and age) with an
+    id → offset index beside each segment. The audit_id is the record's
+    segment id, "audit_{seq:06d}_{record:08d}", so it is unique without
+    coordination and locates the record directly. Several processes may
+    log to the same directory.
+
+    Each record's prev_hash links it to its predecessor; with a
+    checkpoint_key (or $AUDIT_CHECKPOINT_KEY), a signed checkpoint is
+    written every checkpoint_every records. rollups=True keeps hourly
+    decision counts in {audit_dir}/rollups.sqlite (engine.rollups).
+    """
+
+    def __init__(
+        self,
+        audit_dir: str = "audit",
+        max_segment_bytes: int = 16 * 1024 * 1024,
+        max_segment_age: Optional[float] = 24 * 3600,
+        compression: Optional[str] = None,
+        checkpoint_key: Optional[bytes] = None,
+        checkpoint_every: int = 1000,
+        rollups: bool = False
+    ):
         self.audit_dir = Path(audit_dir)
-        self.audit_dir.mkdir(exist_ok=True)
+        self.audit_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_key = checkpoint_key or _env_key()
+        self.checkpoint_every = checkpoint_every
+        self.log = SegmentLog(
+            str(self.audit_dir),
+            prefix="audit_log",
+            id_prefix="audit",
+            max_segment_bytes=max_segment_bytes,
+            max_segment_age=max_segment_age,
+            compression=compression
+        )
+        self.rollups = None
+        if rollups:
+            self.rollups = AuditRollups(str(self.audit_dir / ROLLUPS_FILE))
+            with self.log.lock:
+                self.rollups.sync(self.log)
 
     def log_decision(
         self,
@@ -36,11 +105,111 @@ class AuditLogger:
 
         Returns: audit_id
         """
+        return self.log_decisions([{
+            "action": action,
+            "context": context,
+            "decision": decision,
+            "decision_maker": decision_maker,
+            "conditions_proven": conditions_proven,
+            "token": token,
+            "blocked_at": blocked_at,
+            "reason": reason
+        }])[0]
+
+    def log_decisions(self, decisions: List[Dict]) -> List[str]:
+        """
+        Log a batch of decisions (log_decision keyword dicts) in one append.
+
+        Returns: audit_ids, in input order
+        """
+        records = [self._build_record(**d) for d in decisions]
+        if not records:
+            return []
+
+        # The lock spans reading the chain head and appending after it
+        with self.log.lock:
+            last = self.log.last_entry()
+            if self.rollups:
+                self.rollups.sync(self.log, last)
+            prev_hash = self._entry_hash(last) if last else GENESIS_HASH
+            position = last.get("chain", -1) + 1 if last else 0
+            first = position
+
+            items = []
+            for record in records:
+                record["prev_hash"] = prev_hash
+                data = _encode_record(record)
+                prev_hash = hashlib.sha256(data).hexdigest()
+                items.append((data, {
+                    "timestamp": record["timestamp"],
+                    "hash": prev_hash,
+                    "chain": position
+                }))
+                position += 1
+            entries = self.log.append_many(items)
+            if self.rollups:
+                self.rollups.apply(records, entries[-1]["id"])
+
+            every = self.checkpoint_every
+            if self.checkpoint_key and position // every > first // every:
+                self._write_checkpoint(entries[-1])
+
+        # Compress a rolled-over segment now that other writers can append
+        self.log.seal_rolled()
+        return [entry["id"] for entry in entries]
+
+    def _entry_hash(self, entry: Dict) -> str:
+        """Chain hash of a logged record (read back if not indexed)."""
+        if "hash" in entry:
+            return entry["hash"]
+        return hashlib.sha256(self.log.read_entry(entry)).hexdigest()
+
+    def _write_checkpoint(self, entry: Dict):
+        checkpoint = {
+            "audit_id": entry["id"],
+            "records": entry["chain"] + 1,
+            "hash": entry["hash"],
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        checkpoint["signature"] = _sign(self.checkpoint_key, checkpoint)
+        line = json.dumps(checkpoint, separators=(',', ':')) + '\n'
+        with open(self.audit_dir / CHECKPOINTS_FILE, 'ab') as f:
+            f.write(line.encode('utf-8'))
+
+    def read(self, audit_id: str) -> Dict:
+        """Audit record for audit_id (FileNotFoundError if unknown)."""
+        try:
+            entry, data = self.log.read(audit_id)
+        except (KeyError, ValueError, FileNotFoundError):
+            raise FileNotFoundError(f"Audit log not found: {audit_id}")
+        return _decode_record(entry, data)
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Every audit record, oldest first."""
+        for seq in self.log.segments():
+            for entry, data in self.log.iter_records(seq):
+                if data is not None:
+                    yield _decode_record(entry, data)
+
+    def _build_record(
+        self,
+        action: str,
+        context: Dict,
+        decision: str,
+        decision_maker: str,
+        conditions_proven: Optional[Dict] = None,
+        token: Optional[Dict] = None,
+        blocked_at: Optional[str] = None,
+        reason: Optional[str] = None
+    ) -> Dict:
         timestamp = datetime.now(timezone.utc).isoformat()
-        context_hash = self._compute_context_hash(action, context, decision_maker)
+        # The context is serialized once for both of its digests
+        memo = HashMemo()
+        context_hash = self._compute_context_hash(
+            action, context, decision_maker, memo
+        )
 
-        audit_record = {
-            "audit_id": f"audit_{context_hash[:16]}_{int(datetime.now(timezone.utc).timestamp())}",
+        return {
             "timestamp": timestamp,
             "decision_context_hash": context_hash,
             "action_requested": action,
@@ -57,74 +226,74 @@ class AuditLogger:
             "attachments": {
                 "admission_token_id": token.get("token_id") if token else None,
                 "proof_bundle_ref": self._create_proof_bundle(
-                    context, conditions_proven
+                    context, conditions_proven, memo
                 )
             }
         }
 
-        # Write audit log
-        audit_path = self.audit_dir / f"{audit_record['audit_id']}.json"
-        with open(audit_path, 'w') as f:
-            json.dump(audit_record, f, indent=2)
-
-        return audit_record["audit_id"]
-
     def _compute_context_hash(
         self,
         action: str,
         context: Dict,
-        decision_maker: str
+        decision_maker: str,
+        memo: Optional[HashMemo] = None
     ) -> str:
         """Compute context hash for audit trail."""
-        data = f"{action}:{json.dumps(context, sort_keys=True)}:{decision_maker}"
-        return hashlib.sha256(data.encode()).hexdigest()
+        return context_hash(action, context, decision_maker, memo)
 
     def _create_proof_bundle(
         self,
         context: Dict,
-        conditions: Optional[Dict]
+        conditions: Optional[Dict],
+        memo: Optional[HashMemo] = None
     ) -> str:
         """Create proof bundle reference."""
-        bundle_data = {
-            "context": context,
-            "conditions": conditions or {}
-        }
-        bundle_hash = hashlib.sha256(
-            json.dumps(bundle_data, sort_keys=True).encode()
-        ).hexdigest()
-        return f"proof_{bundle_hash[:16]}"
+        return f"proof_{proof_bundle_hash(context, conditions, memo)[:16]}"
 
 
-class DefenseBriefGenerator:
-    """Generate legal defense briefs from audit logs."""
+def _env_key() -> Optional[bytes]:
+    key = os.environ.get(KEY_ENV)
+    return key.encode('utf-8') if key else None
 
-    def generate(self, audit_id: str, audit_dir: str = "audit") -> str:
-        """Generate defense brief from audit log."""
-        audit_path = Path(audit_dir) / f"{audit_id}.json"
 
-        if not audit_path.exists():
-            raise FileNotFoundError(f"Audit log not found: {audit_id}")
+def _sign(key: bytes, checkpoint: Dict) -> str:
+    """HMAC-SHA256 over the checkpoint's canonical JSON (sans signature)."""
+    body = {k: v for k, v in checkpoint.items() if k != "signature"}
+    message = canonical_bytes(body, compact=True)
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
 
-        with open(audit_path, 'r') as f:
-            audit = json.load(f)
 
-        brief = self._build_brief(audit)
+def _encode_record(record: Dict) -> bytes:
+    """One compact JSON line (the audit_id is the record's position)."""
+    return (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
 
-        # Write brief
-        brief_path = Path(audit_dir) / f"defense_brief_{audit_id}.md"
-        with open(brief_path, 'w') as f:
-            f.write(brief)
 
-        return str(brief_path)
+def _decode_record(entry: Dict, data) -> Dict:
+    record = json.loads(bytes(data))
+    return dict({"audit_id": entry["id"]}, **record)
 
-    def _build_brief(self, audit: Dict) -> str:
-        """Build defense brief markdown."""
-        decision_verb = "ADMITTED" if audit["decision"] == "ADMIT" else "STOPPED"
 
-        return f"""# Conditional Admission Defense Brief
+def load_audit(audit_id: str, audit_dir: str = "audit") -> Dict:
+    """
+    Audit record by id from audit_dir.
+
+    Reads the segment log, or a legacy one-file-per-decision
+    {audit_id}.json written before the log existed.
+    """
+    legacy_path = Path(audit_dir) / f"{audit_id}.json"
+    if legacy_path.exists():
+        with open(legacy_path, 'r') as f:
+            return json.load(f)
+    if not Path(audit_dir).is_dir():
+        raise FileNotFoundError(f"Audit log not found: {audit_id}")
+    return AuditLogger(audit_dir).read(audit_id)
 
-**Incident ID**: {audit['audit_id']}
-**Timestamp**: {audit['timestamp']}
+
+BRIEF_TEMPLATE = """<!-- audit-record-sha256: {record_hash} -->
+# Conditional Admission Defense Brief
+
+**Incident ID**: {audit_id}
+**Timestamp**: {timestamp}
 **Decision**: {decision_verb}
 
 ---
@@ -134,7 +303,7 @@ class DefenseBriefGenerator:
 | Requirement | Status |
 |-------------|--------|
 | DEFAULT: STOP applied | ✅ Yes |
-| ALL conditions proven | {"✅ Yes" if audit['decision'] == 'ADMIT' else "❌ No"} |
+| ALL conditions proven | {all_proven} |
 | Scope limited | ✅ Yes |
 | Reuse prohibited | ✅ Yes |
 
@@ -142,21 +311,21 @@ class DefenseBriefGenerator:
 
 ## 2. Decision Path
 
-**Action Requested**: {audit['action_requested']}
+**Action Requested**: {action_requested}
 
-**Decision Maker**: {audit['decision_maker_id']}
+**Decision Maker**: {decision_maker_id}
 
 **Conditions Evaluated**:
 ```json
-{json.dumps(audit['conditions_proven'], indent=2)}
+{conditions_json}
 ```
 
-**Alternative Paths**: {"Evaluated" if audit.get('conditions_proven', {}).get('alternatives') else "Not applicable (STOPPED before evaluation)"}
+**Alternative Paths**: {alternatives}
 
 **Exclusion Basis (Negative Proof)**:
-- Decision: {audit['decision']}
-- Blocked at: {audit.get('blocked_at', 'N/A')}
-- Reason: {audit.get('reason', 'N/A')}
+- Decision: {decision}
+- Blocked at: {blocked_at}
+- Reason: {reason}
 
 ---
 
@@ -164,11 +333,11 @@ class DefenseBriefGenerator:
 
 **STOP Triggers Defined**: Yes (per ADMISSION_CONSTITUTION.md)
 
-**Trigger Activated**: {"Yes" if audit['decision'] == 'STOP' else "No"}
+**Trigger Activated**: {trigger_activated}
 
-**Activation Point**: {audit.get('blocked_at', 'N/A')}
+**Activation Point**: {blocked_at}
 
-**Log Reference**: {audit['audit_id']}
+**Log Reference**: {audit_id}
 
 ---
 
@@ -178,62 +347,335 @@ This system does not guarantee outcomes.
 
 **This system guarantees**:
 - Stoppability (DEFAULT: STOP enforced)
-- Traceability (decision_maker: {audit['decision_maker_id']})
+- Traceability (decision_maker: {decision_maker_id})
 - Scope containment (context-bound, reuse forbidden)
 
 ---
 
 ## Attachments
 
-- Audit Log: `{audit['audit_id']}.json`
-- Admission Token: {audit['attachments'].get('admission_token_id', 'N/A')}
-- Proof Bundle: {audit['attachments']['proof_bundle_ref']}
+- Audit Log: `{audit_id}`
+- Admission Token: {admission_token_id}
+- Proof Bundle: {proof_bundle_ref}
 
 ---
 
-**Generated**: {datetime.now(timezone.utc).isoformat()}
+**Generated**: {generated_at}
 **Status**: Counsel-ready
 """
 
 
-class RegulatoryReportGenerator:
-    """Generate regulatory compliance reports."""
+class DefenseBriefGenerator:
+    """
+    Generate legal defense briefs from audit logs.
+
+    A brief's first line records the SHA-256 of the audit record it was
+    rendered from; generate_many() leaves a brief alone while that hash
+    still matches.
+    """
 
-    def generate(self, audit_ids: List[str], audit_dir: str = "audit") -> str:
-        """Generate regulatory report from multiple audit logs."""
-        audits = []
+    def generate(self, audit_id: str, audit_dir: str = "audit") -> str:
+        """Generate defense brief from audit log."""
+        audit = load_audit(audit_id, audit_dir)
+        record_hash = _record_hash(audit)
+
+        brief = self._build_brief(audit, record_hash)
+
+        # Write brief
+        brief_path = _brief_path(audit_dir, audit_id)
+        write_atomic(brief_path, brief)
+
+        return str(brief_path)
+
+    def generate_many(
+        self,
+        audit_ids: Iterable[str],
+        audit_dir: str = "audit",
+        workers: Optional[int] = None,
+        force: bool = False
+    ) -> Dict:
+        """
+        Generate briefs for many audit records.
+
+        Ids are grouped by segment and each group is read in one
+        sequential pass over the segment (in parallel across groups);
+        legacy {audit_id}.json records are read directly. Briefs already
+        rendered from the same record hash are skipped unless force.
+
+        Returns: {"generated", "skipped", "missing", "paths"}
+        """
+        generated_at = datetime.now(timezone.utc).isoformat()
+        result = {"generated": 0, "skipped": 0, "missing": [], "paths": {}}
+
+        # 1. Group segment ids into per-segment tasks; legacy ids inline
+        log = SegmentLog(audit_dir, prefix="audit_log", id_prefix="audit")
+        by_segment: Dict[int, List[int]] = {}
         for audit_id in audit_ids:
-            audit_path = Path(audit_dir) / f"{audit_id}.json"
-            if audit_path.exists():
-                with open(audit_path, 'r') as f:
-                    audits.append(json.load(f))
+            legacy_path = Path(audit_dir) / f"{audit_id}.json"
+            if legacy_path.exists():
+                audit = load_audit(audit_id, audit_dir)
+                _merge_briefs(result, _write_briefs(
+                    self, audit_dir, [(audit, _record_hash(audit))],
+                    generated_at, force
+                ))
+                continue
+            try:
+                seq, record = log.parse_id(audit_id)
+            except (KeyError, ValueError):
+                result["missing"].append(audit_id)
+                continue
+            by_segment.setdefault(seq, []).append(record)
+
+        tasks = []
+        for seq, records in sorted(by_segment.items()):
+            records = sorted(set(records))
+            for i in range(0, len(records), BRIEF_CHUNK):
+                tasks.append((audit_dir, seq, records[i:i + BRIEF_CHUNK],
+                              generated_at, force))
+
+        # 2. Render per task, in worker processes when there are several
+        workers = min(workers or os.cpu_count() or 1, len(tasks) or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for partial in pool.map(_briefs_for_segment, *zip(*tasks)):
+                    _merge_briefs(result, partial)
+        else:
+            for partial in itertools.starmap(_briefs_for_segment, tasks):
+                _merge_briefs(result, partial)
+
+        return result
+
+    def _build_brief(
+        self,
+        audit: Dict,
+        record_hash: str,
+        generated_at: Optional[str] = None
+    ) -> str:
+        """Build defense brief markdown."""
+        decision = audit['decision']
+        conditions = audit.get('conditions_proven', {})
+        return BRIEF_TEMPLATE.format(
+            record_hash=record_hash,
+            audit_id=audit['audit_id'],
+            timestamp=audit['timestamp'],
+            decision_verb="ADMITTED" if decision == "ADMIT" else "STOPPED",
+            all_proven="✅ Yes" if decision == 'ADMIT' else "❌ No",
+            action_requested=audit['action_requested'],
+            decision_maker_id=audit['decision_maker_id'],
+            conditions_json=json.dumps(audit['conditions_proven'], indent=2),
+            alternatives="Evaluated" if conditions.get('alternatives')
+            else "Not applicable (STOPPED before evaluation)",
+            decision=decision,
+            blocked_at=audit.get('blocked_at', 'N/A'),
+            reason=audit.get('reason', 'N/A'),
+            trigger_activated="Yes" if decision == 'STOP' else "No",
+            admission_token_id=audit['attachments'].get(
+                'admission_token_id', 'N/A'
+            ),
+            proof_bundle_ref=audit['attachments']['proof_bundle_ref'],
+            generated_at=generated_at or datetime.now(timezone.utc).isoformat()
+        )
+
+
+def _brief_path(audit_dir: str, audit_id: str) -> Path:
+    return Path(audit_dir) / f"defense_brief_{audit_id}.md"
+
+
+def _record_hash(audit: Dict) -> str:
+    """SHA-256 of the audit record's canonical JSON."""
+    return json_hash(audit)
+
+
+def _brief_is_current(path: Path, record_hash: str) -> bool:
+    """True if path is a brief rendered from the record with this hash."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            first_line = f.readline()
+    except FileNotFoundError:
+        return False
+    return first_line.strip() == f"<!-- audit-record-sha256: {record_hash} -->"
+
+
+def _write_briefs(
+    generator: "DefenseBriefGenerator",
+    audit_dir: str,
+    audits: Iterable[Tuple[Dict, str]],
+    generated_at: str,
+    force: bool
+) -> Dict:
+    result = {"generated": 0, "skipped": 0, "missing": [], "paths": {}}
+    for audit, record_hash in audits:
+        path = _brief_path(audit_dir, audit['audit_id'])
+        result["paths"][audit['audit_id']] = str(path)
+        if not force and _brief_is_current(path, record_hash):
+            result["skipped"] += 1
+            continue
+        write_atomic(path, generator._build_brief(audit, record_hash,
+                                                  generated_at))
+        result["generated"] += 1
+    return result
+
+
+def _merge_briefs(result: Dict, partial: Dict):
+    result["generated"] += partial["generated"]
+    result["skipped"] += partial["skipped"]
+    result["missing"].extend(partial["missing"])
+    result["paths"].update(partial["paths"])
+
+
+def _briefs_for_segment(
+    audit_dir: str,
+    seq: int,
+    records: List[int],
+    generated_at: str,
+    force: bool
+) -> Dict:
+    """Briefs for sorted record numbers of one segment (worker process)."""
+    log = SegmentLog(audit_dir, prefix="audit_log", id_prefix="audit")
+    wanted = set(records)
+
+    def audits():
+        if not log.index_path(seq).exists():
+            return
+        for entry, data in log.iter_records(seq, records[0]):
+            if entry["record"] in wanted and data is not None:
+                wanted.discard(entry["record"])
+                audit = _decode_record(entry, data)
+                yield audit, _record_hash(audit)
+                if not wanted:
+                    return
+
+    result = _write_briefs(DefenseBriefGenerator(), audit_dir, audits(),
+                           generated_at, force)
+    result["missing"].extend(log.make_id(seq, r) for r in sorted(wanted))
+    return result
+
 
-        report = self._build_report(audits)
+class RegulatoryReportGenerator:
+    """
+    Generate regulatory compliance reports.
+
+    Counts are streamed: each audit segment is scanned sequentially (in
+    parallel across segments) into a small counter dict, and the partial
+    counters are merged. Memory grows with the number of segments and
+    block points, not with the number of records. Legacy {audit_id}.json
+    records written before the log count as one more segment, "legacy".
+    """
 
-        # Write report
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        report_path = Path(audit_dir) / f"regulatory_report_{timestamp}.md"
-        with open(report_path, 'w') as f:
-            f.write(report)
+    def generate(
+        self,
+        audit_ids: Optional[List[str]] = None,
+        audit_dir: str = "audit",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        workers: Optional[int] = None,
+        recompute: bool = False
+    ) -> str:
+        """
+        Generate regulatory report.
+
+        With audit_ids, reports exactly those records; otherwise every
+        record in audit_dir whose timestamp is in [since, until) (ISO 8601
+        prefixes, both optional). Whole-hour windows are read from the
+        rollups when audit_dir has them; recompute=True (or a finer
+        window) streams the log instead.
+        """
+        if audit_ids is not None:
+            stats = _new_stats()
+            for audit_id in audit_ids:
+                try:
+                    audit = load_audit(audit_id, audit_dir)
+                except FileNotFoundError:
+                    continue
+                _count(stats, audit)
+            references = [f"- {audit_id}" for audit_id in stats["ids"]]
+        elif not recompute and self._rollups_cover(audit_dir, since, until):
+            rollups = self._synced_rollups(audit_dir)
+            stats = rollups.totals(since, until)
+            rollups.close()
+            references = [
+                f"- Rollups: {Path(audit_dir) / ROLLUPS_FILE} "
+                f"({stats['hours']} hourly buckets)"
+            ]
+        else:
+            stats = self.aggregate(audit_dir, since, until, workers)
+            references = [
+                f"- {segment}: {s['first']} … {s['last']} ({s['count']} records)"
+                for segment, s in sorted(stats["segments"].items())
+            ]
+
+        report = self._build_report(stats, references)
+
+        # Write report under a name no concurrent generator holds
+        timestamp = datetime.now(timezone.utc).isoformat()
+        while True:
+            stem = unique_stem(timestamp)
+            report_path = Path(audit_dir) / f"regulatory_report_{stem}.md"
+            try:
+                write_atomic(report_path, report, exclusive=True)
+                break
+            except FileExistsError:
+                continue
 
         return str(report_path)
 
-    def _build_report(self, audits: List[Dict]) -> str:
+    def _rollups_cover(
+        self,
+        audit_dir: str,
+        since: Optional[str],
+        until: Optional[str]
+    ) -> bool:
+        if not (Path(audit_dir) / ROLLUPS_FILE).exists():
+            return False
+        return all(hour_key(v) is not None for v in (since, until) if v)
+
+    def _synced_rollups(self, audit_dir: str) -> AuditRollups:
+        """Rollups with any records not yet applied folded in."""
+        log = SegmentLog(audit_dir, prefix="audit_log", id_prefix="audit")
+        rollups = AuditRollups(str(Path(audit_dir) / ROLLUPS_FILE))
+        with log.lock:
+            rollups.sync(log)
+        return rollups
+
+    def aggregate(
+        self,
+        audit_dir: str = "audit",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        workers: Optional[int] = None
+    ) -> Dict:
+        """Merged decision counters for records in [since, until)."""
+        log = SegmentLog(audit_dir, prefix="audit_log", id_prefix="audit")
+        seqs = log.segments()
+        workers = min(workers or os.cpu_count() or 1, len(seqs) or 1)
+
+        stats = _new_stats()
+        args = [(audit_dir, seq, since, until) for seq in seqs]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for partial in pool.map(_aggregate_segment, *zip(*args)):
+                    _merge_stats(stats, partial)
+        else:
+            for partial in itertools.starmap(_aggregate_segment, args):
+                _merge_stats(stats, partial)
+        _merge_stats(stats, _aggregate_legacy(audit_dir, since, until))
+        return stats
+
+    def _build_report(self, stats: Dict, references: List[str]) -> str:
         """Build regulatory report markdown."""
-        total = len(audits)
-        admitted = sum(1 for a in audits if a['decision'] == 'ADMIT')
-        stopped = sum(1 for a in audits if a['decision'] == 'STOP')
+        total = stats["total"]
+        admitted = stats["admitted"]
+        stopped = stats["stopped"]
+        block_points = stats["block_points"]
 
-        # Count block points
-        block_points = {}
-        for audit in audits:
-            if audit['decision'] == 'STOP':
-                bp = audit.get('blocked_at', 'Unknown')
-                block_points[bp] = block_points.get(bp, 0) + 1
+        block_rows = ''.join(
+            f"| {bp} | {count} | {count/stopped*100:.1f}% |\n"
+            for bp, count in block_points.items()
+        ) if block_points else "| N/A | 0 | 0% |"
 
         return f"""# Regulatory Compliance Report
 
-**Period**: {audits[0]['timestamp'] if audits else 'N/A'} to {audits[-1]['timestamp'] if audits else 'N/A'}
+**Period**: {stats['first'] or 'N/A'} to {stats['last'] or 'N/A'}
 **Total Decisions**: {total}
 **Admitted**: {admitted}
 **Stopped**: {stopped}
@@ -265,7 +707,7 @@ class RegulatoryReportGenerator:
 
 | Block Point | Count | Percentage |
 |-------------|-------|------------|
-{''.join(f"| {bp} | {count} | {count/stopped*100:.1f}% |\n" for bp, count in block_points.items()) if block_points else "| N/A | 0 | 0% |"}
+{block_rows}
 
 ---
 
@@ -285,7 +727,7 @@ This system **DOES** guarantee:
 
 ## Audit Trail References
 
-{chr(10).join(f"- {a['audit_id']}" for a in audits)}
+{chr(10).join(references)}
 
 ---
 
@@ -293,3 +735,268 @@ This system **DOES** guarantee:
 **Status**: Regulator-readable
 **Constitution**: ADMISSION_CONSTITUTION.md v1.0
 """
+
+
+def _new_stats() -> Dict:
+    return {
+        "total": 0, "admitted": 0, "stopped": 0,
+        "block_points": {},
+        "first": None, "last": None,   # min / max timestamp
+        "segments": {},                # segment → {first, last, count}
+        "ids": []                      # explicit-id reports only
+    }
+
+
+def _count(stats: Dict, audit: Dict, segment: Optional[str] = None):
+    """Add one audit record to stats."""
+    stats["total"] += 1
+    if audit['decision'] == 'ADMIT':
+        stats["admitted"] += 1
+    elif audit['decision'] == 'STOP':
+        stats["stopped"] += 1
+        bp = audit.get('blocked_at', 'Unknown')
+        stats["block_points"][bp] = stats["block_points"].get(bp, 0) + 1
+
+    timestamp = audit['timestamp']
+    if stats["first"] is None or timestamp < stats["first"]:
+        stats["first"] = timestamp
+    if stats["last"] is None or timestamp > stats["last"]:
+        stats["last"] = timestamp
+
+    if segment is None:
+        stats["ids"].append(audit['audit_id'])
+        return
+    span = stats["segments"].setdefault(
+        segment, {"first": audit['audit_id'], "last": None, "count": 0}
+    )
+    span["last"] = audit['audit_id']
+    span["count"] += 1
+
+
+def _merge_stats(stats: Dict, partial: Dict):
+    for key in ("total", "admitted", "stopped"):
+        stats[key] += partial[key]
+    for bp, count in partial["block_points"].items():
+        stats["block_points"][bp] = stats["block_points"].get(bp, 0) + count
+    for key, pick in (("first", min), ("last", max)):
+        values = [v for v in (stats[key], partial[key]) if v is not None]
+        stats[key] = pick(values) if values else None
+    stats["segments"].update(partial["segments"])
+
+
+def _aggregate_segment(
+    audit_dir: str,
+    seq: int,
+    since: Optional[str],
+    until: Optional[str]
+) -> Dict:
+    """Counters for one audit segment (runs in a worker process)."""
+    log = SegmentLog(audit_dir, prefix="audit_log", id_prefix="audit")
+    segment = log.segment_name(seq)
+    stats = _new_stats()
+    for entry, data in log.iter_records(seq):
+        # Index entries carry the timestamp: skip without decoding
+        timestamp = entry.get("timestamp")
+        if timestamp is not None and (
+            (since and timestamp < since) or (until and timestamp >= until)
+        ):
+            continue
+        if data is None:
+            continue
+        audit = _decode_record(entry, data)
+        if (since and audit['timestamp'] < since) or \
+                (until and audit['timestamp'] >= until):
+            continue
+        _count(stats, audit, segment)
+    return stats
+
+
+def _aggregate_legacy(
+    audit_dir: str,
+    since: Optional[str],
+    until: Optional[str]
+) -> Dict:
+    """Counters for legacy {audit_id}.json records (segment "legacy")."""
+    stats = _new_stats()
+    for audit in legacy_records(audit_dir):
+        if (since and audit['timestamp'] < since) or \
+                (until and audit['timestamp'] >= until):
+            continue
+        _count(stats, audit, "legacy")
+    return stats
+
+
+class AuditVerifier:
+    """
+    Verify the audit hash chain.
+
+    By default the walk starts at the newest checkpoint whose signature
+    is valid: that record must still hash to the checkpointed value, and
+    every later record must link to its predecessor. Work is proportional
+    to the records written since that checkpoint. full=True walks from
+    the first record and also checks every signed checkpoint on the way.
+
+    Records removed after the newest checkpoint cannot be detected; any
+    other deletion, reordering or modification breaks the chain.
+    """
+
+    def __init__(
+        self,
+        audit_dir: str = "audit",
+        checkpoint_key: Optional[bytes] = None
+    ):
+        self.audit_dir = Path(audit_dir)
+        self.checkpoint_key = checkpoint_key or _env_key()
+        self.log = SegmentLog(str(self.audit_dir), prefix="audit_log",
+                              id_prefix="audit")
+
+    def run(self, full: bool = False) -> Dict:
+        started_at = datetime.now(timezone.utc).isoformat()
+        summary = {"checked": 0, "ok": 0, "broken": 0}
+        errors: List[Dict] = []
+
+        # 1. Signed checkpoints (a bad signature is itself a finding)
+        checkpoints = self._load_checkpoints(errors)
+
+        # 2. Starting point: the newest trusted checkpoint, or genesis
+        anchor = checkpoints[-1] if checkpoints and not full else None
+        start = ((1, 0), GENESIS_HASH) if anchor is None \
+            else self._resume_from(anchor, errors)
+
+        # 3. Walk the chain forward
+        head = None
+        if start is not None:
+            position, prev_hash = start
+            known = {c["audit_id"]: c["hash"] for c in checkpoints} \
+                if full else {}
+            head = self._walk(position, prev_hash, known, summary, errors)
+
+        return {
+            "audit_dir": str(self.audit_dir),
+            "started_at": started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "mode": "full" if full else "checkpoint",
+            "checkpoint": anchor,
+            "head": head,
+            "summary": summary,
+            "errors": errors
+        }
+
+    def _load_checkpoints(self, errors: List[Dict]) -> List[Dict]:
+        """Checkpoints with a valid signature, oldest first."""
+        path = self.audit_dir / CHECKPOINTS_FILE
+        if not path.exists():
+            return []
+        if not self.checkpoint_key:
+            errors.append({"audit_id": None,
+                           "error": f"checkpoints present but no key "
+                                    f"(set {KEY_ENV})"})
+            return []
+
+        valid = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    checkpoint = json.loads(line)
+                except ValueError:
+                    break  # torn final line
+                if hmac.compare_digest(
+                    checkpoint.get("signature", ""),
+                    _sign(self.checkpoint_key, checkpoint)
+                ):
+                    valid.append(checkpoint)
+                else:
+                    errors.append({"audit_id": checkpoint.get("audit_id"),
+                                   "error": "bad checkpoint signature"})
+        return valid
+
+    def _resume_from(self, checkpoint: Dict, errors: List[Dict]):
+        """((seq, record) after the checkpoint, its hash), or None."""
+        audit_id = checkpoint["audit_id"]
+        try:
+            _, data = self.log.read(audit_id)
+        except (KeyError, FileNotFoundError):
+            errors.append({"audit_id": audit_id,
+                           "error": "checkpoint record missing"})
+            return None
+
+        if hashlib.sha256(data).hexdigest() != checkpoint["hash"]:
+            errors.append({"audit_id": audit_id,
+                           "error": "checkpoint record altered"})
+        seq, record = self.log.parse_id(audit_id)
+        return (seq, record + 1), checkpoint["hash"]
+
+    def _walk(
+        self,
+        position,
+        prev_hash: str,
+        known: Dict[str, str],
+        summary: Dict,
+        errors: List[Dict]
+    ) -> str:
+        """Check links from position onward; returns the chain head hash."""
+        first_seq, first_record = position
+        for seq in self.log.segments():
+            if seq < first_seq:
+                continue
+            start = first_record if seq == first_seq else 0
+            for entry, data in self.log.iter_records(seq, start):
+                summary["checked"] += 1
+                if data is None:
+                    summary["broken"] += 1
+                    errors.append({"audit_id": entry["id"],
+                                   "error": "record unreadable"})
+                    continue
+
+                actual = hashlib.sha256(data).hexdigest()
+                problems = []
+                if json.loads(bytes(data)).get("prev_hash") != prev_hash:
+                    problems.append("chain broken before this record")
+                if entry.get("hash", actual) != actual:
+                    problems.append("record altered")
+                if known.get(entry["id"], actual) != actual:
+                    problems.append("differs from signed checkpoint")
+
+                if problems:
+                    summary["broken"] += 1
+                    errors.extend({"audit_id": entry["id"], "error": p}
+                                  for p in problems)
+                else:
+                    summary["ok"] += 1
+                prev_hash = actual
+        return prev_hash
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verify the audit log hash chain."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify", help="Check chain links and checkpoints")
+    verify.add_argument("--audit-dir", default="audit")
+    verify.add_argument("--full", action="store_true",
+                        help="Walk from the first record, not the newest "
+                             "checkpoint")
+    verify.add_argument("--key-file",
+                        help=f"Checkpoint key file (default: ${KEY_ENV})")
+    args = parser.parse_args()
+
+    key = None
+    if args.key_file:
+        with open(args.key_file, 'rb') as f:
+            key = f.read().strip()
+
+    report = AuditVerifier(args.audit_dir, key).run(full=args.full)
+    print(json.dumps(report, indent=2))
+
+    summary = report["summary"]
+    print(
+        f"[AUDIT] checked={summary['checked']} ok={summary['ok']} "
+        f"broken={summary['broken']} errors={len(report['errors'])}",
+        file=sys.stderr
+    )
+    sys.exit(1 if report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""
+Batch runner: stream a JSONL file of requests through worker processes.
+
+Each input line is one job:
+- extraction: {"path": ...} or {"content": ..., "source_id": ...}
+              optional "dry_run": bool, "timeout": seconds
+- rag_read:   {"action": "rag_read", "request": {...}, "corpus_dir": ...}
+              or a bare rag_read payload (has "query")
+
+With corpus_index, workers answer rag_read jobs on the default corpus
+from its n-gram index (execution.corpus_index). The postings file is
+memory-mapped, so all workers share one copy, and a compaction run
+elsewhere is picked up at the next query. With rank ("tf" or "bm25"),
+rag_read evidence is the top-scoring files instead of the first found.
+
+Each output line is one result:
+    {"line": N, "kind": "extract" | "rag_read", "ok": true, "result": {...}}
+    {"line": N, "kind": ..., "ok": false, "error": "..."}
+
+Input is read lazily and at most `window` jobs are in flight, so memory
+stays constant in the number of lines. The committed line number (every
+line up to it has its result written) is checkpointed, so an interrupted
+run can resume. On resume, a file output is truncated back to the
+checkpointed offset, so input-order runs emit each line exactly once. In
+completion order, results past the committed line may already have been
+written before the checkpoint; they are re-emitted on resume with the
+same "line" number.
+
+The journal names only durable evidence: with --durability async, a
+journaled document's result waits for its commit. Pool workers commit
+any queued evidence when they exit.
+
+Usage:
+    python -m engine batch jobs.jsonl -o results.jsonl --workers 8
+    python -m engine batch jobs.jsonl -o results.jsonl --resume
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Dict, Optional, TextIO, Tuple
+
+from engine.archive import LAYOUTS
+from engine.segments import CODECS
+from engine.writer import DURABILITY
+from engine.journal import ProgressJournal
+from engine.pipeline import ExtractionPipeline
+
+
+# Per-process state, built once by the pool initializer
+_pipeline: Optional[ExtractionPipeline] = None
+_corpus_dir: str = "docs"
+_dry_run: bool = False
+_timeout: Optional[float] = None
+_corpus_index = None
+_rank: Optional[str] = None
+_journal: bool = False
+
+
+def _init_worker(
+    schema_path: str,
+    archive_dir: str,
+    corpus_dir: str,
+    dry_run: bool,
+    timeout: Optional[float] = None,
+    archive_options: Optional[Dict] = None,
+    corpus_index: bool = False,
+    rank: Optional[str] = None,
+    journal: bool = False
+):
+    """Build warm pipeline; keep worker chatter off the result stream."""
+    global _pipeline, _corpus_dir, _dry_run, _timeout, _corpus_index, _rank
+    global _journal
+    # rag_read emits audit events on stdout; results may be going there too
+    sys.stdout = sys.stderr
+    _pipeline = ExtractionPipeline(
+        schema_path=schema_path,
+        archive_dir=archive_dir,
+        verbose=False,
+        **(archive_options or {})
+    )
+    # Pool workers exit without atexit; commit queued evidence at exit
+    Finalize(_pipeline, _pipeline.close, exitpriority=10)
+    _corpus_dir = corpus_dir
+    _dry_run = dry_run
+    _timeout = timeout
+    if corpus_index:
+        from execution.corpus_index import CorpusIndex
+        _corpus_index = CorpusIndex(corpus_dir)
+    _rank = rank
+    _journal = journal
+
+
+def job_kind(job: Dict) -> str:
+    """Classify job as 'rag_read' or 'extract'."""
+    if job.get("action") == "rag_read" or "query" in job:
+        return "rag_read"
+    return "extract"
+
+
+def _run_job(job: Dict) -> Dict:
+    """Run one job in a worker process."""
+    if job_kind(job) == "rag_read":
+        from execution.rag_read_gate import rag_read
+
+        request = job.get("request", job)
+        corpus_dir = job.get("corpus_dir", _corpus_dir)
+        index = _corpus_index if corpus_dir == _corpus_dir else None
+        return rag_read(request, corpus_dir=corpus_dir, index=index,
+                        rank=_rank)
+
+    dry_run = bool(job.get("dry_run", _dry_run))
+    timeout = job.get("timeout", _timeout)
+    deadline = time.monotonic() + float(timeout) if timeout else None
+
+    if "content" in job:
+        result = _pipeline.run_text(
+            job["content"],
+            job.get("source_id", "<memory>"),
+            dry_run=dry_run,
+            deadline=deadline
+        )
+    elif "path" in job:
+        result = _pipeline.run(job["path"], dry_run=dry_run, deadline=deadline)
+    else:
+        raise ValueError("Job requires 'path', 'content' or 'query'")
+
+    # The journal may only name durable evidence: settle "async" records
+    refs = result["artifact_refs"]
+    if _journal and refs and refs.get("durable") is False:
+        _pipeline.wait_durable(refs["archive_ref"])
+        refs["durable"] = True
+    return result
+
+
+def journal_key(job: Dict) -> Optional[str]:
+    """Document key used in the progress journal (None if not journaled)."""
+    if job_kind(job) != "extract" or job.get("dry_run"):
+        return None
+    source = job.get("path") or job.get("source_id")
+    return str(Path(source)) if source else None
+
+
+def _process_line(
+    line_no: int,
+    raw: str,
+    journal_entry: Optional[Tuple[str, str]] = None
+) -> Dict:
+    """Parse and run one input line; errors become result records."""
+    kind = None
+    try:
+        job = json.loads(raw)
+        if not isinstance(job, dict):
+            raise ValueError("Job must be a JSON object")
+        kind = job_kind(job)
+
+        # Already archived in an earlier run: verify evidence, skip work
+        if journal_entry:
+            content_hash, archive_ref = journal_entry
+            if _pipeline.archive.verify(archive_ref, content_hash):
+                return {
+                    "line": line_no,
+                    "kind": kind,
+                    "ok": True,
+                    "skipped": True,
+                    "result": {
+                        "artifact_refs": {"archive_ref": archive_ref},
+                        "document": {
+                            "path": journal_key(job),
+                            "hash": content_hash
+                        }
+                    }
+                }
+
+        result = _run_job(job)
+    except Exception as e:
+        return {
+            "line": line_no,
+            "kind": kind,
+            "ok": False,
+            "error": f"{type(e).__name__}: {e}"
+        }
+
+    return {"line": line_no, "kind": kind, "ok": True, "result": result}
+
+
+class BatchRunner:
+    """Stream JSONL jobs through a process pool with bounded memory."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        order: str = "input",
+        window: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 1000,
+        schema_path: str = "schema/extraction_schema.json",
+        archive_dir: str = "evidence",
+        corpus_dir: str = "docs",
+        dry_run: bool = False,
+        timeout: Optional[float] = None,
+        journal_path: Optional[str] = None,
+        journal_sync_every: int = 256,
+        archive_options: Optional[Dict] = None,
+        corpus_index: bool = False,
+        rank: Optional[str] = None
+    ):
+        if order not in ("input", "completion"):
+            raise ValueError(f"Unknown order: {order}")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.order = order
+        self.window = window or self.workers * 4
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_every = checkpoint_every
+        self.worker_args = (
+            schema_path, archive_dir, corpus_dir, dry_run, timeout,
+            archive_options, corpus_index, rank, journal_path is not None
+        )
+        self.journal = ProgressJournal(
+            journal_path, sync_every=journal_sync_every
+        ) if journal_path else None
+
+        self.committed_line = 0
+        self._since_checkpoint = 0
+
+    def load_checkpoint(self) -> Dict:
+        """Return checkpoint {"committed_line", "output_offset"}."""
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return {"committed_line": 0, "output_offset": None}
+        with open(self.checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        return {
+            "committed_line": int(checkpoint.get("committed_line", 0)),
+            "output_offset": checkpoint.get("output_offset")
+        }
+
+    def run(
+        self,
+        input_path: str,
+        output: TextIO,
+        start_after: int = 0
+    ) -> Dict:
+        """
+        Process input_path, writing one result line per job to output.
+
+        Lines numbered <= start_after are skipped (resume). With a
+        progress journal, documents archived by an earlier run are skipped
+        once their archived evidence verifies.
+
+        Returns: counts of processed/ok/failed/skipped lines and
+        committed_line.
+        """
+        self.committed_line = start_after
+        self._since_checkpoint = 0
+        stats = {"processed": 0, "ok": 0, "failed": 0, "skipped": 0}
+        completed = self.journal.load() if self.journal else {}
+
+        # Lines completed out of order, waiting for the watermark
+        done_ahead = set()
+
+        def emit(record: Dict):
+            output.write(json.dumps(record) + '\n')
+            stats["processed"] += 1
+            stats["ok" if record["ok"] else "failed"] += 1
+            if record.get("skipped"):
+                stats["skipped"] += 1
+            elif self.journal and record["ok"] and record["kind"] == "extract":
+                refs = record["result"]["artifact_refs"]
+                if refs and refs.get("durable") is not False:
+                    document = record["result"]["document"]
+                    self.journal.record(
+                        document["path"], document["hash"],
+                        refs["archive_ref"]
+                    )
+
+        def submit(line_no: int, raw: str):
+            journal_entry = None
+            if completed:
+                try:
+                    job = json.loads(raw)
+                    journal_entry = completed.get(journal_key(job))
+                except (ValueError, AttributeError, TypeError):
+                    pass  # reported by the worker
+            future = pool.submit(_process_line, line_no, raw, journal_entry)
+            future.line_no = line_no
+            return future
+
+        def advance(line_no: int):
+            """Mark line done; move watermark over contiguous done lines."""
+            done_ahead.add(line_no)
+            while self.committed_line + 1 in done_ahead:
+                done_ahead.discard(self.committed_line + 1)
+                self.committed_line += 1
+                self._since_checkpoint += 1
+            if self._since_checkpoint >= self.checkpoint_every:
+                self._checkpoint(output)
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=self.worker_args
+        ) as pool, open(input_path, 'r', encoding='utf-8') as f:
+            pending = deque() if self.order == "input" else set()
+
+            for line_no, raw in enumerate(f, start=1):
+                if line_no <= start_after:
+                    continue
+                if not raw.strip():
+                    advance(line_no)
+                    continue
+
+                future = submit(line_no, raw)
+
+                if self.order == "input":
+                    pending.append(future)
+                    # Drain finished head (and block while window is full)
+                    while pending and (
+                        len(pending) >= self.window or pending[0].done()
+                    ):
+                        head = pending.popleft()
+                        emit(head.result())
+                        advance(head.line_no)
+                else:
+                    pending.add(future)
+                    if len(pending) >= self.window:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                            pending.discard(fut)
+                            emit(fut.result())
+                            advance(fut.line_no)
+
+            # Drain remaining in-flight jobs
+            if self.order == "input":
+                while pending:
+                    head = pending.popleft()
+                    emit(head.result())
+                    advance(head.line_no)
+            else:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        pending.discard(fut)
+                        emit(fut.result())
+                        advance(fut.line_no)
+
+        self._checkpoint(output)
+        if self.journal:
+            self.journal.close()
+        stats["committed_line"] = self.committed_line
+        return stats
+
+    def _checkpoint(self, output: TextIO):
+        """Make written results durable, then record committed line."""
+        self._since_checkpoint = 0
+        if self.journal:
+            self.journal.sync()
+        if not self.checkpoint_path:
+            return
+
+        output.flush()
+        try:
+            os.fsync(output.fileno())
+            output_offset = output.tell()
+        except (OSError, ValueError):
+            output_offset = None  # pipes/terminals: no fsync, no offset
+
+        tmp_path = self.checkpoint_path.with_name(
+            self.checkpoint_path.name + ".tmp"
+        )
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "committed_line": self.committed_line,
+                "output_offset": output_offset
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def _open_output(
+    path: Optional[str],
+    resume: Optional[Dict] = None
+) -> Tuple[TextIO, bool]:
+    """
+    Open result stream; returns (stream, should_close).
+
+    When resuming, an existing file is truncated to the checkpointed
+    offset (dropping results written after the last checkpoint) and
+    appended to.
+    """
+    if not path or path == "-":
+        return sys.stdout, False
+
+    if not resume or not os.path.exists(path):
+        return open(path, 'w', encoding='utf-8'), True
+
+    if resume["output_offset"] is None:
+        return open(path, 'a', encoding='utf-8'), True
+
+    output = open(path, 'r+', encoding='utf-8')
+    output.seek(resume["output_offset"])
+    output.truncate()
+    return output, True
+
+
+def main():
+    # Lazy like rag_read in _run_job: importing engine must not load execution
+    from execution.retriever import RANKINGS
+
+    parser = argparse.ArgumentParser(
+        description="Stream JSONL extraction / rag_read jobs through workers."
+    )
+    parser.add_argument("input", help="JSONL file of jobs")
+    parser.add_argument("-o", "--output", help="Result JSONL (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--order", choices=["input", "completion"],
+                        default="input")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Max jobs in flight (default: 4 x workers)")
+    parser.add_argument("--checkpoint",
+                        help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip lines up to the committed checkpoint")
+    parser.add_argument("--schema", default="schema/extraction_schema.json")
+    parser.add_argument("--archive-dir", default="evidence")
+    parser.add_argument("--archive-layout", choices=LAYOUTS, default="files")
+    parser.add_argument("--archive-compression", choices=sorted(CODECS),
+                        default=None,
+                        help="Seal rolled-over segments into compressed "
+                             "frames (segments layout)")
+    parser.add_argument("--archive-index", action="store_true",
+                        help="Maintain the SQLite decision index "
+                             "(<archive-dir>/index.sqlite)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Store large evidence values once in the "
+                             "content-addressed blob store")
+    parser.add_argument("--durability", choices=DURABILITY, default="none",
+                        help="fsync evidence: none, wait (before returning; "
+                             "one commit per document, as a worker runs one "
+                             "job at a time) or async (group commit in "
+                             "background; each document awaited before it "
+                             "is journaled)")
+    parser.add_argument("--merkle", action="store_true",
+                        help="Add every extraction to the archive Merkle log")
+    parser.add_argument("--corpus-dir", default="docs")
+    parser.add_argument("--corpus-index", action="store_true",
+                        help="Answer rag_read from the corpus n-gram index "
+                             "(build it with python -m engine corpus build)")
+    parser.add_argument("--rank", choices=RANKINGS, default=None,
+                        help="Return the top-scoring rag_read evidence "
+                             "(ties broken by path) instead of walk order")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Do not archive extraction evidence")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Per-document deadline in seconds")
+    parser.add_argument("--journal",
+                        help="Progress journal; skips documents already "
+                             "archived by an earlier run")
+    parser.add_argument("--journal-sync-every", type=int, default=256)
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint
+    if not checkpoint and args.output and args.output != "-":
+        checkpoint = args.output + ".checkpoint"
+
+    runner = BatchRunner(
+        workers=args.workers,
+        order=args.order,
+        window=args.window,
+        checkpoint_path=checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        schema_path=args.schema,
+        archive_dir=args.archive_dir,
+        corpus_dir=args.corpus_dir,
+        dry_run=args.dry_run,
+        timeout=args.timeout,
+        journal_path=args.journal,
+        journal_sync_every=args.journal_sync_every,
+        archive_options={
+            "layout": args.archive_layout,
+            "merkle": args.merkle,
+            "compression": args.archive_compression,
+            "durability": args.durability,
+            "index": args.archive_index,
+            "dedup": args.dedup
+        },
+        corpus_index=args.corpus_index,
+        rank=args.rank
+    )
+
+    resume = runner.load_checkpoint() if args.resume else None
+    start_after = resume["committed_line"] if resume else 0
+    output, should_close = _open_output(args.output, resume)
+
+    try:
+        stats = runner.run(args.input, output, start_after=start_after)
+    finally:
+        if should_close:
+            output.close()
+
+    print(
+        f"[BATCH] processed={stats['processed']} ok={stats['ok']} "
+        f"failed={stats['failed']} skipped={stats['skipped']} "
+        f"committed_line={stats['committed_line']}",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
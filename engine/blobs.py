@@ -0,0 +1,137 @@
+"""
+Blob store: content-addressed storage for repeated evidence payloads.
+
+Each blob is stored once under its SHA-256:
+    {directory}/{hash[:2]}/{hash[2:]}
+
+Blobs are immutable; writing an existing blob is a no-op. Reads check the
+content against the name, so a damaged blob is never returned. Unused
+blobs are removed by a garbage collection pass that counts references
+from every archived record (EvidenceArchive.collect_garbage).
+
+Usage:
+    python -m engine blobs gc --archive-dir evidence
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+from engine.storage import write_atomic
+
+
+class BlobStore:
+    """Content-addressed immutable blob files."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Blob files created by put() since the caller last cleared it
+        self.written = []
+
+    def path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest[2:]
+
+    def put(self, data: bytes) -> str:
+        """Store data (once); returns its SHA-256 hex digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        try:
+            # A dedup hit renews the blob's grace period, so a concurrent
+            # sweep does not take it for an old orphan
+            os.utime(path)
+            return digest
+        except FileNotFoundError:
+            pass
+
+        path.parent.mkdir(exist_ok=True)
+        # Concurrent writers of the same blob each rename a complete file
+        # over the same target, so the content is always whole
+        write_atomic(path, data)
+        self.written.append(path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Blob content; ValueError if it does not match its hash."""
+        with open(self.path(digest), 'rb') as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Blob hash mismatch: {digest}")
+        return data
+
+    def __contains__(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def iter_digests(self) -> Iterator[str]:
+        for prefix in sorted(self.directory.iterdir()):
+            if prefix.is_dir() and len(prefix.name) == 2:
+                for path in sorted(prefix.iterdir()):
+                    if not path.name.startswith("."):
+                        yield prefix.name + path.name
+
+    def sweep(
+        self,
+        referenced: Iterable[str],
+        grace_seconds: float = 3600
+    ) -> Dict:
+        """
+        Delete blobs not in referenced.
+
+        Blobs written or reused (put() touches the mtime) within
+        grace_seconds are kept: a concurrent writer may have stored them
+        without having written the referencing record yet. A candidate is
+        renamed aside before its age is checked again, so a put() racing
+        the sweep either renewed it in time (it is restored) or finds it
+        gone and writes it anew.
+        """
+        referenced = set(referenced)
+        cutoff = time.time() - grace_seconds
+        stats = {"blobs": 0, "referenced": 0, "deleted": 0, "bytes_freed": 0}
+
+        for digest in list(self.iter_digests()):
+            stats["blobs"] += 1
+            if digest in referenced:
+                stats["referenced"] += 1
+                continue
+            path = self.path(digest)
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+                doomed = path.with_name(f".{path.name}.gc")
+                os.rename(path, doomed)
+            except FileNotFoundError:
+                continue
+            st = doomed.stat()
+            if st.st_mtime > cutoff:
+                os.replace(doomed, path)  # reused meanwhile
+                continue
+            doomed.unlink()
+            stats["deleted"] += 1
+            stats["bytes_freed"] += st.st_size
+
+        return stats
+
+
+def main():
+    from engine.archive import EvidenceArchive
+
+    parser = argparse.ArgumentParser(
+        description="Maintain the content-addressed evidence blob store."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    gc = sub.add_parser("gc", help="Delete blobs no record references")
+    gc.add_argument("--archive-dir", default="evidence")
+    gc.add_argument("--grace", type=float, default=3600,
+                    help="Keep unreferenced blobs younger than this "
+                         "many seconds")
+    args = parser.parse_args()
+
+    archive = EvidenceArchive(args.archive_dir)
+    print(json.dumps(archive.collect_garbage(args.grace), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,18 @@ import re
 from typing import Dict, List, Optional
 
 
+# Effective date patterns, compiled once per process
+EFFECTIVE_DATE_LABEL = re.compile(
+    r'(?i)effective\s+date\s*[:]\s*(\d{1,2}/\d{1,2}/\d{4})'
+)
+EFFECTIVE_DATE_PHRASE = re.compile(
+    r'(?i)effective\s+as\s+of\s+(\d{4}-\d{2}-\d{2})'
+)
+EFFECTIVE_DATE_WRITTEN = re.compile(
+    r'(?i)becomes\s+effective\s+on\s+([A-Z][a-z]+\s+\d{1,2},\s+\d{4})'
+)
+
+
 class RuleBasedExtractor:
     """Extract field values using regex patterns."""
 
@@ -46,8 +58,7 @@ class RuleBasedExtractor:
         candidates = []
 
         # Pattern 1: "Effective Date: MM/DD/YYYY"
-        pattern1 = r'(?i)effective\s+date\s*[:]\s*(\d{1,2}/\d{1,2}/\d{4})'
-        for match in re.finditer(pattern1, content):
+        for match in EFFECTIVE_DATE_LABEL.finditer(content):
             candidates.append({
                 "field_name": "effective_date",
                 "value": match.group(1),
@@ -58,8 +69,7 @@ class RuleBasedExtractor:
             })
 
         # Pattern 2: "effective as of YYYY-MM-DD"
-        pattern2 = r'(?i)effective\s+as\s+of\s+(\d{4}-\d{2}-\d{2})'
-        for match in re.finditer(pattern2, content):
+        for match in EFFECTIVE_DATE_PHRASE.finditer(content):
             candidates.append({
                 "field_name": "effective_date",
                 "value": match.group(1),
@@ -70,8 +80,7 @@ class RuleBasedExtractor:
             })
 
         # Pattern 3: "becomes effective on [written date]"
-        pattern3 = r'(?i)becomes\s+effective\s+on\s+([A-Z][a-z]+\s+\d{1,2},\s+\d{4})'
-        for match in re.finditer(pattern3, content):
+        for match in EFFECTIVE_DATE_WRITTEN.finditer(content):
             candidates.append({
                 "field_name": "effective_date",
                 "value": match.group(1),
@@ -0,0 +1,111 @@
+"""
+Canonical serialization and hashing shared by audit and archive.
+
+The query context hash lives outside engine, in common.hashing.text_hash(),
+so the token validator can share it without loading engine.
+
+Two canonical JSON forms are in use; both are reproduced byte for byte,
+so every digest already on disk stays valid:
+- canonical_json(obj):               json.dumps(obj, sort_keys=True)
+  (context hashes, proof bundles, result lines, trace signatures)
+- canonical_json(obj, compact=True): the same with separators (",", ":")
+  (Merkle leaves, audit checkpoint signatures)
+
+json.dumps builds a new encoder on every call that passes options; the
+encoders here are built once. HashMemo keeps each object's canonical
+JSON for the length of one request, so an object that feeds several
+digests (an admission context feeding both the context hash and the
+proof bundle) is serialized once.
+"""
+import hashlib
+import json
+from typing import Dict, List, Optional, Union
+
+
+_ENCODER = json.JSONEncoder(sort_keys=True)
+_COMPACT_ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+
+def canonical_json(obj, compact: bool = False) -> str:
+    """Sorted-key JSON (see module docstring for the two forms)."""
+    return (_COMPACT_ENCODER if compact else _ENCODER).encode(obj)
+
+
+def canonical_bytes(obj, compact: bool = False) -> bytes:
+    return canonical_json(obj, compact).encode('utf-8')
+
+
+def sha256_hex(data: Union[bytes, str]) -> str:
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def json_hash(obj, compact: bool = False) -> str:
+    """SHA-256 of an object's canonical JSON."""
+    return sha256_hex(canonical_json(obj, compact))
+
+
+class HashMemo:
+    """
+    Canonical JSON per object, computed once within one request.
+
+    Entries are keyed by object identity, so objects must not be mutated
+    while the memo is in use; create a new memo per request.
+    """
+
+    def __init__(self):
+        self._json: Dict = {}
+
+    def json(self, obj, compact: bool = False) -> str:
+        key = (id(obj), compact)
+        entry = self._json.get(key)
+        if entry is None or entry[0] is not obj:
+            # Holding obj keeps its id from being reused meanwhile
+            entry = (obj, canonical_json(obj, compact))
+            self._json[key] = entry
+        return entry[1]
+
+    def hash(self, obj, compact: bool = False) -> str:
+        return sha256_hex(self.json(obj, compact))
+
+
+def context_hash(
+    action: str,
+    context: Dict,
+    decision_maker: str,
+    memo: Optional[HashMemo] = None
+) -> str:
+    """Audit decision context hash: sha256("{action}:{context}:{maker}")."""
+    context_json = (memo or HashMemo()).json(context)
+    return sha256_hex(f"{action}:{context_json}:{decision_maker}")
+
+
+def proof_bundle_hash(
+    context: Dict,
+    conditions: Optional[Dict],
+    memo: Optional[HashMemo] = None
+) -> str:
+    """
+    SHA-256 of {"context": context, "conditions": conditions or {}}.
+
+    Composed from the members' canonical JSON (sorted keys put
+    "conditions" first), byte-identical to serializing the whole bundle.
+    """
+    memo = memo or HashMemo()
+    conditions_json = memo.json(conditions) if conditions else "{}"
+    return sha256_hex(
+        f'{{"conditions": {conditions_json}, "context": {memo.json(context)}}}'
+    )
+
+
+def trace_signature(document_hash: str, lines: List[bytes]) -> str:
+    """
+    Archive trace signature from canonical result lines.
+
+    b'[' + b', '.join(lines) + b']' is byte-identical to
+    canonical_json(results), so signatures match those computed from the
+    full results list.
+    """
+    results_hash = sha256_hex(b'[' + b', '.join(lines) + b']')
+    return sha256_hex(f"{document_hash}:{results_hash}")
@@ -0,0 +1,262 @@
+"""
+Archive index: SQLite table of every archived field decision.
+
+One row per result line:
+    archive_ref, line, document_hash, document_path, timestamp,
+    field_name, decision, stop_reason, confidence
+
+Maintained by EvidenceArchive(index=True) as extractions are archived
+({archive_dir}/index.sqlite by default) and rebuildable from the archive
+at any time, since the archive stays the source of truth. Timestamps are
+UTC ISO 8601 strings, so time ranges compare as text.
+
+Usage:
+    python -m engine index query --field effective_date --decision STOP \
+        --stop-reason conflicting_values --since 2026-01-01
+    python -m engine index rebuild --archive-dir evidence
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    archive_ref   TEXT NOT NULL,
+    line          INTEGER NOT NULL,
+    document_hash TEXT NOT NULL,
+    document_path TEXT,
+    timestamp     TEXT NOT NULL,
+    field_name    TEXT NOT NULL,
+    decision      TEXT NOT NULL,
+    stop_reason   TEXT,
+    confidence    REAL,
+    PRIMARY KEY (archive_ref, line)
+);
+CREATE INDEX IF NOT EXISTS decisions_field
+    ON decisions (field_name, decision, stop_reason, timestamp);
+CREATE INDEX IF NOT EXISTS decisions_document
+    ON decisions (document_hash);
+CREATE INDEX IF NOT EXISTS decisions_timestamp
+    ON decisions (timestamp);
+"""
+
+
+class ArchiveIndex:
+    """SQLite index of archived field decisions."""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(
+            str(self.db_path), timeout=30, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self.conn.row_factory = sqlite3.Row
+        # Derived data: WAL without per-commit fsync; rebuild restores it
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def add(
+        self,
+        archive_ref: str,
+        document_hash: str,
+        timestamp: str,
+        results: List[Dict],
+        document_path: Optional[str] = None
+    ):
+        """Index one archived extraction (idempotent per archive_ref)."""
+        with self._lock, self.conn:
+            self._insert(archive_ref, document_hash, timestamp,
+                         results, document_path)
+
+    def _insert(
+        self,
+        archive_ref: str,
+        document_hash: str,
+        timestamp: str,
+        results: List[Dict],
+        document_path: Optional[str]
+    ):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO decisions VALUES (?,?,?,?,?,?,?,?,?)",
+            [
+                (
+                    archive_ref, line, document_hash, document_path,
+                    timestamp, r["field_name"], r["decision"],
+                    r.get("stop_reason"), r.get("confidence")
+                )
+                for line, r in enumerate(results, start=1)
+            ]
+        )
+
+    def query(
+        self,
+        field_name: Optional[str] = None,
+        decision: Optional[str] = None,
+        stop_reason: Optional[str] = None,
+        document_hash: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Matching decisions, newest first.
+
+        since/until are ISO 8601 prefixes (e.g. "2026-01-05" or a full
+        timestamp); since is inclusive, until exclusive. limit=None
+        returns every match; limit must not be negative.
+        """
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must be >= 0: {limit}")
+
+        clauses, params = [], []
+        for column, value in (
+            ("field_name", field_name),
+            ("decision", decision),
+            ("stop_reason", stop_reason),
+            ("document_hash", document_hash)
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+
+        sql = "SELECT * FROM decisions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, archive_ref, line"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM decisions"
+            ).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    @classmethod
+    def rebuild(cls, archive, db_path: Optional[str] = None) -> "ArchiveIndex":
+        """
+        Rebuild the index from every record in archive (EvidenceArchive).
+
+        Builds into a temporary database and renames it over db_path, so
+        readers never see a partial index. Run with archive writers
+        stopped: the old database's WAL is discarded.
+        """
+        db_path = Path(db_path or archive.archive_dir / "index.sqlite")
+        tmp_path = db_path.with_name(db_path.name + ".rebuild")
+        for path in (tmp_path, Path(f"{tmp_path}-wal"), Path(f"{tmp_path}-shm")):
+            if path.exists():
+                path.unlink()
+
+        index = cls(str(tmp_path))
+        with index.conn:
+            for archive_ref in archive.iter_refs():
+                record = archive.read_extraction(archive_ref)
+                manifest = record["manifest"]
+                index._insert(
+                    archive_ref, manifest["document_hash"],
+                    manifest["timestamp"], record["results"],
+                    manifest.get("document_path")
+                )
+        # Fold the WAL into the main file before the rename
+        index.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        index.close()
+
+        for suffix in ("-wal", "-shm"):
+            stale = Path(f"{db_path}{suffix}")
+            if stale.exists():
+                stale.unlink()
+        os.replace(tmp_path, db_path)
+        return cls(str(db_path))
+
+
+def _print_rows(rows: Iterable[Dict], as_json: bool):
+    if as_json:
+        for row in rows:
+            print(json.dumps(row))
+        return
+    for row in rows:
+        reason = row["stop_reason"] or "-"
+        print(f"{row['timestamp']}  {row['decision']:<11} "
+              f"{row['field_name']:<20} {reason:<24} {row['archive_ref']}")
+
+
+def main():
+    from engine.archive import EvidenceArchive
+
+    parser = argparse.ArgumentParser(
+        description="Query or rebuild the SQLite index of archived decisions."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    query = sub.add_parser("query", help="Find archived decisions")
+    query.add_argument("--archive-dir", default="evidence")
+    query.add_argument("--db", help="Index path (default: "
+                                    "<archive-dir>/index.sqlite)")
+    query.add_argument("--field")
+    query.add_argument("--decision", choices=["ACCEPT", "STOP", "NEED_REVIEW"])
+    query.add_argument("--stop-reason")
+    query.add_argument("--document-hash")
+    query.add_argument("--since", help="ISO 8601 start (inclusive)")
+    query.add_argument("--until", help="ISO 8601 end (exclusive)")
+    query.add_argument("--limit", type=int, default=None)
+    query.add_argument("--json", action="store_true",
+                       help="One JSON object per line")
+
+    rebuild = sub.add_parser("rebuild", help="Rebuild index from archive")
+    rebuild.add_argument("--archive-dir", default="evidence")
+    rebuild.add_argument("--db")
+
+    args = parser.parse_args()
+    if getattr(args, "limit", None) is not None and args.limit < 0:
+        parser.error("--limit must be >= 0")
+    db_path = args.db or str(Path(args.archive_dir) / "index.sqlite")
+
+    if args.command == "rebuild":
+        index = ArchiveIndex.rebuild(EvidenceArchive(args.archive_dir), db_path)
+        print(f"[INDEX] {index.count()} decisions indexed → {db_path}",
+              file=sys.stderr)
+        index.close()
+        return
+
+    if not Path(db_path).exists():
+        print(f"Index not found: {db_path} (run: python -m engine index "
+              f"rebuild)", file=sys.stderr)
+        sys.exit(1)
+
+    index = ArchiveIndex(db_path)
+    rows = index.query(
+        field_name=args.field,
+        decision=args.decision,
+        stop_reason=args.stop_reason,
+        document_hash=args.document_hash,
+        since=args.since,
+        until=args.until,
+        limit=args.limit
+    )
+    _print_rows(rows, args.json)
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,19 @@ class DocumentIngestor:
 
         # Read content
         with open(self.path, 'r', encoding='utf-8') as f:
-            self.content = f.read()
+            content = f.read()
+
+        return self.load_text(content)
+
+    def load_text(self, content: str) -> Dict:
+        """
+        Load document from in-memory text and compute metadata.
+
+        The ingestor path is recorded as the document source; nothing
+        is read from disk.
+        """
+        self.content = content
+        self.line_index = []
 
         # Compute hash
         self.content_hash = hashlib.sha256(
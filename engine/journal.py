@@ -0,0 +1,83 @@
+"""
+Progress journal: crash-safe record of documents already archived.
+
+Append-only, one compact JSON array per line:
+    ["<document path>", "<content_hash>", "<archive_ref>"]
+
+Entries are buffered and fsynced in groups, so a crash loses at most the
+last unsynced group (those documents are simply re-run). A torn final
+line from a crash mid-write is ignored on load.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+class ProgressJournal:
+    """Append-only journal of completed documents with group fsync."""
+
+    def __init__(self, journal_path: str, sync_every: int = 256):
+        self.path = Path(journal_path)
+        self.sync_every = sync_every
+        self._pending = []
+        self._file = None
+
+    def load(self) -> Dict[str, Tuple[str, str]]:
+        """Return completed documents: path → (content_hash, archive_ref)."""
+        completed = {}
+        if not self.path.exists():
+            return completed
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    path, content_hash, archive_ref = json.loads(line)
+                except ValueError:
+                    continue  # torn write at crash point
+                completed[path] = (content_hash, archive_ref)
+
+        return completed
+
+    def record(self, path: str, content_hash: str, archive_ref: str):
+        """Queue a completed document; fsync once per group."""
+        self._pending.append(json.dumps(
+            [path, content_hash, archive_ref],
+            ensure_ascii=False,
+            separators=(',', ':')
+        ) + '\n')
+        if len(self._pending) >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Write and fsync all queued entries."""
+        if not self._pending:
+            return
+
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._repair_tail()
+
+        self._file.write(''.join(self._pending))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = []
+
+    def close(self):
+        """Sync remaining entries and close the journal."""
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _repair_tail(self):
+        """Terminate a torn final line so new entries start cleanly."""
+        size = self.path.stat().st_size
+        if size == 0:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(size - 1)
+            last = f.read(1)
+        if last != b'\n':
+            self._file.write('\n')
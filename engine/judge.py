@@ -19,6 +19,7 @@ class StopReason(str, Enum):
     CONFLICTING_VALUES = "conflicting_values"
     MISSING_EVIDENCE = "missing_evidence"
     EVIDENCE_INTEGRITY_FAILED = "evidence_integrity_failed"
+    DEADLINE_EXCEEDED = "deadline_exceeded"
 
 
 class ExtractionJudge:
@@ -105,6 +106,15 @@ class ExtractionJudge:
         # All checks passed → ACCEPT
         return self._accept(field_name, best_candidate)
 
+    def deadline_stop(self, field_name: str, progress: Dict) -> Dict:
+        """
+        Create STOP for a field the pipeline ran out of time to judge.
+
+        progress records how far processing got (stages completed,
+        candidates grounded, fields judged).
+        """
+        return self._stop(field_name, StopReason.DEADLINE_EXCEEDED, progress)
+
     def _accept(self, field_name: str, candidate: Dict) -> Dict:
         """Create ACCEPT decision."""
         return {
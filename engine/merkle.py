@@ -0,0 +1,379 @@
+"""
+Merkle log: incremental Merkle tree over archived extraction records.
+
+Hashing follows RFC 6962 / RFC 9162:
+- leaf hash = SHA-256(0x00 || leaf bytes)
+- node hash = SHA-256(0x01 || left || right)
+
+Storage (under {archive_dir}/merkle/):
+- level_00.bin, level_01.bin, ...  32-byte hashes of complete subtrees;
+                                   level k entry i covers leaves
+                                   [i * 2^k, (i + 1) * 2^k)
+- roots.jsonl                      published roots {"tree_size", "root",
+                                   "timestamp"}
+
+Appending a leaf writes O(log n) hashes. Roots and inclusion proofs read
+O(log n) stored subtree hashes, never the whole history. Appends and
+publishes take an advisory lock (merkle.lock), so several processes can
+share one log; the tree size is always re-read from disk.
+
+A proof document carries its own root, and a consistent proof and root
+can be built for any leaf. Verification therefore also requires that
+root to be a published (or otherwise trusted) root for that tree size.
+
+Usage:
+    python -m engine merkle prove <archive_ref> --archive-dir evidence
+    python -m engine merkle verify proof.json --archive-dir evidence
+    python -m engine merkle publish --archive-dir evidence
+"""
+import argparse
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+from common.locking import FileLock
+
+
+HASH_SIZE = 32
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(b'\x00' + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly less than n (n > 1)."""
+    k = 1
+    while k * 2 < n:
+        k *= 2
+    return k
+
+
+def verify_inclusion(
+    leaf: bytes,
+    leaf_index: int,
+    tree_size: int,
+    proof: List[bytes],
+    root: bytes
+) -> bool:
+    """Verify inclusion proof (RFC 9162 section 2.1.3.2)."""
+    if leaf_index >= tree_size:
+        return False
+
+    fn, sn, r = leaf_index, tree_size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while not fn & 1 and fn != 0:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+
+    return sn == 0 and r == root
+
+
+class MerkleLog:
+    """Append-only Merkle tree persisted as per-level subtree hash files."""
+
+    def __init__(self, directory: str, publish_every: int = 1000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.roots_path = self.directory / "roots.jsonl"
+        self.publish_every = publish_every
+        self.lock = FileLock(self.directory / "merkle.lock")
+        with self.lock:
+            self._repair()
+
+    # --- Storage ---
+
+    def _level_path(self, level: int) -> Path:
+        return self.directory / f"level_{level:02d}.bin"
+
+    def _level_count(self, level: int) -> int:
+        path = self._level_path(level)
+        return path.stat().st_size // HASH_SIZE if path.exists() else 0
+
+    def _read(self, level: int, index: int) -> bytes:
+        with open(self._level_path(level), 'rb') as f:
+            f.seek(index * HASH_SIZE)
+            return f.read(HASH_SIZE)
+
+    def _write(self, level: int, index: int, digest: bytes):
+        with open(self._level_path(level), 'ab') as f:
+            if f.tell() != index * HASH_SIZE:
+                f.truncate(index * HASH_SIZE)
+            f.write(digest)
+
+    def _repair(self):
+        """Complete parent levels left unfinished by a crash mid-append."""
+        level = 0
+        while True:
+            path = self._level_path(level)
+            if not path.exists():
+                return
+            count = self._level_count(level)
+            # Drop a partially written trailing hash
+            if path.stat().st_size != count * HASH_SIZE:
+                with open(path, 'r+b') as f:
+                    f.truncate(count * HASH_SIZE)
+            parents = self._level_count(level + 1)
+            for i in range(parents, count // 2):
+                self._write(level + 1, i, node_hash(
+                    self._read(level, 2 * i), self._read(level, 2 * i + 1)
+                ))
+            level += 1
+
+    # --- Tree ---
+
+    @property
+    def size(self) -> int:
+        return self._level_count(0)
+
+    def append(self, data: bytes, publish: bool = True) -> int:
+        """
+        Add leaf for data; returns its leaf index.
+
+        With publish=False a due root is left to publish_due(), so a
+        caller holding the lock can still truncate() the leaf.
+        """
+        with self.lock:
+            return self._append(data, publish)
+
+    def _append(self, data: bytes, publish: bool = True) -> int:
+        index = self.size
+        digest = leaf_hash(data)
+        self._write(0, index, digest)
+
+        # Carry completed subtrees upward
+        level, i = 0, index
+        while i & 1:
+            digest = node_hash(self._read(level, i - 1), digest)
+            level, i = level + 1, i >> 1
+            self._write(level, i, digest)
+
+        if publish:
+            self.publish_due()
+
+        return index
+
+    def truncate(self, size: int):
+        """
+        Drop the leaves from index size on (the leaf of a failed write).
+
+        Leaves covered by a published root are never dropped.
+        """
+        with self.lock:
+            published = self.latest_published()
+            if published and published["tree_size"] > size:
+                raise ValueError(
+                    f"Leaves up to {published['tree_size']} are published"
+                )
+            level = 0
+            while self._level_path(level).exists():
+                # Level k holds one hash per complete 2^k-leaf subtree
+                keep = (size >> level) * HASH_SIZE
+                if self._level_path(level).stat().st_size > keep:
+                    with open(self._level_path(level), 'r+b') as f:
+                        f.truncate(keep)
+                level += 1
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        """MTH(D[start:end]) from stored complete subtrees."""
+        n = end - start
+        if n & (n - 1) == 0 and start % n == 0:
+            return self._read(n.bit_length() - 1, start // n)
+        k = _split(n)
+        return node_hash(
+            self._subtree(start, start + k), self._subtree(start + k, end)
+        )
+
+    def root(self, tree_size: Optional[int] = None) -> bytes:
+        """Merkle tree hash of the first tree_size leaves (default: all)."""
+        with self.lock:
+            tree_size = self.size if tree_size is None else tree_size
+            if tree_size == 0:
+                return hashlib.sha256(b'').digest()
+            return self._subtree(0, tree_size)
+
+    def inclusion_proof(
+        self,
+        leaf_index: int,
+        tree_size: Optional[int] = None
+    ) -> List[bytes]:
+        """Audit path for leaf_index in tree of tree_size (RFC 6962 PATH)."""
+        with self.lock:
+            return self._inclusion_proof(leaf_index, tree_size)
+
+    def _inclusion_proof(
+        self,
+        leaf_index: int,
+        tree_size: Optional[int]
+    ) -> List[bytes]:
+        tree_size = self.size if tree_size is None else tree_size
+        if not 0 <= leaf_index < tree_size <= self.size:
+            raise ValueError(
+                f"Leaf {leaf_index} not in tree of size {tree_size}"
+            )
+
+        proof = []
+        start, end = 0, tree_size
+        while end - start > 1:
+            k = _split(end - start)
+            if leaf_index < start + k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                start = start + k
+        proof.reverse()
+        return proof
+
+    # --- Published roots ---
+
+    def publish(self) -> Dict:
+        """Append current root to roots.jsonl and return it."""
+        with self.lock:
+            return self._publish()
+
+    def publish_due(self) -> Optional[Dict]:
+        """Publish if the tree size is a multiple of publish_every."""
+        with self.lock:
+            size = self.size
+            if self.publish_every and size and size % self.publish_every == 0:
+                return self._publish()
+            return None
+
+    def _publish(self) -> Dict:
+        size = self.size
+        entry = {
+            "tree_size": size,
+            "root": self.root(size).hex(),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        with open(self.roots_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        return entry
+
+    def latest_published(self) -> Optional[Dict]:
+        """Most recently published root, if any."""
+        latest = None
+        for latest in _iter_roots(self.roots_path):
+            pass
+        return latest
+
+    def published_roots(self) -> Dict[int, str]:
+        """{tree_size: root hex} of every published root."""
+        return published_roots(self.roots_path)
+
+
+def _iter_roots(roots_path: Path) -> Iterator[Dict]:
+    """Entries of roots.jsonl up to the first unreadable line."""
+    if not roots_path.exists():
+        return
+    with open(roots_path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+
+def published_roots(roots_path: Union[str, Path]) -> Dict[int, str]:
+    """{tree_size: root hex} from a roots.jsonl file."""
+    return {
+        entry["tree_size"]: entry["root"]
+        for entry in _iter_roots(Path(roots_path))
+    }
+
+
+def verify_proof_document(
+    proof_doc: Dict,
+    trusted_roots: Dict[int, str]
+) -> bool:
+    """
+    Verify a proof produced by EvidenceArchive.inclusion_proof.
+
+    A matching proof and root can be built for any leaf, so the proof's
+    root must also equal trusted_roots[tree_size]: a root published in
+    roots.jsonl (published_roots()) or obtained independently.
+    """
+    if trusted_roots.get(proof_doc["tree_size"]) != proof_doc["root"]:
+        return False
+    leaf = leaf_hash(proof_doc["leaf"].encode('utf-8'))
+    if leaf.hex() != proof_doc["leaf_hash"]:
+        return False
+    return verify_inclusion(
+        leaf,
+        proof_doc["leaf_index"],
+        proof_doc["tree_size"],
+        [bytes.fromhex(p) for p in proof_doc["proof"]],
+        bytes.fromhex(proof_doc["root"])
+    )
+
+
+def main():
+    from engine.archive import EvidenceArchive
+
+    parser = argparse.ArgumentParser(
+        description="Merkle inclusion proofs over archived extractions."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prove = sub.add_parser("prove", help="Inclusion proof for archive_ref")
+    prove.add_argument("archive_ref")
+    prove.add_argument("--archive-dir", default="evidence")
+    prove.add_argument("--tree-size", type=int, default=None,
+                       help="Prove against this size (default: latest "
+                            "published root covering the leaf)")
+
+    verify = sub.add_parser("verify", help="Verify a proof JSON file")
+    verify.add_argument("proof_file")
+    verify.add_argument("--archive-dir", default="evidence",
+                        help="Trust the roots published in this archive")
+    verify.add_argument("--roots", default=None,
+                        help="Trust the roots in this roots.jsonl instead")
+    verify.add_argument("--root", default=None,
+                        help="Trust this root (hex) for the proof's tree "
+                             "size instead")
+
+    publish = sub.add_parser("publish", help="Publish current root")
+    publish.add_argument("--archive-dir", default="evidence")
+
+    args = parser.parse_args()
+
+    if args.command == "prove":
+        archive = EvidenceArchive(args.archive_dir, merkle=True)
+        proof = archive.inclusion_proof(args.archive_ref, args.tree_size)
+        print(json.dumps(proof, indent=2))
+    elif args.command == "verify":
+        with open(args.proof_file, 'r') as f:
+            proof_doc = json.load(f)
+        if args.root:
+            trusted = {proof_doc["tree_size"]: args.root.lower()}
+        else:
+            trusted = published_roots(
+                args.roots or Path(args.archive_dir) / "merkle" / "roots.jsonl"
+            )
+        ok = verify_proof_document(proof_doc, trusted)
+        print("VALID" if ok else "INVALID")
+        sys.exit(0 if ok else 1)
+    else:
+        archive = EvidenceArchive(args.archive_dir, merkle=True)
+        print(json.dumps(archive.merkle.publish(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
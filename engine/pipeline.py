@@ -2,75 +2,191 @@
 Main extraction pipeline: ingest → extract → ground → judge → archive.
 """
 import json
+import time
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from engine.ingest import DocumentIngestor
 from engine.extract import RuleBasedExtractor
 from engine.ground import EvidenceGrounder
 from engine.judge import ExtractionJudge
 from engine.archive import EvidenceArchive
+from engine.writer import DURABILITY, GroupCommitWriter
 
 
 class ExtractionPipeline:
     """End-to-end extraction with STOP-first judgment."""
 
-    def __init__(self, schema_path: str = "schema/extraction_schema.json"):
+    def __init__(
+        self,
+        schema_path: str = "schema/extraction_schema.json",
+        archive_dir: str = "evidence",
+        verbose: bool = True,
+        durability: str = "none",
+        **archive_options
+    ):
+        """
+        archive_options are passed to EvidenceArchive (e.g. layout).
+
+        durability: "none" (no fsync), "wait" (return once the evidence is
+        fsynced) or "async" (return at once, group-committed in the
+        background; artifact_refs["durable"] is False until
+        wait_durable(archive_ref) returns). See engine.writer.
+        """
+        if durability not in DURABILITY:
+            raise ValueError(f"Unknown durability: {durability}")
+
         with open(schema_path, 'r') as f:
             self.schema = json.load(f)
 
         self.extractor = RuleBasedExtractor(self.schema)
         self.judge = ExtractionJudge(self.schema)
-        self.archive = EvidenceArchive()
+        self.archive = EvidenceArchive(archive_dir, **archive_options)
+        self.durability = durability
+        self.writer = GroupCommitWriter(self.archive) \
+            if durability != "none" else None
+        # "async" records not yet committed: archive_ref → durability future
+        self._pending: Dict[str, Future] = {}
+        self.verbose = verbose
 
-    def run(self, document_path: str) -> Dict:
+    def run(
+        self,
+        document_path: str,
+        dry_run: bool = False,
+        deadline: Optional[float] = None
+    ) -> Dict:
         """
         Run full extraction pipeline.
 
+        deadline is a time.monotonic() timestamp. Once it passes, fields
+        not yet judged STOP with reason deadline_exceeded and a proof of
+        how far processing got; evidence is still archived.
+
         Returns:
         - results: list of field decisions
-        - artifact_refs: paths to archived evidence
+        - artifact_refs: paths to archived evidence (None if dry_run)
         - summary: counts and statistics
         """
         # 1. Ingest
-        print(f"[INGEST] Loading {document_path}...")
+        self._log(f"[INGEST] Loading {document_path}...")
         ingestor = DocumentIngestor(document_path)
         document_data = ingestor.load()
-        print(f"  → Hash: {document_data['content_hash'][:16]}...")
+        self._log(f"  → Hash: {document_data['content_hash'][:16]}...")
+
+        return self._run_document(document_data, dry_run, deadline)
+
+    def run_text(
+        self,
+        content: str,
+        source_id: str,
+        dry_run: bool = False,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """
+        Run full extraction pipeline on in-memory document text.
+
+        source_id is recorded as the document path in results and
+        archived evidence. With dry_run, nothing is written to the
+        evidence archive (interactive previews). deadline as in run().
+        """
+        # 1. Ingest
+        self._log(f"[INGEST] Loading {source_id} (in-memory)...")
+        ingestor = DocumentIngestor(source_id)
+        document_data = ingestor.load_text(content)
+        self._log(f"  → Hash: {document_data['content_hash'][:16]}...")
+
+        return self._run_document(document_data, dry_run, deadline)
+
+    def _run_document(
+        self,
+        document_data: Dict,
+        dry_run: bool,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Run extract → ground → judge → archive on ingested document."""
+        progress = {
+            "stages_completed": ["ingest"],
+            "candidates_found": None,
+            "candidates_grounded": 0,
+            "fields_judged": 0
+        }
+        results = []
+
+        # Deadline checks between stages and inside the ground/judge loops;
+        # on expiry every field not yet judged gets a DEADLINE STOP below.
+        expired = self._expired(deadline)
+        interrupted_at = "extract" if expired else None
 
         # 2. Extract candidates
-        print("[EXTRACT] Finding candidates...")
-        candidates = self.extractor.extract(document_data["content"])
-        print(f"  → Found {len(candidates)} candidates")
+        if not expired:
+            self._log("[EXTRACT] Finding candidates...")
+            candidates = self.extractor.extract(document_data["content"])
+            self._log(f"  → Found {len(candidates)} candidates")
+            progress["candidates_found"] = len(candidates)
+            progress["stages_completed"].append("extract")
+            expired = self._expired(deadline)
+            interrupted_at = "ground" if expired else None
 
         # 3. Ground evidence
-        print("[GROUND] Mapping evidence...")
-        grounder = EvidenceGrounder(document_data)
-        grounded = []
-        for candidate in candidates:
-            g = grounder.ground_candidate(candidate)
-            verification = grounder.verify_evidence(g)
-            g["verification"] = verification
-            grounded.append(g)
+        if not expired:
+            self._log("[GROUND] Mapping evidence...")
+            grounder = EvidenceGrounder(document_data)
+            grounded = []
+            for candidate in candidates:
+                if self._expired(deadline):
+                    expired, interrupted_at = True, "ground"
+                    break
+                g = grounder.ground_candidate(candidate)
+                verification = grounder.verify_evidence(g)
+                g["verification"] = verification
+                grounded.append(g)
+                progress["candidates_grounded"] += 1
+            else:
+                progress["stages_completed"].append("ground")
+                expired = self._expired(deadline)
+                interrupted_at = "judge" if expired else None
 
         # 4. Judge (STOP-first)
-        print("[JUDGE] Making decisions...")
-        results = []
-        for field in self.schema["fields"]:
-            field_name = field["name"]
-            field_candidates = [
-                c for c in grounded if c["field_name"] == field_name
-            ]
-            decision = self.judge.judge(field_name, field_candidates)
-            results.append(decision)
-            print(f"  → {field_name}: {decision['decision']}")
+        # Only fields judged on complete candidate sets keep their decision
+        if not expired:
+            self._log("[JUDGE] Making decisions...")
+            for field in self.schema["fields"]:
+                if self._expired(deadline):
+                    expired, interrupted_at = True, "judge"
+                    break
+                field_name = field["name"]
+                field_candidates = [
+                    c for c in grounded if c["field_name"] == field_name
+                ]
+                decision = self.judge.judge(field_name, field_candidates)
+                results.append(decision)
+                progress["fields_judged"] += 1
+                self._log(f"  → {field_name}: {decision['decision']}")
+            else:
+                progress["stages_completed"].append("judge")
+
+        if expired:
+            self._log(f"[DEADLINE] Exceeded during {interrupted_at}")
+            proof = dict(
+                progress,
+                deadline_exceeded=True,
+                interrupted_at=interrupted_at,
+                overrun_ms=round((time.monotonic() - deadline) * 1000, 3)
+            )
+            for field in self.schema["fields"][len(results):]:
+                results.append(
+                    self.judge.deadline_stop(field["name"], dict(proof))
+                )
 
         # 5. Archive
-        print("[ARCHIVE] Writing artifacts...")
-        archive_info = self.archive.archive_extraction(
-            document_data, results
-        )
-        print(f"  → Manifest: {archive_info['manifest_path']}")
+        if dry_run:
+            self._log("[ARCHIVE] Skipped (dry run)")
+            archive_info = None
+        else:
+            self._log("[ARCHIVE] Writing artifacts...")
+            archive_info = self._archive(document_data, results)
+            self._log(f"  → Archived: {archive_info['archive_ref']}")
 
         # Summary
         summary = {
@@ -87,7 +203,53 @@ class ExtractionPipeline:
             "artifact_refs": archive_info,
             "summary": summary,
             "document": {
-                "path": document_path,
+                "path": document_data["path"],
                 "hash": document_data["content_hash"]
             }
         }
+
+    def _archive(self, document_data: Dict, results: List[Dict]) -> Dict:
+        """Write evidence, waiting for durability if configured."""
+        if self.writer is None:
+            return self.archive.archive_extraction(document_data, results)
+
+        archive_info, durable = self.writer.write(document_data, results)
+        if self.durability == "wait":
+            durable.result()
+            return dict(archive_info, durable=True)
+
+        archive_ref = archive_info["archive_ref"]
+        self._pending[archive_ref] = durable
+
+        def committed(future: Future):
+            # A failed commit stays pending so wait_durable() raises it
+            if future.exception() is None:
+                self._pending.pop(archive_ref, None)
+
+        durable.add_done_callback(committed)
+        return dict(archive_info, durable=False)
+
+    def wait_durable(self, archive_ref: str, timeout: Optional[float] = None):
+        """
+        Block until an "async" record is fsynced; raises its commit error.
+
+        Returns at once for records already durable or written in another
+        mode.
+        """
+        future = self._pending.get(archive_ref)
+        if future is not None:
+            future.result(timeout)
+
+    def close(self):
+        """Make pending evidence durable and stop the background writer."""
+        if self.writer is not None:
+            self.writer.close()
+
+    def _expired(self, deadline: Optional[float]) -> bool:
+        """True once the time.monotonic() deadline has passed."""
+        return deadline is not None and time.monotonic() >= deadline
+
+    def _log(self, message: str):
+        """Print stage progress (suppressed in service/batch workers)."""
+        if self.verbose:
+            print(message)
@@ -0,0 +1,251 @@
+"""
+Audit rollups: hourly decision counts maintained as the audit log grows.
+
+One row per (hour, decision, blocked_at, decision_maker):
+    count, first / last timestamp seen
+
+AuditLogger(rollups=True) updates {audit_dir}/rollups.sqlite in the same
+lock as each append, so regulatory reports over any whole-hour window are
+answered from the table without reading the log. The audit log stays the
+source of truth: rollup_state records the last audit_id applied, and any
+records past it (a writer that crashed between append and update, or a
+log that predates the rollups) are folded in by sync(). rebuild()
+recomputes everything from the log.
+
+Legacy one-file-per-decision records ({audit_id}.json, written before the
+log existed; nothing writes them any more) are folded in once by the
+first sync(), and again by rebuild().
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_rollups (
+    hour           TEXT NOT NULL,
+    decision       TEXT NOT NULL,
+    blocked_at     TEXT NOT NULL,
+    decision_maker TEXT NOT NULL,
+    count          INTEGER NOT NULL,
+    first          TEXT NOT NULL,
+    last           TEXT NOT NULL,
+    PRIMARY KEY (hour, decision, blocked_at, decision_maker)
+);
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT = """
+INSERT INTO audit_rollups VALUES (?,?,?,?,?,?,?)
+ON CONFLICT (hour, decision, blocked_at, decision_maker) DO UPDATE SET
+    count = count + excluded.count,
+    first = min(first, excluded.first),
+    last  = max(last, excluded.last)
+"""
+
+# blocked_at is part of the key; SQLite keys treat NULLs as distinct
+NO_BLOCK_POINT = ""
+
+# Records folded per transaction during sync()
+SYNC_CHUNK = 10000
+
+# Legacy per-decision files: audit_{context hash[:16]}_{epoch}.json
+LEGACY_PATTERN = "audit_*.json"
+
+
+def legacy_records(audit_dir: str) -> Iterator[Dict]:
+    """Legacy {audit_id}.json audit records in audit_dir, by file name."""
+    for path in sorted(Path(audit_dir).glob(LEGACY_PATTERN)):
+        with open(path, 'r') as f:
+            yield json.load(f)
+
+
+def hour_key(value: str) -> Optional[str]:
+    """
+    Rollup bound for an ISO 8601 since/until value, or None.
+
+    Prefixes up to the hour ("2026-01-01", "2026-01-01T05") and whole-hour
+    timestamps ("2026-01-01T05:00:00+00:00") map onto hourly buckets;
+    anything finer cannot be answered from the rollups.
+    """
+    if len(value) <= 13:
+        return value
+    rest = value[13:].replace("+00:00", "").rstrip("Z")
+    return value[:13] if rest.strip(":0.") == "" else None
+
+
+class AuditRollups:
+    """SQLite rollup tables of audit decisions."""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(
+            str(self.db_path), timeout=30, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._legacy_folded = False
+
+    def last_applied(self) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM rollup_state WHERE name = 'last_audit_id'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply(self, records: Iterable[Dict], last_audit_id: str):
+        """Count records (audit dicts) and advance the applied position."""
+        self._apply(records, "last_audit_id", last_audit_id)
+
+    def _apply(self, records: Iterable[Dict], state: str, value: str):
+        """Count records and set rollup_state[state] in one transaction."""
+        buckets: Dict[Tuple, List] = {}
+        for record in records:
+            timestamp = record["timestamp"]
+            key = (
+                timestamp[:13],
+                record["decision"],
+                record.get("blocked_at") or NO_BLOCK_POINT,
+                record["decision_maker_id"]
+            )
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [1, timestamp, timestamp]
+            else:
+                bucket[0] += 1
+                bucket[1] = min(bucket[1], timestamp)
+                bucket[2] = max(bucket[2], timestamp)
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                UPSERT, [key + tuple(value) for key, value in buckets.items()]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO rollup_state VALUES (?, ?)",
+                (state, value)
+            )
+
+    def sync(self, log, head: Optional[Dict] = None) -> int:
+        """
+        Fold in log records past the last applied one; returns how many.
+
+        Call with the log's lock held. head is the log's newest entry
+        when the caller already has it.
+        """
+        folded = self._fold_legacy(log.directory)
+        head = head or log.last_entry()
+        last_applied = self.last_applied()
+        if head is None or head["id"] == last_applied:
+            return folded
+
+        start_seq, start_record = (1, 0)
+        if last_applied is not None:
+            seq, record = log.parse_id(last_applied)
+            start_seq, start_record = seq, record + 1
+
+        applied, chunk, last_id = folded, [], None
+        for seq in log.segments():
+            if seq < start_seq:
+                continue
+            start = start_record if seq == start_seq else 0
+            for entry, data in log.iter_records(seq, start):
+                if data is not None:
+                    chunk.append(json.loads(bytes(data)))
+                last_id = entry["id"]
+                if len(chunk) >= SYNC_CHUNK:
+                    self.apply(chunk, last_id)
+                    applied += len(chunk)
+                    chunk = []
+        if last_id is not None:
+            self.apply(chunk, last_id)
+            applied += len(chunk)
+        return applied
+
+    def _fold_legacy(self, audit_dir: Path) -> int:
+        """Count legacy {audit_id}.json records, once per rollup table."""
+        if not self._legacy_folded:
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT value FROM rollup_state WHERE name = 'legacy'"
+                ).fetchone()
+            self._legacy_folded = row is not None
+        if self._legacy_folded:
+            return 0
+
+        records = list(legacy_records(audit_dir))
+        self._apply(records, "legacy", str(len(records)))
+        self._legacy_folded = True
+        return len(records)
+
+    def rebuild(self, log) -> int:
+        """Recompute every rollup from the log (call with its lock held)."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM audit_rollups")
+            self.conn.execute("DELETE FROM rollup_state")
+        self._legacy_folded = False
+        return self.sync(log)
+
+    def totals(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict:
+        """
+        Report counters for whole hours in [since, until).
+
+        Same shape as RegulatoryReportGenerator.aggregate(), plus
+        decision_makers and hours. ValueError if a bound is finer than
+        an hour (see hour_key).
+        """
+        clauses, params = [], []
+        for op, value in ((">=", since), ("<", until)):
+            if value:
+                key = hour_key(value)
+                if key is None:
+                    raise ValueError(f"Not an hour boundary: {value}")
+                clauses.append(f"hour {op} ?")
+                params.append(key)
+
+        sql = ("SELECT hour, decision, blocked_at, decision_maker, count, "
+               "first, last FROM audit_rollups")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY hour, decision, blocked_at, decision_maker"
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+        stats = {
+            "total": 0, "admitted": 0, "stopped": 0,
+            "block_points": {}, "decision_makers": {},
+            "first": None, "last": None, "hours": 0
+        }
+        hours = set()
+        for hour, decision, blocked_at, maker, count, first, last in rows:
+            hours.add(hour)
+            stats["total"] += count
+            if decision == "ADMIT":
+                stats["admitted"] += count
+            elif decision == "STOP":
+                stats["stopped"] += count
+                bp = blocked_at if blocked_at != NO_BLOCK_POINT else None
+                stats["block_points"][bp] = \
+                    stats["block_points"].get(bp, 0) + count
+            stats["decision_makers"][maker] = \
+                stats["decision_makers"].get(maker, 0) + count
+            if stats["first"] is None or first < stats["first"]:
+                stats["first"] = first
+            if stats["last"] is None or last > stats["last"]:
+                stats["last"] = last
+        stats["hours"] = len(hours)
+        return stats
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,629 @@
+"""
+Segment log: large append-only data files with sidecar offset indexes.
+
+Layout (per prefix):
+- {prefix}_{seq:06d}.seg       concatenated records (raw bytes)
+- {prefix}_{seq:06d}.idx.jsonl one JSON line per record:
+                               {"id", "record", "offset", "length",
+                                "written_at", ...caller metadata}
+
+Record ids are "{id_prefix}_{seq:06d}_{record:08d}", so any record can be
+located from its id alone: open the segment's index, take line `record`,
+seek to `offset`. The active segment rolls over to a new one once it
+reaches max_segment_bytes or max_segment_age seconds.
+
+With compression ("zlib" or "lzma"), a segment is sealed when it rolls
+over: its records are regrouped into independently compressed frames of
+about frame_bytes, cut at record boundaries, and the .seg file is replaced
+by
+- {prefix}_{seq:06d}.zseg          concatenated compressed frames
+- {prefix}_{seq:06d}.frames.jsonl  one JSON line per frame:
+                                   {"offset", "length", "raw_offset",
+                                    "raw_length", "codec"}
+
+Index offsets and lengths always refer to the uncompressed bytes, so ids,
+index entries and hashes are unchanged by sealing; reading one record
+decompresses only the frame that holds it. The active segment stays
+uncompressed, so an append is visible to readers as soon as it returns.
+append() does not fsync, so crash durability is up to the caller: the
+evidence archive's durability setting ("wait" and "async" fsync through
+engine.writer; "none" leaves it to the OS).
+
+A rolled-over segment is immutable, so the writer that rolled it over
+compresses it after releasing the lock (at the end of append, or via
+seal_rolled() for callers holding the lock); only the final renames take
+the lock, and other writers keep appending meanwhile.
+
+Several processes may append to the same directory: appends, rollover
+and sealing take an advisory lock ({prefix}.lock), and a writer first
+catches up on records other writers appended since its last write.
+"""
+import bisect
+import json
+import lzma
+import mmap
+import os
+import secrets
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from common.locking import FileLock
+
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+class SegmentLog:
+    """Append-only segmented record store with per-segment offset index."""
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "segment",
+        id_prefix: Optional[str] = None,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age: Optional[float] = 24 * 3600,
+        compression: Optional[str] = None,
+        frame_bytes: int = 256 * 1024
+    ):
+        if compression is not None and compression not in CODECS:
+            raise ValueError(f"Unknown compression: {compression}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.id_prefix = id_prefix or prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compression = compression
+        self.frame_bytes = frame_bytes
+
+        # Loaded segment indexes: seq → list of entries (by record number)
+        self._indexes: Dict[int, List[Dict]] = {}
+        # Loaded frame indexes of sealed segments: seq → list of frames
+        self._frames: Dict[int, List[Dict]] = {}
+        # Last decompressed frame: ((seq, frame offset), raw bytes)
+        self._frame_cache: Optional[Tuple[Tuple[int, int], bytes]] = None
+
+        self._lock = FileLock(self.directory / f"{prefix}.lock")
+        self._active_seq: Optional[int] = None
+        # Bytes of the active index already reflected in the state below
+        self._index_bytes = 0
+        self._active_size = 0
+        self._active_records = 0
+        self._active_created: Optional[float] = None
+        # Newest index entry across all segments, as of the last write
+        self._last_entry: Optional[Dict] = None
+        # Rolled-over segments this writer still has to seal
+        self._rolled: List[int] = []
+
+    # --- Naming ---
+
+    def segment_name(self, seq: int) -> str:
+        return f"{self.prefix}_{seq:06d}"
+
+    def data_path(self, seq: int) -> Path:
+        return self.directory / f"{self.segment_name(seq)}.seg"
+
+    def index_path(self, seq: int) -> Path:
+        return self.directory / f"{self.segment_name(seq)}.idx.jsonl"
+
+    def compressed_path(self, seq: int) -> Path:
+        return self.directory / f"{self.segment_name(seq)}.zseg"
+
+    def frames_path(self, seq: int) -> Path:
+        return self.directory / f"{self.segment_name(seq)}.frames.jsonl"
+
+    def is_sealed(self, seq: int) -> bool:
+        """True once the segment's frame index exists (seal committed)."""
+        return self.frames_path(seq).exists()
+
+    def was_sealed(self, path: Path) -> bool:
+        """True if path is the .seg file of a segment sealed since."""
+        name = Path(path).name
+        head = f"{self.prefix}_"
+        if not (name.startswith(head) and name.endswith(".seg")):
+            return False
+        seq = name[len(head):-len(".seg")]
+        return seq.isdigit() and self.is_sealed(int(seq))
+
+    def make_id(self, seq: int, record: int) -> str:
+        return f"{self.id_prefix}_{seq:06d}_{record:08d}"
+
+    def parse_id(self, record_id: str) -> Tuple[int, int]:
+        """Split record id into (segment seq, record number)."""
+        head, sep, tail = record_id.rpartition("_")
+        prefix, sep2, seq = head.rpartition("_")
+        if not sep or not sep2 or prefix != self.id_prefix:
+            raise KeyError(f"Not a {self.id_prefix} record id: {record_id}")
+        return int(seq), int(tail)
+
+    def segments(self) -> List[int]:
+        """Existing segment sequence numbers, oldest first."""
+        seqs = []
+        for path in self.directory.glob(f"{self.prefix}_*.idx.jsonl"):
+            stem = path.name[len(self.prefix) + 1:-len(".idx.jsonl")]
+            if stem.isdigit():
+                seqs.append(int(stem))
+        return sorted(seqs)
+
+    # --- Writing ---
+
+    @property
+    def lock(self) -> FileLock:
+        """
+        The writers' lock; hold it across last_entry() and append() to
+        make a record depend on its predecessor (e.g. a hash chain).
+        """
+        return self._lock
+
+    def last_entry(self) -> Optional[Dict]:
+        """Newest record's index entry, including other writers' (or None)."""
+        with self._lock:
+            self._ensure_active(0)
+            last = dict(self._last_entry) if self._last_entry else None
+        self.seal_rolled()
+        return last
+
+    def append(self, data: bytes, meta: Optional[Dict] = None) -> Dict:
+        """
+        Append one record; returns its index entry (with "id").
+
+        Data is written before its index line, so a crash can leave
+        unindexed trailing bytes but never an index entry without data.
+        """
+        with self._lock:
+            entry = self._append(data, meta)
+        self.seal_rolled()
+        return entry
+
+    def append_many(
+        self,
+        items: List[Tuple[bytes, Optional[Dict]]]
+    ) -> List[Dict]:
+        """
+        Append a batch of (data, meta) records with one write per file.
+
+        The batch lands in a single segment (it may overflow
+        max_segment_bytes; the next append rolls over).
+        """
+        with self._lock:
+            entries = self._append_many(items)
+        self.seal_rolled()
+        return entries
+
+    def _append(self, data: bytes, meta: Optional[Dict]) -> Dict:
+        return self._append_many([(data, meta)])[0]
+
+    def _append_many(
+        self,
+        items: List[Tuple[bytes, Optional[Dict]]]
+    ) -> List[Dict]:
+        if not items:
+            return []
+        self._ensure_active(sum(len(data) for data, _ in items))
+        seq = self._active_seq
+
+        entries, lines = [], []
+        offset, record = self._active_size, self._active_records
+        now = time.time()
+        for data, meta in items:
+            entry = {
+                "id": self.make_id(seq, record),
+                "record": record,
+                "offset": offset,
+                "length": len(data),
+                "written_at": now
+            }
+            entry.update(meta or {})
+            entries.append(entry)
+            lines.append(json.dumps(entry, separators=(',', ':')) + '\n')
+            offset += len(data)
+            record += 1
+
+        block = ''.join(lines).encode('utf-8')
+        with open(self.data_path(seq), 'ab') as f:
+            f.write(b''.join(data for data, _ in items))
+        with open(self.index_path(seq), 'ab') as f:
+            f.write(block)
+
+        self._index_bytes += len(block)
+        self._active_size = offset
+        self._active_records = record
+        self._last_entry = entries[-1]
+        if seq in self._indexes:
+            self._indexes[seq].extend(entries)
+
+        segment = self.segment_name(seq)
+        return [dict(entry, segment=segment) for entry in entries]
+
+    def _ensure_active(self, incoming: int):
+        """Open the newest segment, or roll over if it is full or old."""
+        if self._active_seq is None:
+            seqs = self.segments()
+            self._last_entry = self._tail_entry(seqs)
+            if self.compression:
+                # Catch up on segments left unsealed (crash, setting change)
+                self._rolled.extend(
+                    seq for seq in seqs[:-1] if self.data_path(seq).exists()
+                )
+            if seqs and self.is_sealed(seqs[-1]):
+                self._start_segment(seqs[-1] + 1)
+                return
+            if seqs:
+                self._open_existing(seqs[-1])
+            else:
+                self._start_segment(1)
+                return
+        elif self.index_path(self._active_seq + 1).exists():
+            # Another writer rolled over; follow it to the newest segment
+            self._active_seq = None
+            return self._ensure_active(incoming)
+        else:
+            self._catch_up()
+
+        full = (
+            self._active_records > 0 and
+            self._active_size + incoming > self.max_segment_bytes
+        )
+        old = (
+            self.max_segment_age is not None and
+            self._active_created is not None and
+            time.time() - self._active_created > self.max_segment_age
+        )
+        if full or old:
+            previous = self._active_seq
+            self._start_segment(previous + 1)
+            if self.compression:
+                self._rolled.append(previous)
+
+    def _open_existing(self, seq: int):
+        """Resume appending to an existing segment."""
+        self._repair_index(seq)
+        self._indexes.pop(seq, None)
+        entries = self._load_index(seq)
+        self._active_seq = seq
+        self._active_records = len(entries)
+        # Index is authoritative: bytes past the last indexed record are
+        # crash leftovers and are truncated before appending
+        self._active_size = (
+            entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+        )
+        self._active_created = entries[0]["written_at"] if entries else None
+        self._index_bytes = self.index_path(seq).stat().st_size
+        self._truncate_orphans(seq)
+
+    def _catch_up(self):
+        """Account for records other writers appended to the active segment."""
+        seq = self._active_seq
+        path = self.index_path(seq)
+        if path.stat().st_size == self._index_bytes:
+            return
+
+        with open(path, 'rb') as f:
+            f.seek(self._index_bytes)
+            tail = f.read()
+        complete = tail[:tail.rfind(b'\n') + 1]
+        for line in complete.splitlines():
+            entry = json.loads(line)
+            self._active_records = entry["record"] + 1
+            self._active_size = entry["offset"] + entry["length"]
+            self._last_entry = entry
+        self._index_bytes += len(complete)
+
+        # Holding the lock, a partial line is a crashed writer's leftover
+        if len(complete) < len(tail):
+            with open(path, 'r+b') as f:
+                f.truncate(self._index_bytes)
+        self._indexes.pop(seq, None)
+        self._truncate_orphans(seq)
+
+    def _tail_entry(self, seqs: List[int]) -> Optional[Dict]:
+        """Last complete index entry of the newest non-empty segment."""
+        for seq in reversed(seqs):
+            with open(self.index_path(seq), 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                # Index lines are small; the tail holds the last whole one
+                f.seek(max(0, size - 65536))
+                tail = f.read()
+            lines = tail[:tail.rfind(b'\n') + 1].splitlines()
+            if lines:
+                return json.loads(lines[-1])
+        return None
+
+    def _start_segment(self, seq: int):
+        self._active_seq = seq
+        self._index_bytes = 0
+        self._active_size = 0
+        self._active_records = 0
+        self._active_created = time.time()
+        self.index_path(seq).touch()
+        self.data_path(seq).touch()
+
+    def _repair_index(self, seq: int):
+        """Cut a torn final index line (crash mid-write)."""
+        path = self.index_path(seq)
+        with open(path, 'rb') as f:
+            content = f.read()
+        if content and not content.endswith(b'\n'):
+            with open(path, 'r+b') as f:
+                f.truncate(content.rfind(b'\n') + 1)
+            self._indexes.pop(seq, None)
+
+    def _truncate_orphans(self, seq: int):
+        """Drop data bytes written after the last index entry (crash)."""
+        path = self.data_path(seq)
+        if path.exists() and path.stat().st_size > self._active_size:
+            with open(path, 'r+b') as f:
+                f.truncate(self._active_size)
+
+    def seal_rolled(self):
+        """
+        Seal the segments this writer rolled over.
+
+        Deferred while the calling thread holds the lock (e.g. across
+        last_entry() and append()); call again after releasing it.
+        """
+        if not self.compression or self._lock.held():
+            return
+        while self._rolled:
+            self.seal(self._rolled.pop(0))
+
+    def seal(self, seq: int):
+        """
+        Compress a rolled-over segment into frames (no-op if sealed).
+
+        Frames are written to temporary files without the lock; under the
+        lock, the frame index rename is the commit point, after which the
+        .seg file is removed. A crash at any step leaves either the .seg
+        or a complete sealed segment; a concurrent sealer's work is
+        discarded.
+        """
+        if not self.index_path(seq + 1).exists():
+            raise ValueError(f"Cannot seal the active segment {seq}")
+
+        raw_path = self.data_path(seq)
+        if self.is_sealed(seq) or not raw_path.exists():
+            with self._lock:
+                self._commit_seal(seq, None)
+            return
+
+        token = f"{os.getpid()}.{secrets.token_hex(4)}"
+        z_tmp = self.directory / f".{self.segment_name(seq)}.zseg.{token}.tmp"
+        frames_tmp = self.directory / \
+            f".{self.segment_name(seq)}.frames.{token}.tmp"
+        try:
+            self._compress(seq, z_tmp, frames_tmp)
+            with self._lock:
+                self._commit_seal(seq, (z_tmp, frames_tmp))
+        finally:
+            for path in (z_tmp, frames_tmp):
+                if path.exists():
+                    path.unlink()
+
+    def _compress(self, seq: int, z_path: Path, frames_path: Path):
+        """Write the segment's frames and frame index, fsynced."""
+        encode, _ = CODECS[self.compression]
+
+        with open(self.data_path(seq), 'rb') as src, \
+                open(z_path, 'wb') as dst, \
+                open(frames_path, 'w', encoding='utf-8') as frames:
+
+            def emit(raw_offset: int, raw_end: int):
+                src.seek(raw_offset)
+                packed = encode(src.read(raw_end - raw_offset))
+                frames.write(json.dumps({
+                    "offset": dst.tell(),
+                    "length": len(packed),
+                    "raw_offset": raw_offset,
+                    "raw_length": raw_end - raw_offset,
+                    "codec": self.compression
+                }, separators=(',', ':')) + '\n')
+                dst.write(packed)
+
+            # Group whole records until a frame reaches frame_bytes
+            frame_start = frame_end = 0
+            for entry in self.iter_segment(seq):
+                end = entry["offset"] + entry["length"]
+                if frame_end > frame_start and \
+                        end - frame_start > self.frame_bytes:
+                    emit(frame_start, frame_end)
+                    frame_start = frame_end
+                frame_end = end
+            if frame_end > frame_start:
+                emit(frame_start, frame_end)
+
+            dst.flush()
+            os.fsync(dst.fileno())
+            frames.flush()
+            os.fsync(frames.fileno())
+
+    def _commit_seal(self, seq: int, compressed: Optional[Tuple[Path, Path]]):
+        """Install compressed (z, frames) files unless already sealed."""
+        raw_path = self.data_path(seq)
+        if not self.is_sealed(seq):
+            if compressed is None or not raw_path.exists():
+                return
+            z_tmp, frames_tmp = compressed
+            os.replace(z_tmp, self.compressed_path(seq))
+            os.replace(frames_tmp, self.frames_path(seq))
+        if raw_path.exists():
+            raw_path.unlink()  # committed, here or by a crashed sealer
+        self._frames.pop(seq, None)
+
+    # --- Reading ---
+
+    def _load_index(self, seq: int) -> List[Dict]:
+        if seq not in self._indexes:
+            entries = []
+            path = self.index_path(seq)
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            break  # torn final line
+            self._indexes[seq] = entries
+        return self._indexes[seq]
+
+    def locate(self, record_id: str) -> Dict:
+        """Index entry for record id (raises KeyError if unknown)."""
+        seq, record = self.parse_id(record_id)
+        entries = self._load_index(seq)
+        if record >= len(entries):
+            # Possibly appended by another writer since the index was loaded
+            self._indexes.pop(seq, None)
+            entries = self._load_index(seq)
+        if record >= len(entries) or entries[record]["id"] != record_id:
+            raise KeyError(f"Record not found: {record_id}")
+        return dict(entries[record], segment=self.segment_name(seq))
+
+    def read(self, record_id: str) -> Tuple[Dict, bytes]:
+        """Random access: (index entry, record bytes) for record id."""
+        entry = self.locate(record_id)
+        return entry, self.read_entry(entry)
+
+    def read_entry(self, entry: Dict) -> bytes:
+        seq, _ = self.parse_id(entry["id"])
+        if self.is_sealed(seq):
+            return self._read_sealed(seq, entry)
+        try:
+            with open(self.data_path(seq), 'rb') as f:
+                f.seek(entry["offset"])
+                return f.read(entry["length"])
+        except FileNotFoundError:
+            # Sealed by another writer since is_sealed() was checked
+            return self._read_sealed(seq, entry)
+
+    def _load_frames(self, seq: int) -> List[Dict]:
+        if seq not in self._frames:
+            with open(self.frames_path(seq), 'r', encoding='utf-8') as f:
+                self._frames[seq] = [json.loads(line) for line in f]
+        return self._frames[seq]
+
+    def _decode_frame(self, seq: int, frame: Dict, f=None) -> bytes:
+        """Decompress one frame (cached while reads stay in it)."""
+        key = (seq, frame["offset"])
+        if self._frame_cache and self._frame_cache[0] == key:
+            return self._frame_cache[1]
+        if f is None:
+            with open(self.compressed_path(seq), 'rb') as zf:
+                zf.seek(frame["offset"])
+                packed = zf.read(frame["length"])
+        else:
+            f.seek(frame["offset"])
+            packed = f.read(frame["length"])
+        _, decode = CODECS[frame["codec"]]
+        raw = decode(packed)
+        self._frame_cache = (key, raw)
+        return raw
+
+    def _read_sealed(self, seq: int, entry: Dict) -> bytes:
+        frames = self._load_frames(seq)
+        i = bisect.bisect_right(
+            [frame["raw_offset"] for frame in frames], entry["offset"]
+        ) - 1
+        if i < 0:
+            return b''
+        frame = frames[i]
+        start = entry["offset"] - frame["raw_offset"]
+        return self._decode_frame(seq, frame)[start:start + entry["length"]]
+
+    def data_size(self, seq: int) -> int:
+        """Uncompressed size of a segment's data."""
+        if self.is_sealed(seq):
+            frames = self._load_frames(seq)
+            return frames[-1]["raw_offset"] + frames[-1]["raw_length"] \
+                if frames else 0
+        path = self.data_path(seq)
+        return path.stat().st_size if path.exists() else 0
+
+    def iter_records(
+        self,
+        seq: int,
+        start: int = 0
+    ) -> Iterator[Tuple[Dict, Optional[object]]]:
+        """
+        Sequential scan: (index entry, bytes-like) from record `start` on.
+
+        Raw segments are memory-mapped (payloads are memoryviews valid
+        until the next iteration); sealed segments decompress each frame
+        once. Payload is None when the record's data is missing or its
+        frame cannot be decoded.
+        """
+        if self.is_sealed(seq):
+            yield from self._iter_sealed(seq, start)
+            return
+
+        path = self.data_path(seq)
+        size = path.stat().st_size if path.exists() else 0
+        if size == 0:
+            for entry in self.iter_segment(seq):
+                if entry["record"] >= start:
+                    yield entry, (b'' if entry["length"] == 0 else None)
+            return
+
+        with open(path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for entry in self.iter_segment(seq):
+                if entry["record"] < start:
+                    continue
+                end = entry["offset"] + entry["length"]
+                if end > size:
+                    yield entry, None
+                    continue
+                view = memoryview(mapped)[entry["offset"]:end]
+                try:
+                    yield entry, view
+                finally:
+                    view.release()
+
+    def _iter_sealed(
+        self,
+        seq: int,
+        start: int
+    ) -> Iterator[Tuple[Dict, Optional[bytes]]]:
+        frames = self._load_frames(seq)
+        i, raw = -1, None
+        with open(self.compressed_path(seq), 'rb') as f:
+            for entry in self.iter_segment(seq):
+                if entry["record"] < start:
+                    continue
+                # Advance to the frame holding this record
+                while i + 1 < len(frames) and \
+                        frames[i + 1]["raw_offset"] <= entry["offset"]:
+                    i += 1
+                    try:
+                        raw = self._decode_frame(seq, frames[i], f)
+                    except (zlib.error, lzma.LZMAError):
+                        raw = None
+                if i < 0 or raw is None:
+                    yield entry, None
+                    continue
+                offset = entry["offset"] - frames[i]["raw_offset"]
+                if offset + entry["length"] > len(raw):
+                    yield entry, None
+                    continue
+                yield entry, raw[offset:offset + entry["length"]]
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """All index entries, oldest segment first (streams each index)."""
+        for seq in self.segments():
+            yield from self.iter_segment(seq)
+
+    def iter_segment(self, seq: int) -> Iterator[Dict]:
+        """Index entries of one segment, streamed without caching."""
+        with open(self.index_path(seq), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final line
+                entry["segment"] = self.segment_name(seq)
+                yield entry
@@ -0,0 +1,269 @@
+"""
+Extraction service: long-lived daemon with warm pipelines.
+
+Keeps schema, compiled patterns and pipeline objects resident in a pool
+of worker processes, so each request pays only for the extraction itself.
+
+Endpoints (JSON over HTTP, TCP or Unix socket):
+- POST /extract  {"path": ...} or {"content": ..., "source_id": ...}
+                 optional "dry_run": bool, "timeout": seconds
+                 → same JSON as ExtractionPipeline.run
+- GET  /health   → {"status": "ok", "workers": N}
+
+Usage:
+    python -m engine serve --port 8765 --workers 4
+    python -m engine serve --socket /tmp/ajt-extract.sock
+"""
+import argparse
+import json
+import os
+import signal
+import socketserver
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.util import Finalize
+from typing import Dict, Optional
+
+from engine.archive import LAYOUTS
+from engine.segments import CODECS
+from engine.writer import DURABILITY
+from engine.pipeline import ExtractionPipeline
+
+
+# Per-process state, built once by the pool initializer
+_pipeline: Optional[ExtractionPipeline] = None
+_timeout: Optional[float] = None
+
+
+def _init_worker(
+    schema_path: str,
+    archive_dir: str,
+    timeout: Optional[float] = None,
+    archive_options: Optional[Dict] = None
+):
+    """Build the warm pipeline for this worker process."""
+    global _pipeline, _timeout
+    _pipeline = ExtractionPipeline(
+        schema_path=schema_path,
+        archive_dir=archive_dir,
+        verbose=False,
+        **(archive_options or {})
+    )
+    # Pool workers exit without atexit; commit queued evidence at exit
+    Finalize(_pipeline, _pipeline.close, exitpriority=10)
+    _timeout = timeout
+
+
+def _run_job(job: Dict) -> Dict:
+    """Run one extraction job in a worker process."""
+    dry_run = bool(job.get("dry_run", False))
+    timeout = job.get("timeout", _timeout)
+    deadline = time.monotonic() + float(timeout) if timeout else None
+
+    if "content" in job:
+        return _pipeline.run_text(
+            job["content"],
+            job.get("source_id", "<memory>"),
+            dry_run=dry_run,
+            deadline=deadline
+        )
+
+    if "path" in job:
+        return _pipeline.run(job["path"], dry_run=dry_run, deadline=deadline)
+
+    raise ValueError("Job requires 'path' or 'content'")
+
+
+class ExtractionService:
+    """Worker pool of warm extraction pipelines."""
+
+    def __init__(
+        self,
+        schema_path: str = "schema/extraction_schema.json",
+        archive_dir: str = "evidence",
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        archive_options: Optional[Dict] = None
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(schema_path, archive_dir, timeout, archive_options)
+        )
+
+    def submit(self, job: Dict):
+        """Submit job to the pool; returns a Future of the pipeline output."""
+        return self.pool.submit(_run_job, job)
+
+    def shutdown(self):
+        """Stop accepting jobs and wait for in-flight ones."""
+        self.pool.shutdown(wait=True)
+
+
+class _ExtractionHandler(BaseHTTPRequestHandler):
+    """HTTP front end; blocks its connection thread on the worker future."""
+
+    server_version = "AJTExtract/1.0"
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        self._send(200, {
+            "status": "ok",
+            "workers": self.server.service.workers
+        })
+
+    def do_POST(self):
+        if self.path != "/extract":
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send(400, {"error": f"Invalid JSON: {e}"})
+            return
+
+        if not isinstance(job, dict):
+            self._send(400, {"error": "Request body must be a JSON object"})
+            return
+
+        try:
+            output = self.server.service.submit(job).result()
+        except FileNotFoundError as e:
+            self._send(404, {"error": str(e)})
+            return
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        self._send(200, output)
+
+    def _send(self, status: int, body: Dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server bound to a Unix domain socket."""
+
+    daemon_threads = True
+
+
+def make_server(
+    service: ExtractionService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    verbose: bool = False
+):
+    """Create HTTP server (TCP, or Unix socket if socket_path is given)."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, _ExtractionHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _ExtractionHandler)
+
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve extraction requests from warm worker processes."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Unix socket path (instead of TCP)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--schema", default="schema/extraction_schema.json")
+    parser.add_argument("--archive-dir", default="evidence")
+    parser.add_argument("--archive-layout", choices=LAYOUTS, default="files")
+    parser.add_argument("--archive-compression", choices=sorted(CODECS),
+                        default=None,
+                        help="Seal rolled-over segments into compressed "
+                             "frames (segments layout)")
+    parser.add_argument("--archive-index", action="store_true",
+                        help="Maintain the SQLite decision index "
+                             "(<archive-dir>/index.sqlite)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Store large evidence values once in the "
+                             "content-addressed blob store")
+    parser.add_argument("--durability", choices=DURABILITY, default="none",
+                        help="fsync evidence: none, wait (before returning; "
+                             "one commit per request, as a worker runs one "
+                             "job at a time) or async (group commit in "
+                             "background)")
+    parser.add_argument("--merkle", action="store_true",
+                        help="Add every extraction to the archive Merkle log")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Default per-document deadline in seconds")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    service = ExtractionService(
+        schema_path=args.schema,
+        archive_dir=args.archive_dir,
+        workers=args.workers,
+        timeout=args.timeout,
+        archive_options={
+            "layout": args.archive_layout,
+            "merkle": args.merkle,
+            "compression": args.archive_compression,
+            "durability": args.durability,
+            "index": args.archive_index,
+            "dedup": args.dedup
+        }
+    )
+    server = make_server(
+        service,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        verbose=args.verbose
+    )
+
+    def _terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _terminate)
+
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"[SERVICE] {service.workers} workers listening on {where}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Storage helpers for several writer processes sharing one directory.
+
+- unique_stem():  collision-free, time-sortable file stem
+- write_atomic(): temp file + rename, optionally refusing to overwrite
+
+Writers that append to a shared index serialize with
+common.locking.FileLock.
+"""
+import os
+import secrets
+from pathlib import Path
+from typing import Union
+
+
+def unique_stem(timestamp: str) -> str:
+    """
+    File stem for an ISO 8601 timestamp, unique across processes.
+
+    "{timestamp with ':' and '.' replaced by '-'}_{8 hex}" sorts by time;
+    the random suffix separates writers within the same microsecond.
+    """
+    safe_timestamp = timestamp.replace(":", "-").replace(".", "-")
+    return f"{safe_timestamp}_{secrets.token_hex(4)}"
+
+
+def write_atomic(
+    path: Union[str, Path],
+    data: Union[bytes, str],
+    exclusive: bool = False
+):
+    """
+    Write data to path via a temp file and rename.
+
+    Readers see either no file or the complete file. With exclusive=True
+    an existing path is never replaced (FileExistsError instead), so two
+    writers choosing the same name cannot overwrite each other.
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    tmp_path = path.with_name(
+        f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    )
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        if exclusive:
+            os.link(tmp_path, path)  # fails if path exists
+        else:
+            os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
@@ -0,0 +1,402 @@
+"""
+Archive verifier: integrity sweep over every archived extraction.
+
+For each record (manifest_*.json in the "files" layout, each segment index
+entry in the "segments" layout) the extraction JSONL is re-hashed and
+compared with extraction_hash, and the trace signature is recomputed from
+the parsed results. Data files are memory-mapped (sealed segments are
+decompressed frame by frame) and hashed in worker processes, so the sweep
+is bounded by disk bandwidth, not one core.
+
+Report (JSON):
+    {"archive_dir", "started_at", "finished_at", "incremental",
+     "summary": {"checked", "ok", "mismatched", "skipped"},
+     "mismatches": [{"archive_ref", "check", "expected", "actual"}]}
+
+check is "extraction_hash", "event_ref" (a v2 manifest's stop_refs /
+accept_refs line hash; actual is null when the line is missing),
+"trace_signature" or "unreadable" (with "error" instead of
+expected/actual).
+
+Incremental mode keeps a checkpoint of what already verified: manifests by
+(size, mtime) of manifest and JSONL file, segments by record count and data
+size. Unchanged manifests and already verified segment records are
+skipped; new or modified ones are checked again. Mismatches are never
+checkpointed, so they are reported on every sweep until fixed.
+
+Usage:
+    python -m engine verify --archive-dir evidence --workers 8
+    python -m engine verify --incremental --report verify_report.json
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from engine.archive import EvidenceArchive
+
+
+# Per-process archive handle, built once by the pool initializer
+_archive: Optional[EvidenceArchive] = None
+
+
+def _init_worker(archive_dir: str):
+    global _archive
+    _archive = EvidenceArchive(archive_dir)
+
+
+def _map(path: Path) -> Tuple[object, Optional[mmap.mmap]]:
+    """Open path read-only and memory-map it (empty files are not mapped)."""
+    f = open(path, 'rb')
+    if os.fstat(f.fileno()).st_size == 0:
+        return f, None
+    return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _check_payload(
+    archive_ref: str,
+    manifest: Dict,
+    payload,
+    mismatches: List[Dict]
+) -> bool:
+    """Compare payload (bytes-like) against manifest; record mismatches."""
+    results = None
+    if manifest.get("dedup"):
+        # Hashes cover the JSONL with blob references expanded
+        results, payload = _archive._resolve(manifest, bytes(payload))
+    actual_hash = hashlib.sha256(payload).hexdigest()
+    if actual_hash != manifest["extraction_hash"]:
+        mismatches.append({
+            "archive_ref": archive_ref,
+            "check": "extraction_hash",
+            "expected": manifest["extraction_hash"],
+            "actual": actual_hash
+        })
+        return False
+
+    payload = bytes(payload)
+    if manifest.get("manifest_version", 1) >= 2:
+        lines = payload.splitlines()
+        for ref in manifest["stop_refs"] + manifest["accept_refs"]:
+            line_no = ref["line"]
+            actual = hashlib.sha256(lines[line_no - 1]).hexdigest() \
+                if 0 < line_no <= len(lines) else None
+            if actual != ref["hash"]:
+                mismatches.append({
+                    "archive_ref": archive_ref,
+                    "check": "event_ref",
+                    "expected": ref["hash"],
+                    "actual": actual
+                })
+                return False
+
+    if results is None:
+        results = _archive._parse_results(payload)
+    signature = _archive._compute_trace_signature(
+        {"content_hash": manifest["document_hash"]}, results
+    )
+    if signature != manifest["trace_signature"]:
+        mismatches.append({
+            "archive_ref": archive_ref,
+            "check": "trace_signature",
+            "expected": manifest["trace_signature"],
+            "actual": signature
+        })
+        return False
+
+    return True
+
+
+def _extraction_path(manifest_path: Path, manifest: Dict) -> Path:
+    """JSONL file next to the manifest, else the path as recorded."""
+    sibling = manifest_path.parent / Path(manifest["extraction_file"]).name
+    return sibling if sibling.exists() else Path(manifest["extraction_file"])
+
+
+def _fingerprint(manifest_path: Path, extraction_path: Path) -> List[int]:
+    m, e = manifest_path.stat(), extraction_path.stat()
+    return [m.st_size, m.st_mtime_ns, e.st_size, e.st_mtime_ns]
+
+
+def _verify_manifests(paths: List[str], known: Dict[str, List[int]]) -> Dict:
+    """Verify a chunk of manifests; skip those matching known fingerprints."""
+    outcome = {"checked": 0, "skipped": 0, "mismatches": [], "verified": {}}
+
+    for path_str in paths:
+        manifest_path = Path(path_str)
+        key = manifest_path.name
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            extraction_path = _extraction_path(manifest_path, manifest)
+            fingerprint = _fingerprint(manifest_path, extraction_path)
+            if known.get(key) == fingerprint:
+                outcome["skipped"] += 1
+                continue
+
+            outcome["checked"] += 1
+            f, mapped = _map(extraction_path)
+            try:
+                ok = _check_payload(
+                    path_str, manifest,
+                    mapped if mapped is not None else b'',
+                    outcome["mismatches"]
+                )
+            finally:
+                if mapped is not None:
+                    mapped.close()
+                f.close()
+        except (OSError, ValueError, KeyError) as e:
+            outcome["checked"] += 1
+            outcome["mismatches"].append({
+                "archive_ref": path_str,
+                "check": "unreadable",
+                "error": f"{type(e).__name__}: {e}"
+            })
+            continue
+
+        if ok:
+            outcome["verified"][key] = fingerprint
+
+    return outcome
+
+
+def _verify_segment(seq: int, known: Optional[Dict]) -> Dict:
+    """Verify one segment from its first unverified record."""
+    segments = _archive.segments
+    name = segments.segment_name(seq)
+    outcome = {"checked": 0, "skipped": 0, "mismatches": [], "verified": {}}
+
+    # Sizes are uncompressed, so sealing a segment keeps its checkpoint
+    data_size = segments.data_size(seq)
+    # Segments only grow; a shrunken data file is verified from scratch
+    start = 0
+    if known and data_size >= known["data_size"]:
+        start = known["records"]
+        outcome["skipped"] = start
+
+    verified, clean = start, True
+    verified_size = known["data_size"] if start else 0
+    for entry, payload in segments.iter_records(seq, start):
+        outcome["checked"] += 1
+        if payload is None:
+            outcome["mismatches"].append({
+                "archive_ref": entry["id"],
+                "check": "unreadable",
+                "error": "Record data missing or undecodable"
+            })
+            ok = False
+        else:
+            try:
+                ok = _check_payload(
+                    entry["id"], entry, payload, outcome["mismatches"]
+                )
+            except (OSError, ValueError, KeyError) as e:
+                outcome["mismatches"].append({
+                    "archive_ref": entry["id"],
+                    "check": "unreadable",
+                    "error": f"{type(e).__name__}: {e}"
+                })
+                ok = False
+        # Checkpoint only the clean prefix of the segment
+        if ok and clean:
+            verified = entry["record"] + 1
+            verified_size = entry["offset"] + entry["length"]
+        clean = clean and ok
+
+    outcome["verified"][name] = {
+        "records": verified, "data_size": verified_size
+    }
+    return outcome
+
+
+class ArchiveVerifier:
+    """Parallel integrity sweep over an evidence archive."""
+
+    def __init__(
+        self,
+        archive_dir: str = "evidence",
+        workers: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        chunk_size: int = 64,
+        window: Optional[int] = None,
+        checkpoint_every: int = 100
+    ):
+        self.archive_dir = Path(archive_dir)
+        if not self.archive_dir.is_dir():
+            raise FileNotFoundError(f"Archive not found: {archive_dir}")
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.chunk_size = chunk_size
+        self.window = window or self.workers * 4
+        self.checkpoint_every = checkpoint_every
+        self.state = {"files": {}, "segments": {}}
+
+    def load_checkpoint(self) -> Dict:
+        """Load verified-record state from the checkpoint (if any)."""
+        if self.checkpoint_path and self.checkpoint_path.exists():
+            with open(self.checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+            self.state = {
+                "files": checkpoint.get("files", {}),
+                "segments": checkpoint.get("segments", {})
+            }
+        return self.state
+
+    def run(self, incremental: bool = False) -> Dict:
+        """
+        Verify every archived record; returns the report.
+
+        With incremental=True, records verified at the last checkpoint are
+        skipped. The checkpoint (if configured) is updated either way.
+        """
+        if incremental:
+            self.load_checkpoint()
+        known = self.state if incremental else {"files": {}, "segments": {}}
+        report = {
+            "archive_dir": str(self.archive_dir),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "incremental": incremental,
+            "summary": {"checked": 0, "ok": 0, "mismatched": 0, "skipped": 0},
+            "mismatches": []
+        }
+        summary = report["summary"]
+        since_checkpoint = 0
+
+        def collect(outcome: Dict, kind: str):
+            nonlocal since_checkpoint
+            summary["checked"] += outcome["checked"]
+            summary["skipped"] += outcome["skipped"]
+            summary["mismatched"] += len(outcome["mismatches"])
+            summary["ok"] += outcome["checked"] - len(outcome["mismatches"])
+            report["mismatches"].extend(outcome["mismatches"])
+            self.state[kind].update(outcome["verified"])
+            since_checkpoint += 1
+            if since_checkpoint >= self.checkpoint_every:
+                self._checkpoint()
+                since_checkpoint = 0
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(str(self.archive_dir),)
+        ) as pool:
+            pending = deque()
+            for kind, fn, args in self._tasks(known):
+                future = pool.submit(fn, *args)
+                future.kind = kind
+                pending.append(future)
+                # Bounded in-flight window keeps memory flat
+                while pending and (
+                    len(pending) >= self.window or pending[0].done()
+                ):
+                    head = pending.popleft()
+                    collect(head.result(), head.kind)
+            while pending:
+                head = pending.popleft()
+                collect(head.result(), head.kind)
+
+        self._checkpoint()
+        report["finished_at"] = datetime.now(timezone.utc).isoformat()
+        return report
+
+    def _tasks(self, known: Dict) -> Iterator[Tuple]:
+        """Work units: chunks of manifests, then one per segment."""
+        chunk = []
+        with os.scandir(self.archive_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith("manifest_") and name.endswith(".json")):
+                    continue
+                chunk.append(entry.path)
+                if len(chunk) >= self.chunk_size:
+                    yield self._manifest_task(chunk, known)
+                    chunk = []
+        if chunk:
+            yield self._manifest_task(chunk, known)
+
+        segments = EvidenceArchive(str(self.archive_dir)).segments
+        for seq in segments.segments():
+            name = segments.segment_name(seq)
+            yield ("segments", _verify_segment,
+                   (seq, known["segments"].get(name)))
+
+    def _manifest_task(self, chunk: List[str], known: Dict) -> Tuple:
+        files = known["files"]
+        subset = {}
+        for path in chunk:
+            key = os.path.basename(path)
+            if key in files:
+                subset[key] = files[key]
+        return ("files", _verify_manifests, (chunk, subset))
+
+    def _checkpoint(self):
+        """Atomically persist verified-record state."""
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path.with_name(
+            self.checkpoint_path.name + ".tmp"
+        )
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "files": self.state["files"],
+                "segments": self.state["segments"]
+            }, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verify extraction hashes and trace signatures "
+                    "across the evidence archive."
+    )
+    parser.add_argument("--archive-dir", default="evidence")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=64,
+                        help="Manifests per worker task")
+    parser.add_argument("--checkpoint",
+                        help="Checkpoint file (default: "
+                             "<archive-dir>/verify.checkpoint.json)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip records verified at the last checkpoint")
+    parser.add_argument("--report", help="Report JSON (default: stdout)")
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or str(
+        Path(args.archive_dir) / "verify.checkpoint.json"
+    )
+    verifier = ArchiveVerifier(
+        archive_dir=args.archive_dir,
+        workers=args.workers,
+        checkpoint_path=checkpoint,
+        chunk_size=args.chunk_size
+    )
+    report = verifier.run(incremental=args.incremental)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    summary = report["summary"]
+    print(
+        f"[VERIFY] checked={summary['checked']} ok={summary['ok']} "
+        f"mismatched={summary['mismatched']} skipped={summary['skipped']}",
+        file=sys.stderr
+    )
+    sys.exit(1 if summary["mismatched"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Group-commit archive writer: durable evidence without one fsync per record.
+
+Records are written to the archive in the caller's thread (so the
+archive_ref is known at once), then queued to a background thread that
+fsyncs every file and directory touched by the queued records in one
+batch. Each write returns a Future that resolves to the archive info once
+the record is durable.
+
+While one batch is being fsynced, new records queue up and are committed
+together in the next batch, so the fsync cost is shared by all concurrent
+writers. max_delay > 0 additionally holds a batch open for that long to
+collect more records (time-window commit).
+
+Durability modes (ExtractionPipeline durability=...):
+- "none":  write without fsync (page cache only; previous behavior)
+- "wait":  return once the record's batch is fsynced
+- "async": return immediately; durability follows within one batch
+
+Grouping needs concurrent writers in one process. A batch or service
+worker runs one job at a time, so in "wait" mode each document is its own
+commit; "async" lets a worker's consecutive documents share commits.
+
+A failed commit is reported on stderr as well as through the futures,
+since nobody may be waiting on an "async" record.
+"""
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from engine.archive import EvidenceArchive
+
+
+DURABILITY = ("none", "wait", "async")
+
+
+class GroupCommitWriter:
+    """Archive writer with background group-commit fsync."""
+
+    def __init__(
+        self,
+        archive: EvidenceArchive,
+        max_batch: int = 256,
+        max_delay: float = 0.0
+    ):
+        self.archive = archive
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = {"records": 0, "batches": 0}
+
+        # Serializes archive writes (segment/Merkle state is not
+        # thread-safe) and keeps queue order equal to write order
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple]]" = queue.Queue()
+        self._last: Optional[Future] = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="archive-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, document_data: Dict, results: List[Dict]) -> Tuple[Dict, Future]:
+        """
+        Archive one extraction; returns (archive info, durability future).
+
+        The future resolves to the same info once fsynced, or raises the
+        OSError that prevented it.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise ValueError("Writer is closed")
+            info = self.archive.archive_extraction(document_data, results)
+            paths = self.archive.written_paths(info)
+            self._queue.put((paths, info, future))
+            self._last = future
+        return info, future
+
+    def flush(self):
+        """Block until every record written so far is durable."""
+        last = self._last
+        if last is not None:
+            last.exception()  # waits; errors belong to the record's owner
+
+    def close(self):
+        """Commit queued records and stop the background thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    # --- Background commit ---
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch, stop = self._collect(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _collect(self, first: Tuple) -> Tuple[List[Tuple], bool]:
+        """Take everything queued (up to max_batch), waiting max_delay."""
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, batch: List[Tuple]):
+        """One fsync per touched file, then per directory, for the batch."""
+        paths = set()
+        for record_paths, _, _ in batch:
+            paths.update(record_paths)
+
+        try:
+            # Files before directories: new entries must point at synced data
+            for path in sorted(paths, key=lambda p: (p.is_dir(), str(p))):
+                self._fsync_written(path)
+        except OSError as e:
+            print(f"[ARCHIVE] Commit of {len(batch)} record(s) failed: {e}",
+                  file=sys.stderr)
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.stats["records"] += len(batch)
+        self.stats["batches"] += 1
+        for _, info, future in batch:
+            future.set_result(info)
+
+    def _fsync_written(self, path: Path):
+        try:
+            _fsync(path)
+        except FileNotFoundError:
+            # Sealed by a writer since: its frames were fsynced before the
+            # .seg was removed, and the directory is synced after this
+            if not self.archive.segments.was_sealed(path):
+                raise
+
+
+def _fsync(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
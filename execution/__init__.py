@@ -9,6 +9,7 @@ __version__ = "0.1.0"
 from .token_validator import TokenValidation, validate_token_for_query
 from .retriever import Evidence, simple_grep_retrieve
 from .rag_read_gate import rag_read
+from .corpus_index import CorpusIndex
 
 __all__ = [
     "TokenValidation",
@@ -16,4 +17,5 @@ __all__ = [
     "Evidence",
     "simple_grep_retrieve",
     "rag_read",
+    "CorpusIndex",
 ]
@@ -0,0 +1,527 @@
+"""
+Persistent n-gram index for simple_grep_retrieve.
+
+simple_grep_retrieve matches each query term (no whitespace; 3+
+characters, or 2 when it has CJK characters) as a substring of the
+lowercased file text. Such a term lies inside one whitespace-separated
+word of the text, so every character trigram of the term is a trigram of
+that word. Words are indexed by their trigrams, plus their bigrams that
+touch a CJK character for 2-character CJK terms (Korean nouns are often
+two syllables; Chinese and Japanese runs have no spaces at all). The
+index therefore yields a superset of the matching files; those
+candidates are then checked against the file text by the same code as the
+full scan, in the same os.walk order, so the evidence is identical while
+only candidate files are read.
+
+Layout (default index_dir {corpus_dir}/.rag_index):
+- postings.NNNNNN.bin: n-gram → sorted file ids, one immutable
+            memory-mapped file per generation (execution.postings), so
+            all worker processes on a host share one page-cached copy
+- catalog.sqlite:
+  - files:  id, path, walk_order, mtime, size, words (one row per live
+            file; words feeds BM25 document-length normalization)
+  - delta:  n-gram → file ids added by one update(), one row per
+            n-gram per update() since the last compact()
+  - meta:   generation counter, current postings file, n-gram scheme
+
+update() walks the corpus with stat only. New or changed files (by mtime
+and size) get a fresh id whose n-grams go to delta; a changed or removed
+file's old id leaves the files table, so its stale postings are ignored
+and dropped at the next compact().
+
+compact() merges the current postings file and delta into a new postings
+file, then switches meta to it and clears the merged delta rows in one
+SQLite transaction. Each query reads meta, files and delta in one read
+snapshot and maps the postings file that snapshot names, so running
+readers move to a new generation at their next query without a restart
+and never see postings and delta from different generations. The
+previous generation's file is kept for readers still on it; older ones
+are removed.
+
+Usage:
+    python -m engine corpus build --corpus docs
+    python -m engine corpus update --corpus docs
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from common.locking import FileLock
+
+from .postings import PostingsFile, write_postings
+from .retriever import CJK_WORD, has_cjk, is_corpus_file
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    path       TEXT NOT NULL UNIQUE,
+    walk_order INTEGER NOT NULL,
+    mtime      REAL NOT NULL,
+    size       INTEGER NOT NULL,
+    words      INTEGER
+);
+CREATE TABLE IF NOT EXISTS delta (
+    gram TEXT NOT NULL,
+    ids  BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS delta_gram ON delta (gram);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Files per worker task when extracting n-grams
+CHUNK_SIZE = 64
+# Below this many changed files, n-grams are extracted in-process
+PARALLEL_MIN_FILES = 256
+# compact() runs automatically once delta holds this many rows
+AUTO_COMPACT_ROWS = 500_000
+# Which n-grams are indexed; an index built with another scheme is rebuilt
+GRAM_SCHEME = "3+cjk2"
+
+
+def text_grams(low: str) -> Set[str]:
+    """
+    N-grams of each whitespace-separated word of lowercased text.
+
+    Every trigram, plus every bigram with a CJK character.
+    """
+    grams = set()
+    for word in set(low.split()):
+        for i in range(len(word) - 2):
+            grams.add(word[i:i + 3])
+        if not has_cjk(word):
+            continue
+        all_cjk = CJK_WORD.fullmatch(word) is not None
+        for i in range(len(word) - 1):
+            bigram = word[i:i + 2]
+            if all_cjk or has_cjk(bigram):
+                grams.add(bigram)
+    return grams
+
+
+def term_grams(term: str) -> Set[str]:
+    """N-grams every file containing term has (see text_grams)."""
+    if len(term) == 2:
+        return {term}
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+def file_grams(path: str) -> Tuple[List[str], int]:
+    """
+    (n-grams, word count) of a corpus file, read as simple_grep_retrieve
+    reads it.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    except Exception:
+        return [], 0  # unreadable files never match
+    low = text.lower()
+    return sorted(text_grams(low)), len(low.split())
+
+
+def _gram_chunk(paths: List[str]) -> List[Tuple[List[str], int]]:
+    return [file_grams(path) for path in paths]
+
+
+class CorpusIndex:
+    """On-disk n-gram → file index over a corpus directory."""
+
+    def __init__(
+        self,
+        corpus_dir: str,
+        index_dir: Optional[str] = None,
+        workers: Optional[int] = None
+    ):
+        self.corpus_dir = corpus_dir
+        self.index_dir = Path(index_dir or os.path.join(corpus_dir,
+                                                        ".rag_index"))
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+
+        self.conn = sqlite3.connect(
+            str(self.index_dir / "catalog.sqlite"),
+            timeout=30, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {
+            row[1] for row in self.conn.execute("PRAGMA table_info(files)")
+        }
+        if "words" not in columns:
+            # Catalogs from before ranking; counts fill in as files change
+            self.conn.execute("ALTER TABLE files ADD COLUMN words INTEGER")
+
+        # id → (walk_order, path) of live files, reloaded on generation change
+        self._files: Dict[int, Tuple[int, str]] = {}
+        self._generation: Optional[str] = None
+        self._base: Optional[PostingsFile] = None
+        # Serializes compactions across processes
+        self._compact_lock = FileLock(self.index_dir / "compact.lock")
+
+    # --- Maintenance ---
+
+    def walk(self) -> Iterator[Tuple[str, float, int]]:
+        """(path, mtime, size) of corpus files in os.walk order."""
+        index_dir = os.path.realpath(self.index_dir)
+        for root, dirs, files in os.walk(self.corpus_dir):
+            # The index directory holds no corpus files; skip it
+            dirs[:] = [
+                d for d in dirs
+                if os.path.realpath(os.path.join(root, d)) != index_dir
+            ]
+            for fn in files:
+                if not is_corpus_file(fn):
+                    continue
+                path = os.path.join(root, fn)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    st = None
+                yield (path, st.st_mtime if st else 0.0,
+                       st.st_size if st else -1)
+
+    def update(self) -> Dict:
+        """
+        Bring the index up to date with the corpus.
+
+        Returns: {"files", "added", "changed", "removed"}
+        """
+        with self._lock:
+            self._check_scheme()
+            known = {
+                path: (file_id, mtime, size)
+                for file_id, path, mtime, size in self.conn.execute(
+                    "SELECT id, path, mtime, size FROM files"
+                )
+            }
+
+        # 1. Diff the walk against the catalog by mtime and size
+        order, stale, fresh = [], [], []
+        for walk_order, (path, mtime, size) in enumerate(self.walk()):
+            order.append((walk_order, path))
+            previous = known.pop(path, None)
+            if previous is not None and previous[1:] == (mtime, size):
+                continue
+            if previous is not None:
+                stale.append(previous[0])
+            fresh.append((path, walk_order, mtime, size))
+        removed = [file_id for file_id, _, _ in known.values()]
+        stats = {"files": len(order), "added": len(fresh) - len(stale),
+                 "changed": len(stale), "removed": len(removed)}
+
+        # 2. N-grams of new and changed files (in parallel when many)
+        paths = [path for path, _, _, _ in fresh]
+        extracted = self._extract(paths)
+
+        # 3. One transaction: retire old ids, add new ones, reorder
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM files WHERE id = ?",
+                [(file_id,) for file_id in stale + removed]
+            )
+            added: Dict[str, array] = {}
+            for (path, walk_order, mtime, size), (grams, words) in zip(
+                fresh, extracted
+            ):
+                file_id = self.conn.execute(
+                    "INSERT INTO files (path, walk_order, mtime, size, words) "
+                    "VALUES (?,?,?,?,?)", (path, walk_order, mtime, size, words)
+                ).lastrowid
+                for gram in grams:
+                    ids = added.get(gram)
+                    if ids is None:
+                        ids = added[gram] = array('I')
+                    ids.append(file_id)
+            self.conn.executemany(
+                "INSERT INTO delta VALUES (?,?)",
+                ((gram, ids.tobytes()) for gram, ids in added.items())
+            )
+            # Walk order may shift even for unchanged files
+            self.conn.executemany(
+                "UPDATE files SET walk_order = ? WHERE path = ?", order
+            )
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('grams', ?)",
+                (GRAM_SCHEME,)
+            )
+            self._bump_generation()
+
+        if self._delta_rows() >= AUTO_COMPACT_ROWS:
+            self.compact()
+        return stats
+
+    def build(self) -> Dict:
+        """Index the corpus from scratch."""
+        with self._lock, self.conn:
+            for table in ("files", "delta"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('grams', ?)",
+                (GRAM_SCHEME,)
+            )
+        stats = self.update()
+        self.compact()
+        return stats
+
+    def compact(self):
+        """Merge the current postings and delta into a new generation."""
+        with self._compact_lock, self._lock:
+            # 1. One read snapshot, so live ids, merged delta rows and base
+            #    file agree even while other processes run update()
+            self.conn.execute("BEGIN")
+            try:
+                live = {
+                    row[0] for row in self.conn.execute("SELECT id FROM files")
+                }
+                watermark = self.conn.execute(
+                    "SELECT COALESCE(MAX(rowid), 0) FROM delta"
+                ).fetchone()[0]
+                current = self._meta("postings")
+                base = PostingsFile(self.index_dir / current) \
+                    if current else None
+
+                # 2. Stream the merge into the next generation's file
+                number = int(current.split(".")[1]) + 1 if current else 1
+                name = f"postings.{number:06d}.bin"
+                rows = self.conn.execute(
+                    "SELECT gram, ids FROM delta WHERE rowid <= ? "
+                    "ORDER BY gram", (watermark,)
+                )
+                try:
+                    write_postings(self.index_dir / name, _merge(
+                        base.items() if base else (), _group(rows), live
+                    ))
+                finally:
+                    if base:
+                        base.close()
+            finally:
+                self.conn.execute("ROLLBACK")
+
+            # 3. Switch generations atomically for every reader
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('postings', ?)",
+                    (name,)
+                )
+                self.conn.execute(
+                    "DELETE FROM delta WHERE rowid <= ?", (watermark,)
+                )
+                self._bump_generation()
+
+            # 4. Keep the previous file for readers still mapping it
+            for path in self.index_dir.glob("postings.*.bin"):
+                if path.name not in (name, current):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass  # still open elsewhere (non-POSIX)
+
+    def _extract(self, paths: List[str]) -> List[Tuple[List[str], int]]:
+        if len(paths) < PARALLEL_MIN_FILES or self.workers == 1:
+            return _gram_chunk(paths)
+        chunks = [paths[i:i + CHUNK_SIZE]
+                  for i in range(0, len(paths), CHUNK_SIZE)]
+        extracted: List[Tuple[List[str], int]] = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in pool.map(_gram_chunk, chunks):
+                extracted.extend(chunk)
+        return extracted
+
+    def _delta_rows(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM delta").fetchone()[0]
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _check_scheme(self):
+        """ValueError if the index was built with other n-grams."""
+        if self._meta("generation") is None:
+            return
+        scheme = self._meta("grams")
+        if scheme != GRAM_SCHEME:
+            raise ValueError(
+                f"Index {self.index_dir} uses n-gram scheme {scheme!r}, "
+                f"expected {GRAM_SCHEME!r}; run build"
+            )
+
+    def _bump_generation(self):
+        self.conn.execute(
+            "INSERT INTO meta VALUES ('generation', '1') "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1"
+        )
+
+    # --- Query ---
+
+    def candidates(self, terms: List[str]) -> List[str]:
+        """
+        Paths that may contain any of terms, in os.walk order.
+
+        Every file containing a term is listed; some listed files may
+        not contain one (n-grams present, but not contiguously).
+        """
+        with self._lock:
+            for attempt in range(2):
+                # One read snapshot: files, delta and postings file agree
+                ids: Set[int] = set()
+                self.conn.execute("BEGIN")
+                try:
+                    self._refresh()
+                    for term in terms:
+                        ids |= self._term_ids(term)
+                    break
+                except FileNotFoundError:
+                    # The snapshot named a generation compacted away since
+                    if attempt:
+                        raise
+                finally:
+                    self.conn.execute("ROLLBACK")
+            ordered = sorted(
+                (self._files[i] for i in ids if i in self._files)
+            )
+        return [path for _, path in ordered]
+
+    def corpus_stats(self) -> Dict:
+        """{"files", "avg_words"} of the live files (avg_words may be None)."""
+        with self._lock:
+            files, avg_words = self.conn.execute(
+                "SELECT COUNT(*), AVG(words) FROM files"
+            ).fetchone()
+        return {"files": files, "avg_words": avg_words}
+
+    def _term_ids(self, term: str) -> Set[int]:
+        """Files holding every n-gram of term (smallest posting first)."""
+        postings = sorted(
+            (self._postings(gram) for gram in term_grams(term)), key=len
+        )
+        if not postings:
+            return set()
+        result = set(postings[0])
+        for ids in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(ids)
+        return result
+
+    def _postings(self, gram: str):
+        """Ids of gram: a view into the postings file, plus any delta."""
+        ids = self._base.lookup(gram) if self._base else array('I')
+        rows = self.conn.execute(
+            "SELECT ids FROM delta WHERE gram = ?", (gram,)
+        ).fetchall()
+        if rows:
+            ids = array('I', ids.tobytes())
+            for (blob,) in rows:
+                ids.frombytes(blob)
+        return ids
+
+    def _refresh(self):
+        """Follow another process's update() or compact() (lock held)."""
+        generation = self._meta("generation")
+        if generation is None:
+            raise ValueError(f"Index not built: {self.index_dir}")
+        if generation == self._generation:
+            return
+        self._check_scheme()
+
+        current = self._meta("postings")
+        if current and (self._base is None or self._base.path.name != current):
+            base = PostingsFile(self.index_dir / current)
+            if self._base:
+                self._base.close()
+            self._base = base
+        elif not current and self._base:
+            self._base.close()
+            self._base = None
+
+        self._files = {
+            file_id: (walk_order, path)
+            for file_id, walk_order, path in self.conn.execute(
+                "SELECT id, walk_order, path FROM files"
+            )
+        }
+        self._generation = generation
+
+    def close(self):
+        if self._base:
+            self._base.close()
+        self.conn.close()
+
+
+def _merge(
+    base: Iterable[Tuple[str, Iterable[int]]],
+    delta: Iterable[Tuple[str, List[bytes]]],
+    live: Set[int]
+) -> Iterator[Tuple[str, array]]:
+    """Union two gram-sorted streams, keeping live ids; drops empty grams."""
+    base, delta = iter(base), iter(delta)
+    b, d = next(base, None), next(delta, None)
+    while b is not None or d is not None:
+        ids: Set[int] = set()
+        if d is None or (b is not None and b[0] <= d[0]):
+            gram = b[0]
+            ids.update(b[1])
+            b = next(base, None)
+        else:
+            gram = d[0]
+        if d is not None and d[0] == gram:
+            for blob in d[1]:
+                ids.update(array('I', blob))
+            d = next(delta, None)
+        ids &= live
+        if ids:
+            yield gram, array('I', sorted(ids))
+
+
+def _group(rows: Iterable[Tuple[str, bytes]]) -> Iterator[Tuple[str, List[bytes]]]:
+    """(gram, [blobs]) runs from rows sorted by gram."""
+    gram, blobs = None, []
+    for row_gram, blob in rows:
+        if row_gram != gram:
+            if blobs:
+                yield gram, blobs
+            gram, blobs = row_gram, []
+        blobs.append(blob)
+    if blobs:
+        yield gram, blobs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or update the n-gram index used by rag_read."
+    )
+    parser.add_argument("command", choices=["build", "update", "compact"])
+    parser.add_argument("--corpus", default="docs")
+    parser.add_argument("--index-dir",
+                        help="Index directory (default: <corpus>/.rag_index)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    index = CorpusIndex(args.corpus, args.index_dir, args.workers)
+    if args.command == "compact":
+        index.compact()
+        stats = {}
+    else:
+        stats = getattr(index, args.command)()
+    index.close()
+    print(f"[INDEX] {args.command} {args.corpus}: " +
+          " ".join(f"{k}={v}" for k, v in stats.items()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Read-only, memory-mapped postings file (term → sorted uint32 ids).
+
+Layout (little-endian header, native-order arrays; a host-local cache):
+
+    header        magic, version, n_terms, n_ids, section offsets
+    ids           uint32[n_ids]        every postings list, back to back
+    post_offsets  uint64[n_terms + 1]  term i owns ids[post[i]:post[i+1]]
+    term_offsets  uint64[n_terms + 1]  term i is terms[term[i]:term[i+1]]
+    terms         UTF-8 terms, sorted by their bytes
+
+A file is written once (write_postings) and never modified. Readers map
+it with mmap, so every process on a host shares one page-cached copy;
+lookups binary-search the term dictionary and return zero-copy views of
+the ids.
+"""
+import mmap
+import os
+import secrets
+import struct
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple, Union
+
+MAGIC = b"RAGPOST\0"
+VERSION = 1
+# magic, version, reserved, n_terms, n_ids, post_at, term_at, terms_at
+HEADER = struct.Struct("<8sIIQQQQQ")
+
+
+def _pad(f, align: int = 8):
+    f.write(b"\0" * (-f.tell() % align))
+
+
+def write_postings(
+    path: Union[str, Path],
+    items: Iterable[Tuple[str, Iterable[int]]]
+) -> int:
+    """
+    Write (term, sorted ids) items, in ascending term order, to path.
+
+    Postings stream to disk as they arrive; only the term dictionary is
+    held in memory. The file appears at path complete (temp file, fsync,
+    rename). Returns the number of terms.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(
+        f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    )
+    post_offsets = array('Q', [0])
+    term_offsets = array('Q', [0])
+    terms = bytearray()
+    previous = None
+
+    try:
+        with open(tmp_path, 'wb') as f:
+            # 1. Postings, after a placeholder header
+            f.write(b"\0" * HEADER.size)
+            for term, ids in items:
+                encoded = term.encode('utf-8')
+                if previous is not None and encoded <= previous:
+                    raise ValueError(f"Terms out of order: {term!r}")
+                previous = encoded
+                if not isinstance(ids, (array, memoryview)):
+                    ids = array('I', ids)
+                f.write(ids.tobytes())
+                post_offsets.append(post_offsets[-1] + len(ids))
+                terms += encoded
+                term_offsets.append(len(terms))
+            _pad(f)
+
+            # 2. Term dictionary
+            post_at = f.tell()
+            f.write(post_offsets.tobytes())
+            term_at = f.tell()
+            f.write(term_offsets.tobytes())
+            terms_at = f.tell()
+            f.write(terms)
+
+            # 3. Header, then make the file durable before it is named
+            n_terms = len(term_offsets) - 1
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, n_terms, post_offsets[-1],
+                                post_at, term_at, terms_at))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return n_terms
+
+
+class PostingsFile:
+    """Memory-mapped reader of a postings file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.n_terms, n_ids,
+         post_at, term_at, terms_at) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"Not a postings file: {self.path}")
+
+        view = memoryview(self._map)
+        n = self.n_terms + 1
+        self._ids = view[HEADER.size:HEADER.size + 4 * n_ids].cast('I')
+        self._post = view[post_at:post_at + 8 * n].cast('Q')
+        self._term = view[term_at:term_at + 8 * n].cast('Q')
+        self._terms = view[terms_at:]
+        view.release()
+
+    def _term_at(self, i: int) -> bytes:
+        return bytes(self._terms[self._term[i]:self._term[i + 1]])
+
+    def lookup(self, term: str) -> memoryview:
+        """Sorted ids of term (empty if absent); a view into the map."""
+        key = term.encode('utf-8')
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_terms and self._term_at(lo) == key:
+            return self._ids[self._post[lo]:self._post[lo + 1]]
+        return self._ids[0:0]
+
+    def items(self) -> Iterator[Tuple[str, memoryview]]:
+        """(term, ids) in term order."""
+        for i in range(self.n_terms):
+            yield (self._term_at(i).decode('utf-8'),
+                   self._ids[self._post[i]:self._post[i + 1]])
+
+    def __len__(self) -> int:
+        return self.n_terms
+
+    def close(self):
+        """Unmap now; views still held elsewhere keep the map open."""
+        for view in (self._ids, self._post, self._term, self._terms):
+            view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # closed when the last outstanding view is dropped
@@ -7,7 +7,7 @@ NO downstream actions.
 
 Returns raw evidence only.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import sys
 import json
 import uuid
@@ -35,7 +35,12 @@ def _emit_audit(event: dict):
 # --- AUDIT END ---
 
 
-def rag_read(request: Dict[str, Any], corpus_dir: str) -> Dict[str, Any]:
+def rag_read(
+    request: Dict[str, Any],
+    corpus_dir: str,
+    index=None,
+    rank: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Execute rag_read with full admission and token validation.
 
@@ -45,6 +50,8 @@ def rag_read(request: Dict[str, Any], corpus_dir: str) -> Dict[str, Any]:
     3. Retrieval execution (if token valid)
     4. Return raw evidence (NO synthesis)
 
+    index and rank are passed to simple_grep_retrieve.
+
     Returns:
         {
             "allowed": bool,
@@ -101,7 +108,10 @@ def rag_read(request: Dict[str, Any], corpus_dir: str) -> Dict[str, Any]:
         }
 
     # Step 3: Retrieval (read-only)
-    evidence = simple_grep_retrieve(query=query, corpus_dir=corpus_dir, max_hits=5)
+    evidence = simple_grep_retrieve(
+        query=query, corpus_dir=corpus_dir, max_hits=5, index=index,
+        rank=rank
+    )
 
     # Step 4: Return raw evidence
     # IMPORTANT: NO synthesis, NO chaining, NO downstream actions
@@ -8,8 +8,11 @@ NO chaining.
 Returns raw evidence only.
 """
 from dataclasses import dataclass
-from typing import List
+from typing import Iterable, List, Optional, Tuple
+import heapq
+import math
 import os
+import re
 
 
 @dataclass
@@ -19,53 +22,226 @@ class Evidence:
     snippet: str
 
 
-def simple_grep_retrieve(query: str, corpus_dir: str, max_hits: int = 5) -> List[Evidence]:
+# Hangul, kana and CJK ideograph blocks
+CJK_RANGES = (
+    (0x1100, 0x11FF),  # Hangul Jamo
+    (0x3040, 0x30FF),  # Hiragana, Katakana
+    (0x3130, 0x318F),  # Hangul Compatibility Jamo
+    (0x3400, 0x4DBF),  # CJK Unified Ideographs Extension A
+    (0x4E00, 0x9FFF),  # CJK Unified Ideographs
+    (0xAC00, 0xD7A3),  # Hangul Syllables
+    (0xF900, 0xFAFF),  # CJK Compatibility Ideographs
+)
+CJK_CLASS = "[" + "".join(f"{chr(lo)}-{chr(hi)}" for lo, hi in CJK_RANGES) + "]"
+CJK_CHAR = re.compile(CJK_CLASS)
+CJK_WORD = re.compile(CJK_CLASS + "+")
+
+
+def has_cjk(text: str) -> bool:
+    return not text.isascii() and CJK_CHAR.search(text) is not None
+
+
+def query_terms(query: str) -> List[str]:
+    """
+    Search terms: lowercased whitespace-separated words of 3+ chars.
+
+    Words with CJK characters are kept from 2 chars: two-syllable Korean
+    nouns ("문서", "규칙") would otherwise never be searched.
+    """
+    return [
+        t for t in query.lower().split()
+        if len(t) >= 3 or (len(t) == 2 and has_cjk(t))
+    ]
+
+
+# Scoring modes for simple_grep_retrieve(rank=...)
+RANKINGS = ("tf", "bm25")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def is_corpus_file(name: str) -> bool:
+    return name.endswith(".md") or name.endswith(".txt")
+
+
+def match_file(path: str, terms: List[str]) -> Optional[Evidence]:
+    """
+    Evidence from one file if any term occurs in it (case-insensitive).
+
+    The snippet surrounds the earliest occurrence of any term.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    except Exception:
+        return None
+
+    low = text.lower()
+
+    # Check if any term matches
+    if not any(t in low for t in terms):
+        return None
+
+    # Find first match position
+    idx = min((low.find(t) for t in terms if low.find(t) != -1), default=-1)
+    if idx == -1:
+        return None
+
+    # Extract snippet around first match
+    start = max(0, idx - 120)
+    end = min(len(text), idx + 280)
+    snippet = text[start:end].replace("\n", " ")
+
+    return Evidence(source=path, snippet=snippet)
+
+
+def term_counts(path: str, terms: List[str]) -> Tuple[List[int], int]:
+    """Occurrences of each term in a file (as match_file reads it), words."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    except Exception:
+        return [0] * len(terms), 0
+
+    low = text.lower()
+    return [low.count(t) for t in terms], len(low.split())
+
+
+def rank_files(
+    paths: Iterable[str],
+    terms: List[str],
+    max_hits: int,
+    rank: str,
+    corpus_files: Optional[int] = None,
+    avg_words: Optional[float] = None
+) -> List[Evidence]:
+    """
+    Evidence from the max_hits best-scoring files; equal scores go to
+    the smaller path, so the order does not depend on the filesystem.
+
+    rank "tf" scores total term occurrences; "bm25" is Okapi BM25.
+    corpus_files and avg_words describe the whole corpus (the index
+    catalog); without them the files in paths stand in for it.
+
+    Every file in paths is read. A tf score is final once its file is
+    counted, so tf keeps only the max_hits best files (O(max_hits)
+    memory). BM25's idf needs each term's document frequency over all
+    matches, so bm25 keeps every match's term counts (not its text)
+    until the last file is counted.
+    """
+    terms = list(dict.fromkeys(terms))
+    counted = ((path,) + term_counts(path, terms) for path in paths)
+
+    # 1. tf: nsmallest holds a heap of max_hits entries while counting
+    if rank == "tf":
+        return _top_evidence(heapq.nsmallest(max_hits, (
+            (-float(sum(counts)), path)
+            for path, counts, _ in counted if any(counts)
+        )), terms)
+
+    # 2. bm25: count terms in every file; keep only files that match
+    matches: List[Tuple[str, List[int], int]] = []
+    read = total_words = 0
+    for path, counts, words in counted:
+        read += 1
+        total_words += words
+        if any(counts):
+            matches.append((path, counts, words))
+    n_docs = max(corpus_files or read, len(matches))
+    avg_words = avg_words or (total_words / read if read else 0) or 1
+
+    # 3. Score; document frequencies come from the verified matches
+    idf = [
+        math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for df in (
+            sum(1 for _, counts, _ in matches if counts[i])
+            for i in range(len(terms))
+        )
+    ]
+
+    def score(counts: List[int], words: int) -> float:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * words / avg_words)
+        return sum(
+            idf[i] * c * (BM25_K1 + 1) / (c + norm)
+            for i, c in enumerate(counts) if c
+        )
+
+    return _top_evidence(heapq.nsmallest(
+        max_hits,
+        ((-score(counts, words), path) for path, counts, words in matches)
+    ), terms)
+
+
+def _top_evidence(
+    top: List[Tuple[float, str]],
+    terms: List[str]
+) -> List[Evidence]:
+    hits: List[Evidence] = []
+    for _, path in top:
+        evidence = match_file(path, terms)
+        if evidence is not None:
+            hits.append(evidence)
+    return hits
+
+
+def simple_grep_retrieve(
+    query: str,
+    corpus_dir: str,
+    max_hits: int = 5,
+    index=None,
+    rank: Optional[str] = None
+) -> List[Evidence]:
     """
     Minimal read-only retriever.
 
     Scans .md/.txt files in corpus_dir.
     Returns snippets containing query terms.
 
-    NO synthesis. NO ranking. NO LLM.
+    Without index, every .md/.txt file under corpus_dir is a candidate:
+    ranking reads the whole corpus, and unranked search reads files until
+    max_hits match.
+
+    With index (execution.corpus_index.CorpusIndex for corpus_dir), only
+    files the index lists as candidates are read; the evidence is the
+    same as a full scan while the index is up to date.
+
+    By default hits come in os.walk order. With rank ("tf" or "bm25"),
+    every candidate is read and scored and the best max_hits are
+    returned, ties broken by path (see rank_files).
+
+    NO synthesis. NO LLM.
     Pure grep-like search.
     """
-    # Extract terms (minimum 3 chars)
-    terms = [t for t in query.lower().split() if len(t) >= 3]
+    if rank is not None and rank not in RANKINGS:
+        raise ValueError(f"Unknown rank: {rank}")
+
+    # Extract terms (minimum 3 chars, 2 for CJK)
+    terms = query_terms(query)
     if not terms:
         return []
 
-    hits: List[Evidence] = []
+    if index is not None:
+        paths = index.candidates(terms)
+    else:
+        paths = (
+            os.path.join(root, fn)
+            for root, _, files in os.walk(corpus_dir)
+            for fn in files
+            if is_corpus_file(fn)
+        )
+
+    if rank is not None:
+        stats = index.corpus_stats() if index is not None else {}
+        return rank_files(paths, terms, max_hits, rank,
+                          stats.get("files"), stats.get("avg_words"))
 
-    # Walk directory
-    for root, _, files in os.walk(corpus_dir):
-        for fn in files:
-            if not (fn.endswith(".md") or fn.endswith(".txt")):
-                continue
-
-            path = os.path.join(root, fn)
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                    text = f.read()
-            except Exception:
-                continue
-
-            low = text.lower()
-
-            # Check if any term matches
-            if any(t in low for t in terms):
-                # Find first match position
-                idx = min((low.find(t) for t in terms if low.find(t) != -1), default=-1)
-                if idx == -1:
-                    continue
-
-                # Extract snippet around first match
-                start = max(0, idx - 120)
-                end = min(len(text), idx + 280)
-                snippet = text[start:end].replace("\n", " ")
-
-                hits.append(Evidence(source=path, snippet=snippet))
-
-                if len(hits) >= max_hits:
-                    return hits
+    hits: List[Evidence] = []
+    for path in paths:
+        evidence = match_file(path, terms)
+        if evidence is None:
+            continue
+        hits.append(evidence)
+        if len(hits) >= max_hits:
+            return hits
 
     return hits
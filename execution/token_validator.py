@@ -10,7 +10,8 @@ Enforces:
 """
 from dataclasses import dataclass
 from typing import Dict, Any
-import hashlib
+
+from common.hashing import text_hash
 
 
 @dataclass
@@ -26,7 +27,7 @@ def derive_context_hash(query: str) -> str:
 
     Must match admission/rules_rag_read.py derivation logic.
     """
-    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+    return text_hash(query)
 
 
 def validate_token_for_query(token: Dict[str, Any], query: str) -> TokenValidation:
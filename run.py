@@ -14,14 +14,19 @@ from viewer.viewer_generator import EvidenceViewer
 
 def main():
     """Run extraction pipeline with evidence viewer generation."""
-    if len(sys.argv) < 2:
-        print("Usage: python run.py <document_path>")
+    args = sys.argv[1:]
+    dry_run = "--dry-run" in args
+    args = [a for a in args if a != "--dry-run"]
+
+    if len(args) < 1:
+        print("Usage: python run.py [--dry-run] <document_path>")
         print("\nExamples:")
         print("  python run.py examples/accept_example.txt")
         print("  python run.py examples/stop_example.txt")
+        print("  python run.py --dry-run examples/accept_example.txt")
         sys.exit(1)
 
-    document_path = sys.argv[1]
+    document_path = args[0]
 
     if not Path(document_path).exists():
         print(f"Error: Document not found: {document_path}")
@@ -32,9 +37,13 @@ def main():
     print("=" * 70)
     print()
 
+    # Load document once (shared by pipeline and viewer)
+    with open(document_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
     # Run pipeline
     pipeline = ExtractionPipeline()
-    output = pipeline.run(document_path)
+    output = pipeline.run_text(content, document_path, dry_run=dry_run)
 
     print()
     print("=" * 70)
@@ -75,10 +84,6 @@ def main():
     print("GENERATING VIEWER")
     print("=" * 70)
 
-    # Load document content
-    with open(document_path, 'r') as f:
-        content = f.read()
-
     viewer = EvidenceViewer()
     doc_name = Path(document_path).stem
     viewer_path = viewer.generate(
@@ -88,7 +93,10 @@ def main():
     )
 
     print(f"  HTML viewer: {viewer_path}")
-    print(f"  Evidence artifacts: {output['artifact_refs']['manifest_path']}")
+    if output["artifact_refs"]:
+        print(f"  Evidence artifacts: {output['artifact_refs']['archive_ref']}")
+    else:
+        print("  Evidence artifacts: none (dry run)")
     print()
     print("✓ Extraction complete")
     print()
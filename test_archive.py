@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Evidence archive: write-once records, hashes and trace signatures, and
+the parallel verification sweep.
+
+Run: python -m pytest -q test_archive.py
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from engine.archive import EvidenceArchive
+from engine.verify import ArchiveVerifier
+from engine.hashing import canonical_bytes, sha256_hex
+from engine.pipeline import ExtractionPipeline
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+EXAMPLES = sorted((ROOT / "examples").glob("*.txt"))
+
+
+def _archive_examples(archive_dir: Path, **options):
+    pipeline = ExtractionPipeline(schema_path=SCHEMA,
+                                  archive_dir=str(archive_dir),
+                                  verbose=False, **options)
+    return pipeline, [pipeline.run(str(path)) for path in EXAMPLES]
+
+
+@pytest.mark.parametrize("layout", ["files", "segments"])
+def test_record_hashes_cover_the_stored_bytes(tmp_path, layout):
+    pipeline, outputs = _archive_examples(tmp_path / "evidence",
+                                          layout=layout)
+    archive = pipeline.archive
+    for output in outputs:
+        ref = output["artifact_refs"]["archive_ref"]
+        manifest, stored = archive._load(ref)
+        assert sha256_hex(stored) == manifest["extraction_hash"]
+        # One serialization: the stored JSONL is the canonical form
+        assert stored == b"".join(canonical_bytes(r) + b"\n"
+                                  for r in output["results"])
+
+        record = archive.read_extraction(ref)
+        assert json.loads(json.dumps(record["results"])) == \
+            json.loads(json.dumps(output["results"]))
+        assert archive._compute_trace_signature(
+            {"content_hash": manifest["document_hash"]}, record["results"]
+        ) == manifest["trace_signature"]
+        assert archive.verify(ref, output["document"]["hash"])
+        assert not archive.verify(ref, "0" * 64)
+
+
+def test_files_layout_refs_are_unique_and_listed(tmp_path):
+    pipeline, outputs = _archive_examples(tmp_path / "evidence")
+    refs = [o["artifact_refs"]["archive_ref"] for o in outputs]
+    assert len(set(refs)) == len(refs)
+    assert sorted(EvidenceArchive(str(tmp_path / "evidence")).iter_refs()) \
+        == sorted(refs)
+
+
+def _sweep(archive_dir: Path, incremental: bool = False):
+    return ArchiveVerifier(
+        str(archive_dir), workers=2, chunk_size=3,
+        checkpoint_path=str(archive_dir / "verify.checkpoint.json")
+    ).run(incremental=incremental)
+
+
+def test_verify_sweep_detects_tampering_in_both_layouts(tmp_path):
+    archive_dir = tmp_path / "evidence"
+    _, outputs = _archive_examples(archive_dir)
+    segments = ExtractionPipeline(schema_path=SCHEMA,
+                                  archive_dir=str(archive_dir), verbose=False,
+                                  layout="segments", compression="zlib",
+                                  max_segment_bytes=4096)
+    segment_refs = [segments.run(str(path))["artifact_refs"]["archive_ref"]
+                    for path in EXAMPLES * 2]
+    total = len(outputs) + len(segment_refs)
+
+    report = _sweep(archive_dir)
+    assert report["summary"] == {"checked": total, "ok": total,
+                                 "mismatched": 0, "skipped": 0}
+
+    # Flip one byte of a JSONL file; forge a manifest's trace signature
+    jsonl = Path(outputs[0]["artifact_refs"]["jsonl_path"])
+    data = bytearray(jsonl.read_bytes())
+    data[10] ^= 1
+    jsonl.write_bytes(bytes(data))
+    manifest_path = Path(outputs[1]["artifact_refs"]["manifest_path"])
+    manifest = json.loads(manifest_path.read_text())
+    manifest["trace_signature"] = "0" * 64
+    manifest_path.write_text(json.dumps(manifest))
+
+    report = _sweep(archive_dir)
+    checks = {m["archive_ref"]: m["check"] for m in report["mismatches"]}
+    assert checks == {
+        str(jsonl.with_name(jsonl.name.replace("extraction_", "manifest_"))
+            .with_suffix(".json")): "extraction_hash",
+        str(manifest_path): "trace_signature"
+    }
+
+
+def test_verify_sweep_detects_damaged_segment_record(tmp_path):
+    archive_dir = tmp_path / "evidence"
+    pipeline, outputs = _archive_examples(archive_dir, layout="segments")
+    segments = pipeline.archive.segments
+    entry = segments.locate(outputs[2]["artifact_refs"]["archive_ref"])
+    with open(segments.data_path(1), 'r+b') as f:
+        f.seek(entry["offset"] + 5)
+        byte = f.read(1)
+        f.seek(entry["offset"] + 5)
+        f.write(bytes([byte[0] ^ 1]))
+
+    report = _sweep(archive_dir)
+    assert [m["archive_ref"] for m in report["mismatches"]] == [entry["id"]]
+    assert not pipeline.archive.verify(entry["id"])
+
+
+def test_incremental_sweep_rechecks_only_new_and_changed(tmp_path):
+    archive_dir = tmp_path / "evidence"
+    pipeline, outputs = _archive_examples(archive_dir)
+    _sweep(archive_dir)
+
+    report = _sweep(archive_dir, incremental=True)
+    assert report["summary"]["checked"] == 0
+    assert report["summary"]["skipped"] == len(outputs)
+
+    pipeline.run(str(EXAMPLES[0]))
+    Path(outputs[0]["artifact_refs"]["jsonl_path"]).write_text("{}\n")
+    # New and changed records are checked; mismatches never checkpoint
+    for checked in (2, 1):
+        report = _sweep(archive_dir, incremental=True)
+        assert report["summary"]["checked"] == checked
+        assert report["summary"]["mismatched"] == 1
+
+
+def test_v2_manifest_references_events_instead_of_copying(tmp_path):
+    v1, v1_outputs = _archive_examples(tmp_path / "v1", manifest_version=1)
+    v2, v2_outputs = _archive_examples(tmp_path / "v2", manifest_version=2)
+
+    for old, new in zip(v1_outputs, v2_outputs):
+        old_ref = old["artifact_refs"]["archive_ref"]
+        new_ref = new["artifact_refs"]["archive_ref"]
+        manifest = json.loads(Path(new_ref).read_text())
+        assert manifest["manifest_version"] == 2
+        assert "stop_events" not in manifest
+        assert manifest["stop_count"] == len(manifest["stop_refs"])
+        assert Path(new_ref).stat().st_size <= Path(old_ref).stat().st_size
+
+        # Same events, same hashes, whichever version stored them
+        for decision in ("STOP", "ACCEPT"):
+            assert json.loads(json.dumps(list(v1.archive.events(
+                old_ref, decision)))) == \
+                json.loads(json.dumps(list(v2.archive.events(
+                    new_ref, decision))))
+        old_manifest = json.loads(Path(old_ref).read_text())
+        for key in ("extraction_hash", "trace_signature", "document_hash"):
+            assert manifest[key] == old_manifest[key]
+        assert v2.archive.verify(new_ref, new["document"]["hash"])
+
+
+def test_v2_event_line_hashes_catch_edits(tmp_path):
+    pipeline, outputs = _archive_examples(tmp_path / "evidence",
+                                          manifest_version=2)
+    output = next(o for o in outputs if o["summary"]["stopped"])
+    refs = output["artifact_refs"]
+    manifest = json.loads(Path(refs["manifest_path"]).read_text())
+    line_no = manifest["stop_refs"][0]["line"]
+
+    lines = Path(refs["jsonl_path"]).read_bytes().splitlines(keepends=True)
+    result = json.loads(lines[line_no - 1])
+    result["stop_reason"] = "edited"
+    lines[line_no - 1] = canonical_bytes(result) + b"\n"
+    Path(refs["jsonl_path"]).write_bytes(b"".join(lines))
+
+    with pytest.raises(ValueError):
+        list(pipeline.archive.events(refs["archive_ref"], "STOP"))
+    assert not pipeline.archive.verify(refs["archive_ref"])
+
+
+def test_verify_sweep_checks_v2_event_refs(tmp_path):
+    archive_dir = tmp_path / "evidence"
+    pipeline, outputs = _archive_examples(archive_dir, manifest_version=2)
+    stopped = [o for o in outputs if o["summary"]["stopped"]]
+    assert _sweep(archive_dir)["summary"]["mismatched"] == 0
+
+    # Point one ref at a line that does not exist; alter another's hash
+    tampered = []
+    for output, field, value in ((stopped[0], "line", 10 ** 6),
+                                 (stopped[1], "hash", "0" * 64)):
+        manifest_path = Path(output["artifact_refs"]["manifest_path"])
+        manifest = json.loads(manifest_path.read_text())
+        manifest["stop_refs"][0][field] = value
+        manifest_path.write_text(json.dumps(manifest))
+        tampered.append(str(manifest_path))
+        assert not pipeline.archive.verify(str(manifest_path))
+
+    report = _sweep(archive_dir)
+    assert sorted((m["archive_ref"], m["check"])
+                  for m in report["mismatches"]) == \
+        sorted((ref, "event_ref") for ref in tampered)
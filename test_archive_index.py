@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Archive index: SQLite decisions table vs. a scan of the archive.
+
+Run: python -m pytest -q test_archive_index.py
+"""
+from pathlib import Path
+
+import pytest
+
+from engine.archive import EvidenceArchive
+from engine.index import ArchiveIndex
+from engine.pipeline import ExtractionPipeline
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+EXAMPLES = sorted((ROOT / "examples").glob("*.txt"))
+
+
+def _populate(archive_dir: Path) -> EvidenceArchive:
+    for layout in ("files", "segments"):
+        pipeline = ExtractionPipeline(schema_path=SCHEMA,
+                                      archive_dir=str(archive_dir),
+                                      verbose=False, layout=layout,
+                                      index=True)
+        for path in EXAMPLES:
+            pipeline.run(str(path))
+    return EvidenceArchive(str(archive_dir))
+
+
+def _scan(archive: EvidenceArchive):
+    """(archive_ref, line, field, decision, stop_reason) of every result."""
+    rows = []
+    for ref in archive.iter_refs():
+        record = archive.read_extraction(ref)
+        for line, r in enumerate(record["results"], start=1):
+            rows.append((ref, line, r["field_name"], r["decision"],
+                         r.get("stop_reason"), record["manifest"]["timestamp"]))
+    return rows
+
+
+def _key(row):
+    return (row["archive_ref"], row["line"], row["field_name"],
+            row["decision"], row["stop_reason"], row["timestamp"])
+
+
+def test_queries_match_archive_scan(tmp_path):
+    archive = _populate(tmp_path / "evidence")
+    index = ArchiveIndex(str(tmp_path / "evidence" / "index.sqlite"))
+    scanned = _scan(archive)
+    assert index.count() == len(scanned) == 2 * len(EXAMPLES)
+
+    stops = sorted(_key(r) for r in index.query(decision="STOP"))
+    assert stops == sorted(r for r in scanned if r[3] == "STOP")
+    reason = stops[0][4]
+    assert sorted(_key(r) for r in index.query(stop_reason=reason)) == \
+        sorted(r for r in scanned if r[4] == reason)
+
+    rows = index.query()
+    assert [r["timestamp"] for r in rows] == \
+        sorted((r["timestamp"] for r in rows), reverse=True)
+    middle = rows[len(rows) // 2]["timestamp"]
+    assert sorted(_key(r) for r in index.query(since=middle)) == \
+        sorted(r for r in scanned if r[5] >= middle)
+    assert sorted(_key(r) for r in index.query(until=middle)) == \
+        sorted(r for r in scanned if r[5] < middle)
+    assert len(index.query(limit=3)) == 3
+    assert index.query(limit=0) == []
+    with pytest.raises(ValueError):
+        index.query(limit=-1)
+    index.close()
+
+
+def test_rebuild_restores_the_same_rows(tmp_path):
+    archive = _populate(tmp_path / "evidence")
+    db_path = tmp_path / "evidence" / "index.sqlite"
+    index = ArchiveIndex(str(db_path))
+    before = sorted(map(_key, index.query()))
+    index.conn.execute("DELETE FROM decisions WHERE decision = 'STOP'")
+    index.conn.commit()
+    index.close()
+
+    rebuilt = ArchiveIndex.rebuild(archive, str(db_path))
+    assert sorted(map(_key, rebuilt.query())) == before
+    assert not db_path.with_name(db_path.name + ".rebuild").exists()
+    rebuilt.close()
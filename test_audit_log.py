@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Segmented audit log: append, read back, legacy per-file records, and
+hash-chain verification against signed checkpoints.
+
+Run: python -m pytest -q test_audit_log.py
+"""
+import json
+
+import pytest
+
+from engine.audit import AuditLogger, AuditVerifier, load_audit
+
+
+def _decide(logger: AuditLogger, n: int) -> str:
+    return logger.log_decision(
+        "rag_read", {"query": f"q{n}"}, "STOP" if n % 2 else "ADMIT",
+        "reviewer@example.com", blocked_at="scope" if n % 2 else None
+    )
+
+
+def test_decisions_read_back_by_id(tmp_path):
+    logger = AuditLogger(str(tmp_path / "audit"))
+    ids = [_decide(logger, n) for n in range(5)]
+    ids += logger.log_decisions([
+        {"action": "rag_read", "context": {"query": "batch"},
+         "decision": "ADMIT", "decision_maker": "reviewer@example.com"}
+    ] * 2)
+    assert len(set(ids)) == 7
+
+    for n, audit_id in enumerate(ids[:5]):
+        record = load_audit(audit_id, str(tmp_path / "audit"))
+        assert record["audit_id"] == audit_id
+        assert record["decision"] == ("STOP" if n % 2 else "ADMIT")
+        assert record["action_requested"] == "rag_read"
+    assert [r["audit_id"] for r in logger.iter_records()] == ids
+    # One file per segment, not per decision
+    assert not list((tmp_path / "audit").glob("audit_*.json"))
+
+
+def test_log_spans_segments(tmp_path):
+    logger = AuditLogger(str(tmp_path / "audit"), max_segment_bytes=2000)
+    ids = [_decide(logger, n) for n in range(20)]
+    assert len(logger.log.segments()) > 1
+
+    reader = AuditLogger(str(tmp_path / "audit"))
+    assert [r["audit_id"] for r in reader.iter_records()] == ids
+    assert reader.read(ids[-1])["audit_id"] == ids[-1]
+
+
+def test_unknown_ids_raise_file_not_found(tmp_path):
+    logger = AuditLogger(str(tmp_path / "audit"))
+    _decide(logger, 0)
+    for audit_id in ("audit_000001_00000009", "audit_999999_00000000",
+                     "nonsense"):
+        with pytest.raises(FileNotFoundError):
+            load_audit(audit_id, str(tmp_path / "audit"))
+    with pytest.raises(FileNotFoundError):
+        load_audit("audit_000001_00000000", str(tmp_path / "missing"))
+
+
+def test_legacy_per_file_records_still_load(tmp_path):
+    audit_dir = tmp_path / "audit"
+    audit_dir.mkdir()
+    legacy = {"audit_id": "audit_0123456789abcdef_1767175200",
+              "timestamp": "2025-12-31T10:00:00+00:00", "decision": "STOP"}
+    (audit_dir / f"{legacy['audit_id']}.json").write_text(json.dumps(legacy))
+    assert load_audit(legacy["audit_id"], str(audit_dir)) == legacy
+
+
+KEY = b"test-checkpoint-key"
+
+
+def _chain(audit_dir, count: int = 12) -> AuditLogger:
+    logger = AuditLogger(str(audit_dir), checkpoint_key=KEY,
+                         checkpoint_every=5)
+    for n in range(count):
+        _decide(logger, n)
+    return logger
+
+
+def _alter(logger: AuditLogger, n: int):
+    """Rewrite record n's decision in place (same length)."""
+    entry = list(logger.log.iter_entries())[n]
+    path = logger.log.data_path(logger.log.parse_id(entry["id"])[0])
+    data = bytearray(path.read_bytes())
+    span = data[entry["offset"]:entry["offset"] + entry["length"]]
+    assert b'"STOP"' in span
+    data[entry["offset"]:entry["offset"] + entry["length"]] = \
+        span.replace(b'"STOP"', b'"PASS"')
+    path.write_bytes(bytes(data))
+    return entry["id"]
+
+
+def test_clean_chain_verifies_full_and_from_checkpoint(tmp_path):
+    logger = _chain(tmp_path / "audit")
+    full = AuditVerifier(str(tmp_path / "audit"), KEY).run(full=True)
+    assert full["summary"] == {"checked": 12, "ok": 12, "broken": 0}
+    assert full["errors"] == []
+
+    quick = AuditVerifier(str(tmp_path / "audit"), KEY).run()
+    assert quick["checkpoint"]["records"] == 10
+    assert quick["summary"] == {"checked": 2, "ok": 2, "broken": 0}
+    assert quick["head"] == full["head"] == \
+        logger.log.last_entry()["hash"]
+
+
+def test_altered_record_breaks_the_chain(tmp_path):
+    logger = _chain(tmp_path / "audit")
+    altered = _alter(logger, 11)
+
+    for full in (True, False):
+        report = AuditVerifier(str(tmp_path / "audit"), KEY).run(full=full)
+        assert report["summary"]["broken"] == 1
+        assert report["errors"] == [{"audit_id": altered,
+                                     "error": "record altered"}]
+
+    # Before the newest checkpoint only a full walk sees it
+    earlier = _alter(logger, 3)
+    assert AuditVerifier(str(tmp_path / "audit"), KEY).run()["errors"] == \
+        [{"audit_id": altered, "error": "record altered"}]
+    errors = AuditVerifier(str(tmp_path / "audit"), KEY).run(
+        full=True)["errors"]
+    assert {"audit_id": earlier, "error": "record altered"} in errors
+
+
+def test_checkpoint_signatures_are_checked(tmp_path):
+    _chain(tmp_path / "audit")
+    path = tmp_path / "audit" / "audit_checkpoints.jsonl"
+    checkpoints = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [c["records"] for c in checkpoints] == [5, 10]
+
+    checkpoints[1]["hash"] = "0" * 64
+    path.write_text("".join(json.dumps(c) + "\n" for c in checkpoints))
+    report = AuditVerifier(str(tmp_path / "audit"), KEY).run()
+    assert report["errors"] == [{"audit_id": checkpoints[1]["audit_id"],
+                                 "error": "bad checkpoint signature"}]
+    # Falls back to the older valid checkpoint
+    assert report["checkpoint"]["records"] == 5
+    assert report["summary"]["checked"] == 7
+
+    wrong_key = AuditVerifier(str(tmp_path / "audit"), b"other key").run()
+    assert [e["error"] for e in wrong_key["errors"]] == \
+        ["bad checkpoint signature"] * 2
+    unkeyed = AuditVerifier(str(tmp_path / "audit")).run()
+    assert unkeyed["errors"][0]["error"] == \
+        "checkpoints present but no key (set AUDIT_CHECKPOINT_KEY)"
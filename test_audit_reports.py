@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Regulatory report counters: streamed aggregate, rollups, legacy records.
+
+Run: python -m pytest -q test_audit_reports.py
+"""
+import json
+from pathlib import Path
+
+from engine.audit import AuditLogger, RegulatoryReportGenerator
+from engine.rollups import AuditRollups
+from engine.segments import SegmentLog
+
+FIELDS = ("total", "admitted", "stopped", "block_points", "first", "last")
+
+
+def _legacy(audit_dir: Path, n: int, decision: str, timestamp: str,
+            blocked_at=None):
+    """A per-file record as written before the segment log."""
+    audit_id = f"audit_{n:016x}_{1767175200 + n}"
+    record = {
+        "audit_id": audit_id,
+        "timestamp": timestamp,
+        "decision_context_hash": f"{n:064x}",
+        "action_requested": "rag_read",
+        "decision": decision,
+        "decision_maker_id": "legacy@example.com",
+        "conditions_proven": {},
+        "blocked_at": blocked_at,
+        "reason": None
+    }
+    with open(audit_dir / f"{audit_id}.json", 'w') as f:
+        json.dump(record, f, indent=2)
+    return audit_id
+
+
+def _populate(audit_dir: Path, rollups: bool = False) -> AuditLogger:
+    audit_dir.mkdir()
+    _legacy(audit_dir, 1, "ADMIT", "2025-12-31T10:15:00+00:00")
+    _legacy(audit_dir, 2, "STOP", "2025-12-31T10:45:00+00:00", "scope")
+    _legacy(audit_dir, 3, "STOP", "2025-12-31T11:05:00+00:00", "identity")
+    logger = AuditLogger(str(audit_dir), rollups=rollups)
+    for n in range(6):
+        logger.log_decision(
+            "rag_read", {"n": n}, "STOP" if n % 3 else "ADMIT",
+            "writer@example.com", blocked_at="scope" if n % 3 else None
+        )
+    return logger
+
+
+def _totals(audit_dir: Path, since=None, until=None):
+    rollups = AuditRollups(str(audit_dir / "rollups.sqlite"))
+    log = SegmentLog(str(audit_dir), prefix="audit_log", id_prefix="audit")
+    with log.lock:
+        rollups.sync(log)
+    totals = rollups.totals(since, until)
+    rollups.close()
+    return totals
+
+
+def test_aggregate_counts_legacy_records(tmp_path):
+    _populate(tmp_path / "audit")
+    stats = RegulatoryReportGenerator().aggregate(str(tmp_path / "audit"))
+    assert stats["total"] == 9
+    assert stats["admitted"] == 3
+    assert stats["block_points"] == {"scope": 5, "identity": 1}
+    assert stats["first"] == "2025-12-31T10:15:00+00:00"
+    assert stats["segments"]["legacy"]["count"] == 3
+
+    window = RegulatoryReportGenerator().aggregate(
+        str(tmp_path / "audit"), since="2025-12-31T10", until="2025-12-31T11")
+    assert (window["total"], window["admitted"]) == (2, 1)
+
+
+def test_rollups_match_recomputed_aggregate(tmp_path):
+    audit_dir = tmp_path / "audit"
+    _populate(audit_dir, rollups=True)
+    generator = RegulatoryReportGenerator()
+    for since, until in ((None, None),
+                         ("2025-12-31T10", "2025-12-31T11"),
+                         ("2025-12-31T11", None),
+                         ("2026", None)):
+        expected = generator.aggregate(str(audit_dir), since, until)
+        totals = _totals(audit_dir, since, until)
+        assert {k: totals[k] for k in FIELDS} == \
+            {k: expected[k] for k in FIELDS}, (since, until)
+
+
+def test_legacy_records_fold_into_rollups_once(tmp_path):
+    audit_dir = tmp_path / "audit"
+    logger = _populate(audit_dir, rollups=True)
+    assert _totals(audit_dir)["total"] == 9
+    logger.log_decision("rag_read", {"n": 99}, "ADMIT", "writer@example.com")
+    assert _totals(audit_dir)["total"] == 10
+
+    log = SegmentLog(str(audit_dir), prefix="audit_log", id_prefix="audit")
+    rollups = AuditRollups(str(audit_dir / "rollups.sqlite"))
+    with log.lock:
+        assert rollups.rebuild(log) == 10
+    rollups.close()
+    assert _totals(audit_dir)["total"] == 10
+
+
+def test_report_from_rollups_includes_legacy_records(tmp_path):
+    audit_dir = tmp_path / "audit"
+    _populate(audit_dir, rollups=True)
+    generator = RegulatoryReportGenerator()
+    from_rollups = Path(generator.generate(audit_dir=str(audit_dir),
+                                          since="2025-12-31")).read_text()
+    streamed = Path(generator.generate(audit_dir=str(audit_dir),
+                                       since="2025-12-31",
+                                       recompute=True)).read_text()
+    for text in (from_rollups, streamed):
+        assert "**Total Decisions**: 9" in text
+    assert "- legacy: audit_" in streamed
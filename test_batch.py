@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Batch runner: streaming JSONL jobs through worker processes.
+
+Run: python -m pytest -q test_batch.py
+"""
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from engine.batch import BatchRunner, job_kind, journal_key
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+CONTENT = (ROOT / "examples/accept_example.txt").read_text()
+
+
+def _jobs(path: Path, lines):
+    path.write_text("".join(
+        (line if isinstance(line, str) else json.dumps(line)) + "\n"
+        for line in lines
+    ))
+    return str(path)
+
+
+def _runner(tmp_path, **options) -> BatchRunner:
+    return BatchRunner(schema_path=SCHEMA,
+                       archive_dir=str(tmp_path / "evidence"), **options)
+
+
+def _results(output: io.StringIO):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_job_kind_and_journal_key():
+    assert job_kind({"query": "q"}) == "rag_read"
+    assert job_kind({"action": "rag_read", "request": {}}) == "rag_read"
+    assert job_kind({"path": "a.txt"}) == "extract"
+    assert journal_key({"path": "docs/./a.txt"}) == "docs/a.txt"
+    assert journal_key({"content": "x", "source_id": "s"}) == "s"
+    assert journal_key({"path": "a.txt", "dry_run": True}) is None
+    assert journal_key({"query": "q"}) is None
+
+
+def test_results_in_input_order_with_per_line_errors(tmp_path):
+    jobs = [{"content": CONTENT, "source_id": f"doc{n}.txt", "dry_run": True}
+            for n in range(12)]
+    jobs[3] = "{not json"
+    jobs[7] = {"neither": True}
+    jobs.insert(5, "")  # blank lines are skipped, numbering continues
+    output = io.StringIO()
+    stats = _runner(tmp_path, workers=3, window=4).run(
+        _jobs(tmp_path / "jobs.jsonl", jobs), output)
+
+    results = _results(output)
+    assert [r["line"] for r in results] == [n for n in range(1, 14) if n != 6]
+    assert stats == {"processed": 12, "ok": 10, "failed": 2, "skipped": 0,
+                     "committed_line": 13}
+    failed = {r["line"]: r["error"] for r in results if not r["ok"]}
+    assert failed[4].startswith("JSONDecodeError")
+    assert failed[9].startswith("ValueError")
+    assert results[0]["result"]["document"]["path"] == "doc0.txt"
+
+
+def test_completion_order_emits_every_line_once(tmp_path):
+    jobs = [{"content": CONTENT, "source_id": f"doc{n}.txt", "dry_run": True}
+            for n in range(10)]
+    output = io.StringIO()
+    _runner(tmp_path, workers=3, order="completion", window=3).run(
+        _jobs(tmp_path / "jobs.jsonl", jobs), output)
+    assert sorted(r["line"] for r in _results(output)) == list(range(1, 11))
+
+
+def test_resume_truncates_to_checkpoint_and_emits_rest_once(tmp_path):
+    jobs = _jobs(tmp_path / "jobs.jsonl", [
+        {"content": CONTENT, "source_id": f"doc{n}.txt", "dry_run": True}
+        for n in range(10)
+    ])
+    output_path = tmp_path / "results.jsonl"
+    checkpoint = tmp_path / "results.jsonl.checkpoint"
+    runner = _runner(tmp_path, workers=2, checkpoint_path=str(checkpoint),
+                     checkpoint_every=3)
+    with open(output_path, 'w') as output:
+        runner.run(jobs, output)
+    assert runner.load_checkpoint() == {
+        "committed_line": 10, "output_offset": output_path.stat().st_size
+    }
+
+    # Crash after line 4 was checkpointed, mid-way through line 6
+    lines = output_path.read_text().splitlines(keepends=True)
+    offset = len("".join(lines[:4]).encode())
+    checkpoint.write_text(json.dumps({"committed_line": 4,
+                                      "output_offset": offset}))
+    output_path.write_text("".join(lines[:5]) + lines[5][:20])
+
+    subprocess.run(
+        [sys.executable, "-m", "engine", "batch", jobs, "-o", str(output_path),
+         "--resume", "--workers", "2", "--dry-run", "--schema", SCHEMA,
+         "--archive-dir", str(tmp_path / "evidence")],
+        cwd=ROOT, check=True, capture_output=True
+    )
+    resumed = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [r["line"] for r in resumed] == list(range(1, 11))
+    assert runner.load_checkpoint()["committed_line"] == 10
+
+
+def test_journal_skips_documents_whose_evidence_verifies(tmp_path):
+    jobs = _jobs(tmp_path / "jobs.jsonl", [
+        {"content": CONTENT + f"\n{n}", "source_id": f"doc{n}.txt"}
+        for n in range(4)
+    ])
+    journal = str(tmp_path / "journal.jsonl")
+    first = io.StringIO()
+    stats = _runner(tmp_path, workers=2, journal_path=journal).run(jobs, first)
+    assert (stats["ok"], stats["skipped"]) == (4, 0)
+    refs = [r["result"]["artifact_refs"]["archive_ref"]
+            for r in _results(first)]
+
+    # Evidence of doc2 is damaged: that document alone is extracted again
+    first_refs = _results(first)[2]["result"]["artifact_refs"]
+    Path(first_refs["jsonl_path"]).write_text("tampered\n")
+    second = io.StringIO()
+    stats = _runner(tmp_path, workers=2, journal_path=journal).run(jobs, second)
+    results = _results(second)
+    assert (stats["ok"], stats["skipped"]) == (4, 3)
+    assert [bool(r.get("skipped")) for r in results] == \
+        [True, True, False, True]
+    assert [r["result"]["artifact_refs"]["archive_ref"]
+            for r in results][:2] == refs[:2]
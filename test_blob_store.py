@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Blob store and garbage collection.
+
+Run: python -m pytest -q test_blob_store.py
+"""
+import os
+import time
+from pathlib import Path
+
+from engine.blobs import BlobStore
+from engine.pipeline import ExtractionPipeline
+
+ROOT = Path(__file__).parent
+
+
+def _age(store: BlobStore, digest: str, seconds: float):
+    old = time.time() - seconds
+    os.utime(store.path(digest), (old, old))
+
+
+def test_put_is_content_addressed_and_deduplicated(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    digest = store.put(b"payload")
+    assert store.put(b"payload") == digest
+    assert store.get(digest) == b"payload"
+    assert list(store.iter_digests()) == [digest]
+    assert store.written == [store.path(digest)]
+
+
+def test_get_rejects_damaged_blob(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    digest = store.put(b"payload")
+    store.path(digest).write_bytes(b"tampered")
+    try:
+        store.get(digest)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("damaged blob returned")
+
+
+def test_sweep_keeps_referenced_and_recent_blobs(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    kept = store.put(b"referenced")
+    orphan = store.put(b"orphan")
+    recent = store.put(b"recent orphan")
+    _age(store, kept, 7200)
+    _age(store, orphan, 7200)
+
+    stats = store.sweep([kept], grace_seconds=3600)
+    assert stats["deleted"] == 1
+    assert set(store.iter_digests()) == {kept, recent}
+
+
+def test_dedup_hit_renews_grace_period(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    digest = store.put(b"old orphan")
+    _age(store, digest, 7200)
+
+    # A new record starts referencing the old blob before its record lands
+    assert store.put(b"old orphan") == digest
+    assert store.sweep([], grace_seconds=3600)["deleted"] == 0
+    assert store.get(digest) == b"old orphan"
+
+
+def test_archive_gc_keeps_blobs_of_archived_records(tmp_path):
+    pipeline = ExtractionPipeline(
+        schema_path=str(ROOT / "schema/extraction_schema.json"),
+        archive_dir=str(tmp_path / "evidence"), verbose=False,
+        dedup=True, dedup_min_bytes=1
+    )
+    content = (ROOT / "examples/accept_example.txt").read_text()
+    pipeline.run_text(content, "accept.txt")
+    pipeline.run_text(content, "accept-copy.txt")
+    blobs = pipeline.archive.blobs
+    digests = set(blobs.iter_digests())
+    assert digests
+
+    orphan = blobs.put(b"never referenced")
+    for digest in digests | {orphan}:
+        _age(blobs, digest, 7200)
+
+    stats = pipeline.archive.collect_garbage(grace_seconds=3600)
+    assert stats["deleted"] == 1
+    assert stats["missing"] == 0
+    assert set(blobs.iter_digests()) == digests
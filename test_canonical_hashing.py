@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Compatibility suite for engine.hashing and common.hashing.
+
+Each digest must be byte-identical to the inline serialization it
+replaced, so hashes already stored in audit logs, tokens and archives
+keep verifying. Run: python -m pytest -q test_canonical_hashing.py
+"""
+import hashlib
+import hmac
+import json
+import subprocess
+import sys
+from itertools import permutations
+from pathlib import Path
+
+from common.hashing import text_hash
+from engine.hashing import (
+    HashMemo, canonical_bytes, canonical_json, context_hash, json_hash,
+    proof_bundle_hash, sha256_hex, trace_signature
+)
+
+
+SAMPLES = [
+    {},
+    [],
+    {"b": 1, "a": [3, 2, 1], "c": {"z": None, "y": True, "x": False}},
+    {"unicode": "효력 발생일 2025-01-01 — “quoted”", "emoji": "\U0001F600"},
+    {"float": 0.1, "big": 10 ** 30, "neg": -1.5e-7, "nan": float("nan")},
+    {"nested": [{"k": "v", "a": [{"deep": ["x", {"b": 2, "a": 1}]}]}]},
+    {"quote\"key": "back\\slash", "ctrl": "\n\t\x00"},
+    "plain string",
+    12345,
+    None,
+]
+
+CONTEXTS = [
+    ({"document": "contract.pdf", "content_hash": "abc123"},
+     {"alternatives": ["manual_review"], "stop_capability": True}),
+    ({"content": "계약 효력 발생일은 2025년 1월 1일이다"}, None),
+    ({}, {}),
+]
+
+QUERIES = ["effective date", "이 문서 요약해줘", "", "a" * 10000]
+
+ROOT = Path(__file__).parent
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter (no modules loaded by other tests)."""
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+
+
+def test_canonical_json_matches_json_dumps():
+    for obj in SAMPLES:
+        assert canonical_json(obj) == json.dumps(obj, sort_keys=True)
+        assert canonical_json(obj, compact=True) == json.dumps(
+            obj, sort_keys=True, separators=(',', ':')
+        )
+        assert canonical_bytes(obj) == \
+            json.dumps(obj, sort_keys=True).encode('utf-8')
+
+
+def test_json_hash():
+    for obj in SAMPLES:
+        expected = hashlib.sha256(
+            json.dumps(obj, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        assert json_hash(obj) == expected
+        assert HashMemo().hash(obj) == expected
+
+
+def test_query_context_hash_matches_admission_and_tokens():
+    from admission.rules_rag_read import evaluate_rag_read
+    from execution.token_validator import derive_context_hash
+
+    for query in QUERIES:
+        expected = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        assert text_hash(query) == expected
+        assert sha256_hex(query) == expected
+        assert derive_context_hash(query) == expected
+        admission = evaluate_rag_read({
+            "decision_maker": "tester", "why": "compat",
+            "scope": "read_only", "query": query
+        })
+        assert admission.token["context_hash"] == expected
+
+
+def test_audit_context_hash_and_proof_bundle():
+    from engine.audit import AuditLogger
+
+    for context, conditions in CONTEXTS:
+        data = f"act:{json.dumps(context, sort_keys=True)}:op@example.com"
+        expected_context = hashlib.sha256(data.encode()).hexdigest()
+        bundle = {"context": context, "conditions": conditions or {}}
+        expected_bundle = hashlib.sha256(
+            json.dumps(bundle, sort_keys=True).encode()
+        ).hexdigest()
+
+        memo = HashMemo()
+        assert context_hash("act", context, "op@example.com", memo) == \
+            expected_context
+        assert proof_bundle_hash(context, conditions, memo) == \
+            expected_bundle
+        assert proof_bundle_hash(context, conditions) == expected_bundle
+
+        # Methods keep their signatures and results
+        logger = AuditLogger.__new__(AuditLogger)
+        assert logger._compute_context_hash(
+            "act", context, "op@example.com"
+        ) == expected_context
+        assert logger._create_proof_bundle(context, conditions) == \
+            f"proof_{expected_bundle[:16]}"
+
+
+def test_memo_serializes_each_object_once():
+    context = {"document": "a.pdf"}
+    memo = HashMemo()
+    first = memo.json(context)
+    assert memo.json(context) is first
+    # Equal but distinct objects are serialized separately
+    assert memo.json(dict(context)) == first
+
+
+def test_archive_trace_signature_and_leaf():
+    from engine.archive import EvidenceArchive
+
+    results = [sample for sample in SAMPLES if isinstance(sample, dict)]
+    results = [r for r in results if "nan" not in r]
+    doc_hash = "d" * 64
+
+    results_hash = hashlib.sha256(
+        json.dumps(results, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    expected = hashlib.sha256(
+        f"{doc_hash}:{results_hash}".encode('utf-8')
+    ).hexdigest()
+
+    lines = [canonical_bytes(r) for r in results]
+    assert trace_signature(doc_hash, lines) == expected
+
+    archive = EvidenceArchive.__new__(EvidenceArchive)
+    assert archive._compute_trace_signature(
+        {"content_hash": doc_hash}, results
+    ) == expected
+
+    leaf = archive._merkle_leaf("t", doc_hash, "e" * 64, "s" * 64)
+    assert leaf == json.dumps({
+        "document_hash": doc_hash, "extraction_hash": "e" * 64,
+        "timestamp": "t", "trace_signature": "s" * 64
+    }, sort_keys=True, separators=(',', ':'))
+
+
+def test_checkpoint_signature():
+    from engine.audit import _sign
+
+    checkpoint = {"audit_id": "audit_000001_00000999", "records": 1000,
+                  "hash": "f" * 64, "timestamp": "2026-01-01T00:00:00+00:00"}
+    message = json.dumps(checkpoint, sort_keys=True, separators=(',', ':'))
+    expected = hmac.new(b"key", message.encode('utf-8'),
+                        hashlib.sha256).hexdigest()
+    assert _sign(b"key", checkpoint) == expected
+    assert _sign(b"key", dict(checkpoint, signature=expected)) == expected
+
+
+def test_frozen_layers_do_not_import_engine():
+    result = _run(
+        "import sys\n"
+        "import admission\n"
+        "import execution.token_validator\n"
+        "loaded = [m for m in sys.modules\n"
+        "          if m == 'engine' or m.startswith('engine.')]\n"
+        "assert not loaded, loaded"
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_query_hash_in_any_import_order():
+    modules = ["admission.rules_rag_read", "execution.token_validator",
+               "common.hashing"]
+    check = (
+        "from admission.rules_rag_read import evaluate_rag_read\n"
+        "from execution.token_validator import derive_context_hash\n"
+        "from common.hashing import text_hash\n"
+        "q = 'effective date'\n"
+        "token = evaluate_rag_read({'decision_maker': 't', 'why': 'w',\n"
+        "    'scope': 'read_only', 'query': q}).token\n"
+        "assert token['context_hash'] == derive_context_hash(q) == "
+        "text_hash(q)\n"
+    )
+    for order in permutations(modules):
+        imports = "".join(f"import {module}\n" for module in order)
+        result = _run(imports + check)
+        assert result.returncode == 0, (order, result.stderr)
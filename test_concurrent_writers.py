@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Several processes writing one archive or audit directory.
+
+Run: python -m pytest -q test_concurrent_writers.py
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from engine.archive import EvidenceArchive
+from engine.audit import AuditLogger, AuditVerifier, RegulatoryReportGenerator
+from engine.pipeline import ExtractionPipeline
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+WRITERS = 4
+PER_WRITER = 25
+
+
+def _log_decisions(audit_dir: str, writer: int):
+    logger = AuditLogger(audit_dir)
+    return [
+        logger.log_decision("rag_read", {"writer": writer, "n": n}, "ADMIT",
+                            f"writer{writer}@example.com")
+        for n in range(PER_WRITER)
+    ]
+
+
+def _archive(archive_dir: str, layout: str, writer: int):
+    pipeline = ExtractionPipeline(schema_path=SCHEMA, archive_dir=archive_dir,
+                                  verbose=False, layout=layout)
+    content = (ROOT / "examples/accept_example.txt").read_text()
+    return [
+        pipeline.run_text(content, f"w{writer}_{n}.txt")
+        ["artifact_refs"]["archive_ref"]
+        for n in range(PER_WRITER // 5)
+    ]
+
+
+def _report(audit_dir: str, audit_id: str) -> str:
+    return RegulatoryReportGenerator().generate([audit_id], audit_dir)
+
+
+def test_concurrent_audit_loggers_keep_one_chain(tmp_path):
+    audit_dir = str(tmp_path / "audit")
+    with ProcessPoolExecutor(WRITERS) as pool:
+        batches = list(pool.map(_log_decisions, [audit_dir] * WRITERS,
+                                range(WRITERS)))
+    ids = [audit_id for batch in batches for audit_id in batch]
+    assert len(set(ids)) == WRITERS * PER_WRITER
+
+    report = AuditVerifier(audit_dir).run(full=True)
+    assert report["summary"]["checked"] == WRITERS * PER_WRITER
+    assert report["summary"]["broken"] == 0, report["errors"]
+
+
+def test_concurrent_archive_writers(tmp_path):
+    for layout in ("files", "segments"):
+        archive_dir = str(tmp_path / layout)
+        with ProcessPoolExecutor(WRITERS) as pool:
+            batches = list(pool.map(_archive, [archive_dir] * WRITERS,
+                                    [layout] * WRITERS, range(WRITERS)))
+        refs = [ref for batch in batches for ref in batch]
+        assert len(set(refs)) == len(refs)
+
+        archive = EvidenceArchive(archive_dir)
+        assert sorted(archive.iter_refs()) == sorted(refs)
+        assert all(archive.verify(ref) for ref in refs)
+
+
+def test_concurrent_reports_never_overwrite(tmp_path):
+    audit_dir = str(tmp_path / "audit")
+    ids = _log_decisions(audit_dir, 0)[:WRITERS * 2]
+    with ProcessPoolExecutor(WRITERS) as pool:
+        paths = list(pool.map(_report, [audit_dir] * len(ids), ids))
+
+    assert len(set(paths)) == len(ids)
+    for audit_id, path in zip(ids, paths):
+        assert f"- {audit_id}" in Path(path).read_text()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+CorpusIndex: indexed retrieval returns exactly what the full scan does.
+
+Run: python -m pytest -q test_corpus_index.py
+"""
+import os
+import random
+from pathlib import Path
+
+from execution.corpus_index import CorpusIndex
+from execution.retriever import simple_grep_retrieve
+
+ROOT = Path(__file__).parent
+WORDS = (ROOT / "README.md").read_text().split()
+
+
+def _write_corpus(corpus: Path, rng: random.Random, files: int = 120):
+    for n in range(files):
+        directory = corpus / f"d{n % 7}" / ("sub" if n % 3 == 0 else "")
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = rng.choice([".md", ".txt", ".py"])
+        words = rng.choices(WORDS, k=rng.randint(5, 300))
+        (directory / f"f{n}{suffix}").write_text(" ".join(words))
+
+
+def _queries(rng: random.Random, count: int = 120):
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3)))
+               for _ in range(count)]
+    return queries + ["zzqx", "ab", "the", ""]
+
+
+def _assert_parity(corpus: Path, index: CorpusIndex, queries):
+    for query in queries:
+        assert simple_grep_retrieve(query, str(corpus), 5, index=index) == \
+            simple_grep_retrieve(query, str(corpus), 5), query
+
+
+def _mutate(corpus: Path, rng: random.Random):
+    files = sorted(p for p in corpus.rglob("*") if p.is_file()
+                   and ".rag_index" not in p.parts)
+    for path in rng.sample(files, 10):
+        path.unlink()
+    for path in rng.sample(files, 10):
+        if path.exists():
+            with open(path, "a") as f:
+                f.write(" effective zzqx")
+            os.utime(path, (1, 1))  # a new mtime even within one tick
+    (corpus / "d3" / "new.md").write_text("zzqx appended later")
+
+
+def test_parity_after_build_update_and_compact(tmp_path):
+    rng = random.Random(5)
+    corpus = tmp_path / "corpus"
+    _write_corpus(corpus, rng)
+    queries = _queries(rng)
+
+    index = CorpusIndex(str(corpus))
+    stats = index.build()
+    assert stats["files"] == stats["added"]
+    _assert_parity(corpus, index, queries)
+
+    _mutate(corpus, rng)
+    stats = index.update()
+    assert stats["removed"] and stats["changed"] and stats["added"]
+    _assert_parity(corpus, index, queries)
+
+    index.compact()
+    _assert_parity(corpus, index, queries)
+
+    # A fresh handle on the same index directory sees the same state
+    _assert_parity(corpus, CorpusIndex(str(corpus)), queries)
+
+
+def test_update_without_changes_is_a_no_op(tmp_path):
+    rng = random.Random(6)
+    corpus = tmp_path / "corpus"
+    _write_corpus(corpus, rng, files=20)
+    index = CorpusIndex(str(corpus))
+    files = index.build()["files"]
+    assert index.update() == {"files": files, "added": 0, "changed": 0,
+                              "removed": 0}
+
+
+def test_unbuilt_index_is_an_error(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    try:
+        CorpusIndex(str(corpus)).candidates(["term"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unbuilt index answered a query")
+
+
+class _UpdateDuringCompact:
+    """Connection proxy: runs another process's update() mid-compaction."""
+
+    def __init__(self, conn, trigger: str, update):
+        self._conn, self._trigger, self._update = conn, trigger, update
+
+    def execute(self, sql, *args):
+        if self._update and sql.startswith(self._trigger):
+            update, self._update = self._update, None
+            update()
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+
+def test_compact_keeps_files_added_by_a_concurrent_update(tmp_path):
+    rng = random.Random(8)
+    corpus = tmp_path / "corpus"
+    _write_corpus(corpus, rng, files=30)
+    compactor = CorpusIndex(str(corpus))
+    compactor.build()
+    compactor.update()
+
+    (corpus / "late.md").write_text("zzqx arrived during compaction")
+    updater = CorpusIndex(str(corpus))
+    # Commit the update between reading the live ids and the watermark
+    compactor.conn = _UpdateDuringCompact(
+        compactor.conn, "SELECT COALESCE(MAX(rowid), 0)", updater.update
+    )
+    compactor.compact()
+    compactor.conn = compactor.conn._conn
+
+    for index in (compactor, updater, CorpusIndex(str(corpus))):
+        hits = simple_grep_retrieve("zzqx", str(corpus), 5, index=index)
+        assert [Path(e.source).name for e in hits] == ["late.md"]
+    compactor.compact()
+    _assert_parity(corpus, compactor, ["zzqx", "arrived", "the"])
+
+
+def test_readers_follow_generation_swaps(tmp_path):
+    rng = random.Random(9)
+    corpus = tmp_path / "corpus"
+    _write_corpus(corpus, rng, files=30)
+    writer = CorpusIndex(str(corpus))
+    writer.build()
+    reader = CorpusIndex(str(corpus))
+    assert simple_grep_retrieve("zzqx", str(corpus), 5, index=reader) == []
+
+    (corpus / "new.md").write_text("zzqx")
+    writer.update()
+    writer.compact()
+    writer.compact()
+    hits = simple_grep_retrieve("zzqx", str(corpus), 5, index=reader)
+    assert [Path(e.source).name for e in hits] == ["new.md"]
+    # The current and previous generations are kept, older ones removed
+    assert len(list(writer.index_dir.glob("postings.*.bin"))) == 2
+
+
+def test_postings_file_round_trip(tmp_path):
+    from execution.postings import PostingsFile, write_postings
+
+    items = [("abc", [1, 5, 9]), ("abd", [2]), ("zzz", []), ("문서", [3, 4])]
+    path = tmp_path / "postings.bin"
+    assert write_postings(path, items) == len(items)
+    postings = PostingsFile(path)
+    for term, ids in items:
+        assert list(postings.lookup(term)) == ids
+    assert list(postings.lookup("missing")) == []
+    assert [(t, list(ids)) for t, ids in postings.items()] == items
+    postings.close()
+
+    try:
+        write_postings(tmp_path / "bad.bin", [("b", [1]), ("a", [2])])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("out-of-order terms accepted")
+    assert not (tmp_path / "bad.bin").exists()
+
+
+def test_korean_queries_retrieve_two_syllable_terms(tmp_path):
+    from execution.retriever import query_terms
+
+    assert query_terms("이 문서 요약해줘") == ["문서", "요약해줘"]
+    assert query_terms("an ox is big") == ["big"]
+
+    rng = random.Random(10)
+    corpus = tmp_path / "corpus"
+    _write_corpus(corpus, rng, files=30)
+    syllables = [chr(c) for c in range(0xAC00, 0xD7A3, 97)]
+    vocab = ["".join(rng.choices(syllables, k=rng.choice([2, 2, 3])))
+             for _ in range(200)] + ["문서", "규칙", "계획"]
+    particles = ["을", "를", "은", "는", "에서", ""]
+    for n in range(60):
+        words = [rng.choice(vocab) + rng.choice(particles)
+                 for _ in range(rng.randint(5, 80))]
+        (corpus / f"ko{n}.md").write_text(" ".join(words))
+    (corpus / "mixed.txt").write_text("ABC문서 日本語テキスト 中文")
+
+    index = CorpusIndex(str(corpus))
+    index.build()
+    queries = ["이 문서 요약해줘", "규칙", "계획을", "日本", "中文", "c문",
+               "문서 the"] + [" ".join(rng.sample(vocab, 2)) for _ in range(40)]
+    _assert_parity(corpus, index, queries)
+    assert simple_grep_retrieve("이 문서 요약해줘", str(corpus), 5, index=index)
+
+    (corpus / "ko0.md").write_text("새로운 문서")
+    os.utime(corpus / "ko0.md", (1, 1))
+    index.update()
+    _assert_parity(corpus, index, queries + ["새로운"])
+    index.compact()
+    _assert_parity(corpus, index, queries + ["새로운"])
+
+
+def test_index_with_another_gram_scheme_must_be_rebuilt(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.md").write_text("문서")
+    index = CorpusIndex(str(corpus))
+    index.build()
+    with index.conn:
+        index.conn.execute("UPDATE meta SET value = '3' WHERE name = 'grams'")
+    for call in (index.update, lambda: CorpusIndex(str(corpus))
+                 .candidates(["문서"])):
+        try:
+            call()
+        except ValueError:
+            continue
+        raise AssertionError("stale gram scheme accepted")
+    index.build()
+    assert index.candidates(["문서"]) == [str(corpus / "a.md")]
+
+
+def test_ranking_is_deterministic_and_matches_the_scan(tmp_path):
+    rng = random.Random(11)
+    corpus = tmp_path / "corpus"
+    _write_corpus(corpus, rng, files=80)
+    for name in ("zz.md", "aa.md", "mm.txt"):
+        (corpus / name).write_text("uniqueterm here")
+    (corpus / "best.md").write_text("uniqueterm uniqueterm uniqueterm")
+    index = CorpusIndex(str(corpus))
+    index.build()
+
+    for query in _queries(rng, 40) + ["uniqueterm"]:
+        for rank in ("tf", "bm25"):
+            scan = simple_grep_retrieve(query, str(corpus), 5, rank=rank)
+            assert scan == simple_grep_retrieve(query, str(corpus), 5,
+                                                rank=rank)
+            assert scan == simple_grep_retrieve(query, str(corpus), 5,
+                                                index=index, rank=rank)
+
+    # Best score first; equal scores in path order
+    hits = simple_grep_retrieve("uniqueterm", str(corpus), 3, rank="bm25")
+    assert [Path(e.source).name for e in hits] == ["best.md", "aa.md",
+                                                   "mm.txt"]
+
+
+def test_bm25_matches_reference_formula(tmp_path):
+    import math
+
+    docs = {"a.md": "apple apple pear", "b.md": "apple " + "filler " * 20,
+            "c.md": "pear pear", "d.md": "nothing relevant here"}
+    for name, text in docs.items():
+        (tmp_path / name).write_text(text)
+
+    terms = ["apple", "pear"]
+    n = len(docs)
+    lengths = {name: len(text.split()) for name, text in docs.items()}
+    avg = sum(lengths.values()) / n
+
+    def bm25(name):
+        score = 0.0
+        for term in terms:
+            tf = docs[name].count(term)
+            df = sum(1 for text in docs.values() if term in text)
+            if tf:
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                norm = 1.2 * (1 - 0.75 + 0.75 * lengths[name] / avg)
+                score += idf * tf * 2.2 / (tf + norm)
+        return score
+
+    expected = sorted((name for name in docs if bm25(name) > 0),
+                      key=lambda name: (-bm25(name), name))
+    hits = simple_grep_retrieve("apple pear", str(tmp_path), 5, rank="bm25")
+    assert [Path(e.source).name for e in hits] == expected
+
+
+def test_unknown_rank_is_rejected(tmp_path):
+    try:
+        simple_grep_retrieve("term", str(tmp_path), rank="pagerank")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown rank accepted")
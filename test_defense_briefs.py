@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Defense briefs: bulk generation by segment, skip-if-current, legacy records.
+
+Run: python -m pytest -q test_defense_briefs.py
+"""
+import json
+from pathlib import Path
+
+from engine.audit import AuditLogger, DefenseBriefGenerator, load_audit
+
+
+def _decide(logger: AuditLogger, n: int) -> str:
+    return logger.log_decision(
+        "rag_read", {"query": f"q{n}"}, "STOP" if n % 2 else "ADMIT",
+        "reviewer@example.com", blocked_at="scope" if n % 2 else None
+    )
+
+
+def _body(path) -> str:
+    """Brief text without its **Generated** timestamp line."""
+    return "".join(line for line in Path(path).read_text().splitlines(True)
+                   if not line.startswith("**Generated**"))
+
+
+def test_generate_many_matches_single_briefs(tmp_path):
+    audit_dir = str(tmp_path / "audit")
+    logger = AuditLogger(audit_dir, max_segment_bytes=2000)
+    ids = [_decide(logger, n) for n in range(12)]
+    assert len(logger.log.segments()) > 1
+
+    result = DefenseBriefGenerator().generate_many(
+        ids + ["audit_999999_00000000", "nonsense"], audit_dir, workers=2)
+    assert result["generated"] == 12
+    assert sorted(result["missing"]) == ["audit_999999_00000000", "nonsense"]
+    bulk = {audit_id: _body(result["paths"][audit_id]) for audit_id in ids}
+
+    for audit_id in ids:
+        path = DefenseBriefGenerator().generate(audit_id, audit_dir)
+        assert path == result["paths"][audit_id]
+        assert _body(path) == bulk[audit_id]
+        assert audit_id in bulk[audit_id]
+
+
+def test_current_briefs_are_skipped(tmp_path):
+    audit_dir = str(tmp_path / "audit")
+    logger = AuditLogger(audit_dir)
+    ids = [_decide(logger, n) for n in range(4)]
+    generator = DefenseBriefGenerator()
+    paths = generator.generate_many(ids, audit_dir, workers=1)["paths"]
+
+    again = generator.generate_many(ids, audit_dir, workers=1)
+    assert (again["generated"], again["skipped"]) == (0, 4)
+
+    # A brief whose header no longer matches its record is re-rendered
+    stale = Path(paths[ids[1]])
+    stale.write_text("<!-- audit-record-sha256: " + "0" * 64 + " -->\n")
+    again = generator.generate_many(ids, audit_dir, workers=1)
+    assert (again["generated"], again["skipped"]) == (1, 3)
+    assert ids[1] in stale.read_text()
+
+    forced = generator.generate_many(ids, audit_dir, workers=1, force=True)
+    assert (forced["generated"], forced["skipped"]) == (4, 0)
+
+
+def test_legacy_records_get_briefs(tmp_path):
+    audit_dir = tmp_path / "audit"
+    logger = AuditLogger(str(audit_dir))
+    current = _decide(logger, 1)
+    legacy = dict(load_audit(current, str(audit_dir)),
+                  audit_id="audit_0123456789abcdef_1767175200")
+    (audit_dir / f"{legacy['audit_id']}.json").write_text(
+        json.dumps(legacy, indent=2))
+
+    result = DefenseBriefGenerator().generate_many(
+        [legacy["audit_id"], current], str(audit_dir), workers=1)
+    assert result["generated"] == 2
+    brief = Path(result["paths"][legacy["audit_id"]]).read_text()
+    assert legacy["audit_id"] in brief
+    assert "STOPPED" in brief
+    assert _body(DefenseBriefGenerator().generate(
+        legacy["audit_id"], str(audit_dir))) == _body(
+        result["paths"][legacy["audit_id"]])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Group-commit durability: async futures, commit failures, sealed segments
+and batch workers.
+
+Run: python -m pytest -q test_durable_writer.py
+"""
+import io
+import json
+import multiprocessing
+from pathlib import Path
+
+import engine.writer
+from engine import batch
+from engine.archive import EvidenceArchive
+from engine.batch import BatchRunner
+from engine.ingest import DocumentIngestor
+from engine.pipeline import ExtractionPipeline
+from engine.writer import GroupCommitWriter
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+CONTENT = (ROOT / "examples/accept_example.txt").read_text()
+
+
+def _pipeline(archive_dir, **options) -> ExtractionPipeline:
+    return ExtractionPipeline(schema_path=SCHEMA, archive_dir=str(archive_dir),
+                              verbose=False, **options)
+
+
+def test_async_record_is_waitable_by_archive_ref(tmp_path):
+    pipeline = _pipeline(tmp_path / "evidence", durability="async")
+    refs = pipeline.run_text(CONTENT, "a.txt")["artifact_refs"]
+    assert refs["durable"] is False
+
+    pipeline.wait_durable(refs["archive_ref"], timeout=10)
+    assert refs["archive_ref"] not in pipeline._pending
+    pipeline.close()
+    assert pipeline.writer.stats["records"] == 1
+
+
+def test_wait_mode_returns_durable_records(tmp_path):
+    pipeline = _pipeline(tmp_path / "evidence", durability="wait")
+    refs = pipeline.run_text(CONTENT, "a.txt")["artifact_refs"]
+    assert refs["durable"] is True
+    pipeline.wait_durable(refs["archive_ref"])
+    pipeline.close()
+
+
+def test_failed_commit_is_reported_and_raised(tmp_path, monkeypatch, capsys):
+    def broken_fsync(path):
+        raise OSError(5, "Input/output error")
+
+    monkeypatch.setattr(engine.writer, "_fsync", broken_fsync)
+    pipeline = _pipeline(tmp_path / "evidence", durability="async")
+    refs = pipeline.run_text(CONTENT, "a.txt")["artifact_refs"]
+    try:
+        pipeline.wait_durable(refs["archive_ref"], timeout=10)
+    except OSError:
+        pass
+    else:
+        raise AssertionError("commit failure not raised")
+    pipeline.close()
+    assert "[ARCHIVE] Commit of 1 record(s) failed" in capsys.readouterr().err
+
+
+def test_commit_skips_segment_sealed_by_another_writer(tmp_path):
+    options = dict(layout="segments", compression="zlib",
+                   max_segment_bytes=1)
+    writer = GroupCommitWriter(EvidenceArchive(str(tmp_path), **options),
+                               max_delay=1.0)
+    document = DocumentIngestor("a.txt").load_text(CONTENT)
+    results = _pipeline(tmp_path / "unused").run_text(
+        CONTENT, "a.txt", dry_run=True)["results"]
+
+    info, durable = writer.write(document, results)
+    # Within the commit window, another writer rolls over and seals it
+    other = EvidenceArchive(str(tmp_path), **options)
+    other.archive_extraction(document, results)
+    assert not other.segments.data_path(1).exists()
+    assert other.segments.is_sealed(1)
+
+    assert durable.result(timeout=10) == info
+    writer.close()
+
+
+def _exit_worker(archive_dir: str, marker: str):
+    batch._init_worker(SCHEMA, archive_dir, "docs", False,
+                       archive_options={"durability": "async"})
+    writer = batch._pipeline.writer
+    close = writer.close
+
+    def recording_close():
+        close()
+        Path(marker).write_text(json.dumps(writer.stats))
+
+    writer.close = recording_close
+    for n in range(3):
+        batch._run_job({"content": CONTENT, "source_id": f"{n}.txt"})
+
+
+def test_batch_worker_commits_queued_evidence_at_exit(tmp_path):
+    marker = tmp_path / "closed.json"
+    process = multiprocessing.get_context("fork").Process(
+        target=_exit_worker, args=(str(tmp_path / "evidence"), str(marker))
+    )
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    assert json.loads(marker.read_text())["records"] == 3
+
+
+def test_batch_journals_only_durable_evidence(tmp_path):
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text("".join(
+        json.dumps({"content": CONTENT, "source_id": f"doc{n}.txt"}) + "\n"
+        for n in range(4)
+    ))
+    output = io.StringIO()
+    runner = BatchRunner(
+        workers=2,
+        schema_path=SCHEMA,
+        archive_dir=str(tmp_path / "evidence"),
+        journal_path=str(tmp_path / "journal.jsonl"),
+        archive_options={"durability": "async"}
+    )
+    stats = runner.run(str(jobs), output)
+    assert stats["ok"] == 4
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert all(r["result"]["artifact_refs"]["durable"] for r in records)
+    journal = (tmp_path / "journal.jsonl").read_text().splitlines()
+    assert len(journal) == 4
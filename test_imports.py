@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Import smoke tests: every top-level package imports on its own.
+
+Each import runs in a fresh interpreter, so modules already loaded by
+other tests cannot hide a circular import. Run:
+python -m pytest -q test_imports.py
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+
+def _import(statement: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", statement],
+        cwd=ROOT, capture_output=True, text=True
+    )
+
+
+def test_import_admission_in_fresh_interpreter():
+    result = _import("import admission")
+    assert result.returncode == 0, result.stderr
+
+
+def test_import_each_package_in_fresh_interpreter():
+    for package in ("admission", "execution", "engine", "audit", "common",
+                    "engine.batch", "engine.service"):
+        result = _import(f"import {package}")
+        assert result.returncode == 0, (package, result.stderr)
+
+
+def test_batch_cli_parses():
+    result = _import(
+        "import sys; sys.argv = ['batch', '--help']\n"
+        "import engine.batch\n"
+        "try:\n"
+        "    engine.batch.main()\n"
+        "except SystemExit as exc:\n"
+        "    sys.exit(exc.code)"
+    )
+    assert result.returncode == 0, result.stderr
+    assert "--rank" in result.stdout
+
+
+def test_execution_does_not_load_engine():
+    result = _import(
+        "import sys\n"
+        "import execution.corpus_index\n"
+        "loaded = [m for m in sys.modules\n"
+        "          if m == 'engine' or m.startswith('engine.')]\n"
+        "assert not loaded, loaded"
+    )
+    assert result.returncode == 0, result.stderr
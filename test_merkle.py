@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Merkle log against the RFC 6962 test vectors (certificate-transparency
+merkle_tree_test), plus archive inclusion proofs.
+
+Run: python -m pytest -q test_merkle.py
+"""
+import itertools
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from engine.merkle import MerkleLog, leaf_hash, verify_inclusion, \
+    verify_proof_document
+from engine.pipeline import ExtractionPipeline
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+
+LEAVES = [bytes.fromhex(h) for h in (
+    "", "00", "10", "2021", "3031", "40414243", "5051525354555657",
+    "606162636465666768696a6b6c6d6e6f",
+)]
+
+ROOTS = [
+    "6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d",
+    "fac54203e7cc696cf0dfcb42c92a1d9dbaf70ad9e621f4bd8d98662f00e3c125",
+    "aeb6bcfe274b70a14fb067a5e5578264db0fa9b51af5e0ba159158f329e06e77",
+    "d37ee418976dd95753c1c73862b9398fa2a2cf9b4ff0fdfe8b30cd95209614b7",
+    "4e3bbb1f7b478dcfe71fb631631519a3bca12c9aefca1612bfce4c13a86264d4",
+    "76e67dadbcdf1e10e1b74ddc608abd2f98dfb16fbce75277b5232a127f2087ef",
+    "ddb89be403809e325750d3d263cd78929c2942b7942a34b77e122c9594a74c8c",
+    "5dc9da79a70659a9ad559cb701ded9a2ab9d823aad2f4960cfe370eff4604328",
+]
+
+# (leaf index, tree size, audit path)
+PATHS = [
+    (0, 1, []),
+    (0, 8, [
+        "96a296d224f285c67bee93c30f8a309157f0daa35dc5b87e410b78630a09cfc7",
+        "5f083f0a1a33ca076a95279832580db3e0ef4584bdff1f54c8a360f50de3031e",
+        "6b47aaf29ee3c2af9af889bc1fb9254dabd31177f16232dd6aab035ca39bf6e4",
+    ]),
+    (5, 8, [
+        "bc1a0643b12e4d2d7c77918f44e0f4f79a838b6cf9ec5b5c283e1f4d88599e6b",
+        "ca854ea128ed050b41b35ffc1b87b8eb2bde461e9e3b5596ece6b9d5975a0ae0",
+        "d37ee418976dd95753c1c73862b9398fa2a2cf9b4ff0fdfe8b30cd95209614b7",
+    ]),
+    (2, 3, [
+        "fac54203e7cc696cf0dfcb42c92a1d9dbaf70ad9e621f4bd8d98662f00e3c125",
+    ]),
+    (1, 5, [
+        "6e340b9cffb37a989ca544e6bb780a2c78901d3fb33738768511a30617afa01d",
+        "5f083f0a1a33ca076a95279832580db3e0ef4584bdff1f54c8a360f50de3031e",
+        "bc1a0643b12e4d2d7c77918f44e0f4f79a838b6cf9ec5b5c283e1f4d88599e6b",
+    ]),
+]
+
+
+def _log(tmp_path) -> MerkleLog:
+    log = MerkleLog(str(tmp_path / "merkle"), publish_every=0)
+    for leaf in LEAVES:
+        log.append(leaf)
+    return log
+
+
+def test_roots_match_rfc6962_vectors(tmp_path):
+    log = _log(tmp_path)
+    assert [log.root(size).hex() for size in range(1, 9)] == ROOTS
+    assert log.root(0).hex() == \
+        "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+
+
+def test_inclusion_proofs_match_rfc6962_vectors(tmp_path):
+    log = _log(tmp_path)
+    for index, size, path in PATHS:
+        proof = log.inclusion_proof(index, size)
+        assert [p.hex() for p in proof] == path
+        assert verify_inclusion(leaf_hash(LEAVES[index]), index, size, proof,
+                                bytes.fromhex(ROOTS[size - 1]))
+
+
+def test_every_proof_verifies_and_rejects_tampering(tmp_path):
+    log = _log(tmp_path)
+    for size in range(1, 9):
+        root = log.root(size)
+        for index in range(size):
+            proof = log.inclusion_proof(index, size)
+            leaf = leaf_hash(LEAVES[index])
+            assert verify_inclusion(leaf, index, size, proof, root)
+            if size < 8:
+                assert not verify_inclusion(leaf, index, size, proof,
+                                            log.root(size + 1))
+            if size > 1:
+                wrong = (index + 1) % size
+                assert not verify_inclusion(leaf, wrong, size, proof, root)
+                assert not verify_inclusion(leaf_hash(b"x"), index, size,
+                                            proof, root)
+
+
+def test_crash_mid_append_is_repaired(tmp_path):
+    log = _log(tmp_path)
+    # Torn leaf hash and missing parent levels after a crash
+    with open(log._level_path(0), 'ab') as f:
+        f.write(b"\x00" * 7)
+    for level in itertools.count(1):
+        path = log._level_path(level)
+        if not path.exists():
+            break
+        path.unlink()
+
+    repaired = MerkleLog(str(tmp_path / "merkle"), publish_every=0)
+    assert repaired.size == 8
+    assert repaired.root().hex() == ROOTS[-1]
+
+
+def test_archive_inclusion_proof_documents(tmp_path):
+    pipeline = ExtractionPipeline(schema_path=SCHEMA,
+                                  archive_dir=str(tmp_path / "evidence"),
+                                  verbose=False, merkle=True,
+                                  merkle_publish_every=3)
+    content = (ROOT / "examples/accept_example.txt").read_text()
+    refs = [pipeline.run_text(content + f"\n{n}", f"{n}.txt")
+            ["artifact_refs"]["archive_ref"] for n in range(5)]
+
+    merkle = pipeline.archive.merkle
+    for n, ref in enumerate(refs):
+        proof = pipeline.archive.inclusion_proof(ref)
+        assert proof["leaf_index"] == n
+        # Records 0-2 prove against the published root of size 3; the
+        # others only verify once a root covering them is published
+        assert proof["tree_size"] == (3 if n < 3 else 5)
+        trusted = merkle.published_roots()
+        assert verify_proof_document(proof, trusted) == (n < 3)
+        assert verify_proof_document(proof, {5: merkle.root(5).hex()}) == \
+            (n >= 3)
+        assert not verify_proof_document(
+            dict(proof, leaf=proof["leaf"] + " "), trusted)
+
+    merkle.publish()
+    for ref in refs[3:]:
+        assert verify_proof_document(pipeline.archive.inclusion_proof(ref),
+                                     merkle.published_roots())
+
+
+def test_self_consistent_forged_proof_is_rejected(tmp_path):
+    pipeline = ExtractionPipeline(schema_path=SCHEMA,
+                                  archive_dir=str(tmp_path / "evidence"),
+                                  verbose=False, merkle=True,
+                                  merkle_publish_every=2)
+    content = (ROOT / "examples/accept_example.txt").read_text()
+    ref = [pipeline.run_text(content + f"\n{n}", f"{n}.txt")
+           ["artifact_refs"]["archive_ref"] for n in range(2)][0]
+    proof = pipeline.archive.inclusion_proof(ref)
+
+    # Same tree size, forged leaf: proof and root agree with each other
+    forged_leaf = proof["leaf"].replace('"document_hash":"',
+                                        '"document_hash":"f')
+    assert forged_leaf != proof["leaf"]
+    forged = MerkleLog(str(tmp_path / "forged"), publish_every=0)
+    forged.append(forged_leaf.encode('utf-8'))
+    forged.append(b"other")
+    forged_proof = dict(
+        proof, leaf=forged_leaf,
+        leaf_hash=leaf_hash(forged_leaf.encode('utf-8')).hex(),
+        root=forged.root(2).hex(),
+        proof=[p.hex() for p in forged.inclusion_proof(0, 2)]
+    )
+    trusted = pipeline.archive.merkle.published_roots()
+    assert verify_proof_document(proof, trusted)
+    assert not verify_proof_document(forged_proof, trusted)
+    assert verify_proof_document(forged_proof, {2: forged.root(2).hex()})
+
+    # The CLI checks the archive's published roots
+    for document, code in ((proof, 0), (forged_proof, 1)):
+        path = tmp_path / "proof.json"
+        path.write_text(json.dumps(document))
+        result = subprocess.run(
+            [sys.executable, "-m", "engine", "merkle", "verify", str(path),
+             "--archive-dir", str(tmp_path / "evidence")],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        assert result.returncode == code, result.stderr
+
+
+def test_failed_archive_write_leaves_no_leaf(tmp_path, monkeypatch):
+    pipeline = ExtractionPipeline(schema_path=SCHEMA,
+                                  archive_dir=str(tmp_path / "evidence"),
+                                  verbose=False, merkle=True,
+                                  merkle_publish_every=2)
+    archive = pipeline.archive
+    content = (ROOT / "examples/accept_example.txt").read_text()
+    first = pipeline.run_text(content, "0.txt")["artifact_refs"]
+
+    def fail(*args):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(archive, "_archive_files", fail)
+    with pytest.raises(OSError):
+        pipeline.run_text(content + "\n1", "1.txt")
+    assert archive.merkle.size == 1
+    assert archive.merkle.latest_published() is None
+
+    monkeypatch.undo()
+    second = pipeline.run_text(content + "\n2", "2.txt")["artifact_refs"]
+    assert second["merkle_leaf_index"] == 1
+    assert archive.merkle.latest_published()["tree_size"] == 2
+    for refs in (first, second):
+        assert verify_proof_document(
+            archive.inclusion_proof(refs["archive_ref"]),
+            archive.merkle.published_roots())
+
+
+def test_published_leaves_are_never_truncated(tmp_path):
+    log = _log(tmp_path)
+    log.publish()
+    with pytest.raises(ValueError):
+        log.truncate(7)
+    assert log.root().hex() == ROOTS[-1]
+
+    log.append(b"extra")
+    log.truncate(8)
+    assert log.size == 8
+    assert [log._level_count(k) for k in range(4)] == [8, 4, 2, 1]
+    assert log.root().hex() == ROOTS[-1]
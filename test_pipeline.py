@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Extraction pipeline entry points (files, in-memory text, dry runs) and
+per-document deadlines.
+
+Run: python -m pytest -q test_pipeline.py
+"""
+import time
+from pathlib import Path
+
+from engine.pipeline import ExtractionPipeline
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+EXAMPLE = ROOT / "examples/accept_example.txt"
+
+
+def _pipeline(archive_dir) -> ExtractionPipeline:
+    return ExtractionPipeline(schema_path=SCHEMA, archive_dir=str(archive_dir),
+                              verbose=False)
+
+
+def _decisions(output):
+    return [(r["field_name"], r["decision"], r["value"])
+            for r in output["results"]]
+
+
+def test_run_text_matches_run_on_file(tmp_path):
+    pipeline = _pipeline(tmp_path / "evidence")
+    from_file = pipeline.run(str(EXAMPLE))
+    in_memory = pipeline.run_text(EXAMPLE.read_text(), "memo.txt")
+
+    assert _decisions(in_memory) == _decisions(from_file)
+    assert in_memory["document"] == {
+        "path": "memo.txt", "hash": from_file["document"]["hash"]
+    }
+    assert in_memory["summary"] == from_file["summary"]
+    assert in_memory["artifact_refs"]["archive_ref"] != \
+        from_file["artifact_refs"]["archive_ref"]
+
+
+def test_dry_run_writes_no_evidence(tmp_path):
+    archive_dir = tmp_path / "evidence"
+    pipeline = _pipeline(archive_dir)
+    before = sorted(p.relative_to(archive_dir) for p in archive_dir.rglob("*"))
+
+    output = pipeline.run_text(EXAMPLE.read_text(), "memo.txt", dry_run=True)
+    assert output["artifact_refs"] is None
+    assert output["summary"]["total_fields"] == len(output["results"]) > 0
+    assert sorted(p.relative_to(archive_dir)
+                  for p in archive_dir.rglob("*")) == before
+
+
+def test_expired_deadline_stops_every_field_and_archives(tmp_path):
+    pipeline = _pipeline(tmp_path / "evidence")
+    output = pipeline.run_text(EXAMPLE.read_text(), "memo.txt",
+                               deadline=time.monotonic() - 1)
+
+    assert len(output["results"]) == len(pipeline.schema["fields"])
+    for result in output["results"]:
+        assert result["decision"] == "STOP"
+        assert result["stop_reason"] == "deadline_exceeded"
+        proof = result["stop_proof"]
+        assert proof["interrupted_at"] == "extract"
+        assert proof["stages_completed"] == ["ingest"]
+        assert proof["overrun_ms"] >= 1000
+    assert pipeline.archive.verify(output["artifact_refs"]["archive_ref"],
+                                   output["document"]["hash"])
+
+
+def test_deadline_during_grounding_records_progress(tmp_path, monkeypatch):
+    pipeline = _pipeline(tmp_path / "evidence")
+    text = EXAMPLE.read_text() * 2
+    candidates = len(pipeline.extractor.extract(text))
+    assert candidates > 1
+
+    # Checks: before extract, after extract, then one per candidate
+    checks = iter([False, False, False] + [True] * 100)
+    monkeypatch.setattr(pipeline, "_expired", lambda deadline: next(checks))
+    output = pipeline.run_text(text, "memo.txt", dry_run=True,
+                               deadline=time.monotonic() + 60)
+
+    assert [r["stop_reason"] for r in output["results"]] == \
+        ["deadline_exceeded"] * len(pipeline.schema["fields"])
+    proof = output["results"][0]["stop_proof"]
+    assert proof["interrupted_at"] == "ground"
+    assert proof["stages_completed"] == ["ingest", "extract"]
+    assert proof["candidates_found"] == candidates
+    assert proof["candidates_grounded"] == 1
+    assert proof["fields_judged"] == 0
+
+
+def test_no_deadline_never_stops_for_time(tmp_path):
+    output = _pipeline(tmp_path / "evidence").run_text(
+        EXAMPLE.read_text(), "memo.txt", dry_run=True,
+        deadline=time.monotonic() + 3600)
+    assert all(r["stop_reason"] != "deadline_exceeded"
+               for r in output["results"])
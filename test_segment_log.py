@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Segment log: rollover, sealing into compressed frames, crash repair.
+
+Run: python -m pytest -q test_segment_log.py
+"""
+import fcntl
+import os
+
+import pytest
+
+from engine.segments import SegmentLog
+
+
+def _log(directory, **options) -> SegmentLog:
+    options.setdefault("compression", "zlib")
+    options.setdefault("max_segment_bytes", 1000)
+    options.setdefault("frame_bytes", 300)
+    return SegmentLog(str(directory), prefix="seg", **options)
+
+
+def _record(n: int) -> bytes:
+    return f"record {n:04d} ".encode() * 10
+
+
+def _lock_is_free(log: SegmentLog) -> bool:
+    fd = os.open(log.lock.path, os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
+def test_sealed_segments_read_back_unchanged(tmp_path):
+    log = _log(tmp_path)
+    ids = [log.append(_record(n))["id"] for n in range(30)]
+
+    sealed = [seq for seq in log.segments() if log.is_sealed(seq)]
+    assert sealed == log.segments()[:-1] and len(sealed) > 1
+    for seq in sealed:
+        assert not log.data_path(seq).exists()
+        assert len(log._load_frames(seq)) > 1
+
+    reader = _log(tmp_path)
+    for n in (29, 0, 17, 3):
+        assert reader.read(ids[n])[1] == _record(n)
+    scanned = [bytes(data) for seq in reader.segments()
+               for _, data in reader.iter_records(seq)]
+    assert scanned == [_record(n) for n in range(30)]
+
+
+def test_rollover_compresses_outside_the_lock(tmp_path):
+    log = _log(tmp_path)
+    compress = log._compress
+    seen = []
+
+    def checked_compress(seq, z_path, frames_path):
+        seen.append((seq, log.lock.held(), _lock_is_free(log)))
+        compress(seq, z_path, frames_path)
+
+    log._compress = checked_compress
+    for n in range(10):
+        log.append(_record(n))
+    assert seen and all(not held and free for _, held, free in seen)
+    assert all(log.is_sealed(seq) for seq, _, _ in seen)
+
+
+def test_seal_waits_for_caller_holding_the_lock(tmp_path):
+    log = _log(tmp_path)
+    with log.lock:
+        for n in range(10):
+            log.append(_record(n))
+        assert not any(log.is_sealed(seq) for seq in log.segments())
+    log.seal_rolled()
+    assert all(log.is_sealed(seq) for seq in log.segments()[:-1])
+
+
+def test_concurrent_sealers_commit_once(tmp_path):
+    writer = _log(tmp_path, max_segment_bytes=10 ** 6)
+    ids = [writer.append(_record(n))["id"] for n in range(5)]
+    rolled = _log(tmp_path, max_segment_bytes=1)
+    rolled.append(b"next segment")  # rolls segment 1 over, seals it
+
+    # A second sealer loses the race after compressing
+    rival = _log(tmp_path)
+    os.rename(rolled.compressed_path(1), tmp_path / "z")
+    os.rename(rolled.frames_path(1), tmp_path / "f")
+    (tmp_path / "seg_000001.seg").write_bytes(
+        b"".join(_record(n) for n in range(5)))
+    compress = rival._compress
+
+    def lose_race(seq, z_path, frames_path):
+        compress(seq, z_path, frames_path)
+        os.rename(tmp_path / "z", rolled.compressed_path(1))
+        os.rename(tmp_path / "f", rolled.frames_path(1))
+
+    rival._compress = lose_race
+    rival.seal(1)
+
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+    assert not rival.data_path(1).exists()
+    assert _log(tmp_path).read(ids[4])[1] == _record(4)
+
+
+def test_active_segment_cannot_be_sealed(tmp_path):
+    log = _log(tmp_path)
+    log.append(_record(0))
+    try:
+        log.seal(1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("active segment sealed")
+
+
+def test_torn_index_line_and_orphan_bytes_are_repaired(tmp_path):
+    log = _log(tmp_path, compression=None, max_segment_bytes=10 ** 6)
+    ids = [log.append(_record(n), {"n": n})["id"] for n in range(3)]
+
+    # Crash mid-append: data written, index line only half written
+    with open(log.data_path(1), 'ab') as f:
+        f.write(b"orphan bytes")
+    with open(log.index_path(1), 'ab') as f:
+        f.write(b'{"id":"seg_000001_0000')
+
+    resumed = _log(tmp_path, compression=None, max_segment_bytes=10 ** 6)
+    entry = resumed.append(_record(3), {"n": 3})
+    assert entry["id"] == resumed.make_id(1, 3)
+    assert entry["offset"] == 3 * len(_record(0))
+    assert [e["n"] for e in resumed.iter_segment(1)] == [0, 1, 2, 3]
+    for n, record_id in enumerate(ids + [entry["id"]]):
+        assert resumed.read(record_id)[1] == _record(n)
+    assert resumed.data_path(1).stat().st_size == 4 * len(_record(0))
+
+
+def test_writer_catches_up_on_other_writers_appends(tmp_path):
+    first = _log(tmp_path, compression=None, max_segment_bytes=10 ** 6)
+    second = _log(tmp_path, compression=None, max_segment_bytes=10 ** 6)
+    a = first.append(b"a")
+    b = second.append(b"bb")
+    c = first.append(b"ccc")
+    assert [a["record"], b["record"], c["record"]] == [0, 1, 2]
+    assert c["offset"] == 3
+    assert first.last_entry()["id"] == second.last_entry()["id"] == c["id"]
+
+
+def test_rollover_by_size_and_age(tmp_path):
+    log = _log(tmp_path, compression=None, max_segment_bytes=250)
+    for n in range(6):
+        log.append(_record(n))
+    assert log.segments() == [1, 2, 3]
+    assert [len(list(log.iter_segment(seq))) for seq in log.segments()] == \
+        [2, 2, 2]
+
+    aged = _log(tmp_path / "aged", compression=None, max_segment_age=0)
+    aged.append(b"first")
+    aged.append(b"second")
+    assert aged.segments() == [1, 2]
+
+
+def test_record_ids_locate_records(tmp_path):
+    log = _log(tmp_path, compression=None)
+    entry = log.append(b"payload", {"kind": "x"})
+    assert log.parse_id(entry["id"]) == (1, 0)
+    located = log.locate(entry["id"])
+    assert (located["offset"], located["length"], located["kind"]) == \
+        (0, 7, "x")
+    for bad in ("seg_000001_00000005", "other_000001_00000000", "seg_x"):
+        with pytest.raises((KeyError, ValueError)):
+            log.read(bad)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Extraction service: warm worker pool behind HTTP on a Unix socket.
+
+Run: python -m pytest -q test_service.py
+"""
+import http.client
+import json
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from engine.service import ExtractionService, make_server
+
+ROOT = Path(__file__).parent
+SCHEMA = str(ROOT / "schema/extraction_schema.json")
+EXAMPLE = ROOT / "examples/accept_example.txt"
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str):
+        super().__init__("localhost", timeout=30)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+@pytest.fixture
+def service_socket(tmp_path):
+    service = ExtractionService(schema_path=SCHEMA,
+                                archive_dir=str(tmp_path / "evidence"),
+                                workers=2)
+    socket_path = str(tmp_path / "extract.sock")
+    server = make_server(service, socket_path=socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def _request(socket_path: str, method: str, path: str, body=None):
+    connection = _UnixConnection(socket_path)
+    data = body if isinstance(body, bytes) else \
+        json.dumps(body).encode() if body is not None else None
+    connection.request(method, path, body=data)
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_health_reports_workers(service_socket):
+    assert _request(service_socket, "GET", "/health") == \
+        (200, {"status": "ok", "workers": 2})
+
+
+def test_extract_content_and_path(service_socket, tmp_path):
+    status, inline = _request(service_socket, "POST", "/extract", {
+        "content": EXAMPLE.read_text(), "source_id": "memo.txt",
+        "dry_run": True
+    })
+    assert status == 200
+    assert inline["artifact_refs"] is None
+    assert inline["document"]["path"] == "memo.txt"
+
+    status, archived = _request(service_socket, "POST", "/extract",
+                                {"path": str(EXAMPLE)})
+    assert status == 200
+    assert archived["artifact_refs"]["archive_ref"]
+    assert [r["decision"] for r in archived["results"]] == \
+        [r["decision"] for r in inline["results"]]
+
+
+def test_errors_map_to_status_codes(service_socket, tmp_path):
+    assert _request(service_socket, "POST", "/extract", b"{not json")[0] == 400
+    assert _request(service_socket, "POST", "/extract", [1, 2])[0] == 400
+    assert _request(service_socket, "POST", "/extract", {})[0] == 400
+    assert _request(service_socket, "POST", "/extract",
+                    {"path": str(tmp_path / "missing.txt")})[0] == 404
+    assert _request(service_socket, "GET", "/nowhere")[0] == 404